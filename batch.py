@@ -0,0 +1,205 @@
+"""
+Run many prompts through the exercise agents with bounded concurrency.
+
+Jobs are JSONL, one per line:
+
+    {"agent": "ex1", "prompt": "Is 7 even or odd?"}
+    {"agent": "ex9:marketing_agent", "prompt": "...", "id": "plan-1"}
+
+`agent` names an exercise module, optionally with the attribute holding the Agent.
+Results are written as JSONL in input order, each line flushed as soon as it and
+every job before it have finished:
+
+    python batch.py jobs.jsonl -o results.jsonl -c 8
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import statistics
+import sys
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from pydantic import BaseModel
+from agents import Agent
+
+import usage
+
+_agents: Dict[str, Agent] = {}
+
+
+@dataclass
+class BatchJob:
+    agent: str
+    prompt: str
+    id: Optional[str] = None
+
+
+@dataclass
+class BatchResult:
+    index: int
+    id: Optional[str]
+    agent: str
+    output: Any
+    error: Optional[str]
+    latency_ms: float
+    input_tokens: int = 0
+    output_tokens: int = 0
+
+
+def load_agent(spec: str) -> Agent:
+    """
+    Resolve "exN" or "exN:attr" to an Agent, importing the exercise module once.
+    Without an attribute, a module with several agents names its main one as AGENT.
+    """
+    agent = _agents.get(spec)
+    if agent is None:
+        module_name, _, attr = spec.partition(":")
+        module = importlib.import_module(module_name)
+        if attr:
+            agent = getattr(module, attr)
+        elif isinstance(getattr(module, "AGENT", None), Agent):
+            agent = module.AGENT
+        else:
+            found = [v for v in vars(module).values() if isinstance(v, Agent)]
+            if len(found) != 1:
+                raise ValueError(
+                    f"{module_name} defines {len(found)} agents; use '{module_name}:<name>' or set AGENT in it"
+                )
+            agent = found[0]
+        _agents[spec] = agent
+    return agent
+
+
+def read_jobs(path: str) -> List[BatchJob]:
+    with open(path, encoding="utf-8") as f:
+        return [BatchJob(**json.loads(line)) for line in f if line.strip()]
+
+
+def _jsonable_output(output: Any) -> Any:
+    if isinstance(output, BaseModel):
+        return output.model_dump(mode="json")
+    return output
+
+
+async def run_job(
+    index: int,
+    job: BatchJob,
+    token_budget: Optional[int] = None,
+    usage_jsonl: Optional[str] = None,
+) -> BatchResult:
+    start = time.perf_counter()
+    output, error = None, None
+    meter = usage.UsageMeter()
+    try:
+        result, _ = await usage.run_metered(
+            load_agent(job.agent), job.prompt, exercise=job.agent, budget=token_budget, meter=meter
+        )
+        output = _jsonable_output(result.final_output)
+    except Exception as e:  # one failed job must not sink the batch
+        error = f"{type(e).__name__}: {e}"
+    if usage_jsonl:
+        usage.append_jsonl(meter, usage_jsonl)
+    return BatchResult(
+        index=index,
+        id=job.id,
+        agent=job.agent,
+        output=output,
+        error=error,
+        latency_ms=round((time.perf_counter() - start) * 1000, 1),
+        input_tokens=sum(r.input_tokens for r in meter.records),
+        output_tokens=sum(r.output_tokens for r in meter.records),
+    )
+
+
+async def run_batch(
+    jobs: Iterable[BatchJob],
+    concurrency: int = 8,
+    on_result: Optional[Callable[[BatchResult], None]] = None,
+    token_budget: Optional[int] = None,
+    usage_jsonl: Optional[str] = None,
+) -> List[BatchResult]:
+    """
+    Run `jobs` with at most `concurrency` agent runs in flight.
+    `on_result` is called in input order, as soon as each result's predecessors are done.
+    Each job is metered (see usage.py); `token_budget` aborts a job that exceeds it.
+    """
+    jobs = list(jobs)
+    results: List[Optional[BatchResult]] = [None] * len(jobs)
+    queue: "asyncio.Queue[int]" = asyncio.Queue()
+    for i in range(len(jobs)):
+        queue.put_nowait(i)
+    next_to_emit = 0
+
+    def emit_ready() -> None:
+        nonlocal next_to_emit
+        while next_to_emit < len(results) and results[next_to_emit] is not None:
+            if on_result is not None:
+                on_result(results[next_to_emit])
+            next_to_emit += 1
+
+    async def worker() -> None:
+        while True:
+            try:
+                i = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            results[i] = await run_job(i, jobs[i], token_budget, usage_jsonl)
+            emit_ready()
+
+    await asyncio.gather(*(worker() for _ in range(max(1, min(concurrency, len(jobs))))))
+    return results  # type: ignore[return-value]
+
+
+def summarize(results: List[BatchResult], wall_s: float) -> Dict[str, float]:
+    latencies = sorted(r.latency_ms for r in results)
+    if not latencies:
+        return {"jobs": 0}
+    return {
+        "jobs": len(results),
+        "errors": sum(1 for r in results if r.error),
+        "wall_s": round(wall_s, 3),
+        "runs_per_s": round(len(results) / wall_s, 3) if wall_s else 0.0,
+        "p50_ms": round(statistics.median(latencies), 1),
+        "p95_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 1),
+        "max_ms": round(latencies[-1], 1),
+        "input_tokens": sum(r.input_tokens for r in results),
+        "output_tokens": sum(r.output_tokens for r in results),
+    }
+
+
+async def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("jobs", help="JSONL file of {agent, prompt[, id]} jobs")
+    parser.add_argument("-o", "--output", default="-", help="results JSONL (default: stdout)")
+    parser.add_argument("-c", "--concurrency", type=int, default=8)
+    parser.add_argument("--token-budget", type=int, default=None, help="abort a job past this many tokens")
+    parser.add_argument("--usage-jsonl", help="append per-response token usage records here")
+    parser.add_argument("--usage-prom", help="write Prometheus token counters here when done")
+    args = parser.parse_args(argv)
+
+    jobs = read_jobs(args.jobs)
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+
+    def write(result: BatchResult) -> None:
+        out.write(json.dumps(asdict(result), ensure_ascii=False) + "\n")
+        out.flush()
+
+    start = time.perf_counter()
+    try:
+        results = await run_batch(
+            jobs, args.concurrency, on_result=write, token_budget=args.token_budget, usage_jsonl=args.usage_jsonl
+        )
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    if args.usage_prom:
+        usage.write_prometheus(args.usage_prom)
+
+    print(json.dumps(summarize(results, time.perf_counter() - start)), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,230 @@
+"""
+End-to-end latency benchmark for ex1-ex11 against the local mock server.
+
+Each exercise agent is driven through Runner.run; per run we record wall time,
+time spent in model calls and time spent in tools (from the SDK's generation and
+function spans). Results are compared with a saved JSON baseline and the process
+exits non-zero on any regression.
+
+    python bench.py --save-baseline                   # record bench_baseline.json
+    python bench.py --repeat 5 --latency-ms 50        # compare against it
+    python bench.py --live                            # real endpoints from .env
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from agents.tracing import Span, Trace, TracingProcessor, set_trace_processors
+
+from mock_server import MockConfig, start_mock_server
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_baseline.json")
+
+# Based on the prompts the exercise scripts send, shortened in places: ex3 without its
+# example row, ex6 with the article cut, ex8 with a shorter profile, ex9 without the
+# closing instruction. ex11 sends its dataset inline and names the stats tool, while
+# ex11.py runs a vague inline prompt and a by-reference one.
+EXERCISE_PROMPTS: Dict[str, str] = {
+    "ex1": "Determine if 42 is even or odd. Think step by step and explain your reasoning.",
+    "ex2": "Use the weather API tool to get the current weather in Karachi, Pakistan. Return the temperature and condition.",
+    "ex3": "Generate three project ideas for an AI app. Format the output as a table with columns 'Name' and 'Description.'",
+    "ex4": "Respond to this query in a concise, professional tone: 'What are the ethical concerns of AI?' Limit to 50 words.",
+    "ex5": "Act as a data analyst. Use the database query tool to analyze sales data and identify trends for Q1 2025. Return results in bullet points.",
+    "ex6": "Summarize this 500-word article in 100 words: Renewable energy has rapidly transformed from a niche concept...",
+    "ex7": "Calculate shipping costs for a 5kg package from New York to Paris using the ShipEngine API. Show your steps: 1) query API, 2) process data, 3) return cost.",
+    "ex8": "Summarize this user profile in JSON: Name: Muniba Ahmed, Location: Karachi, Pakistan. Start with: {'summary':",
+    "ex9": "Develop a detailed marketing campaign plan using the analytics tool and budget calculator tool. Include strategy, timeline, and costs for a 3-month period.",
+    "ex10": "Use the sales data tool to retrieve sales figures for March 2025. Return results quickly in a list.",
+    "ex11": "Analyze trends in this dataset using the stats tool: [12, 15, 20, 22, 18, 25, 30, 28] Limit to top 3 trends in a table.",
+}
+
+METRICS = ("wall_ms", "model_ms", "tool_ms")
+
+
+class TimingProcessor(TracingProcessor):
+    """Sums model-call and tool span durations; replaces the remote exporter during a benchmark."""
+
+    def __init__(self) -> None:
+        self._starts: Dict[str, float] = {}
+        self.model_s = 0.0
+        self.tool_s = 0.0
+
+    def reset(self) -> None:
+        self._starts.clear()
+        self.model_s = 0.0
+        self.tool_s = 0.0
+
+    def on_trace_start(self, trace: Trace) -> None:
+        pass
+
+    def on_trace_end(self, trace: Trace) -> None:
+        pass
+
+    def on_span_start(self, span: Span[Any]) -> None:
+        self._starts[span.span_id] = time.perf_counter()
+
+    def on_span_end(self, span: Span[Any]) -> None:
+        start = self._starts.pop(span.span_id, None)
+        if start is None:
+            return
+        elapsed = time.perf_counter() - start
+        if span.span_data.type == "generation":
+            self.model_s += elapsed
+        elif span.span_data.type == "function":
+            self.tool_s += elapsed
+
+    def shutdown(self) -> None:
+        pass
+
+    def force_flush(self) -> None:
+        pass
+
+
+def point_exercises_at(base_url: str) -> None:
+    """Route every exercise's LLM, weather and shipping calls to `base_url`. Must run before they are imported."""
+    os.environ["LLM_BASE_URL"] = f"{base_url}/v1/"
+    os.environ["LLM_API_KEY"] = "mock"
+    os.environ["GEMINI_API_KEY"] = "mock"  # ex10 only picks the shared model when a key is set
+    os.environ["OPENWEATHER_BASE_URL"] = base_url
+    os.environ["OPENWEATHER_API_KEY"] = "mock"
+    os.environ["SHIPENGINE_BASE_URL"] = base_url
+    os.environ["SHIPENGINE_API_KEY"] = "mock"
+
+
+def _p50(values: List[float]) -> float:
+    return round(statistics.median(values), 2) if values else 0.0
+
+
+async def bench_exercise(name: str, repeat: int, timing: TimingProcessor) -> Dict[str, Any]:
+    from agents import Runner, set_tracing_disabled
+    from batch import load_agent
+
+    samples: Dict[str, List[float]] = {m: [] for m in METRICS}
+    errors: List[str] = []
+    try:
+        agent = load_agent(name)
+    except Exception as e:
+        # e.g. ex7 without SHIPENGINE_API_KEY: reported like a failed run, the others still run
+        errors.append(f"{type(e).__name__}: {e}")
+        repeat = 0
+    # Some exercises switch tracing off at import; the timings come from spans
+    set_tracing_disabled(False)
+    for _ in range(repeat):
+        timing.reset()
+        start = time.perf_counter()
+        try:
+            await Runner.run(agent, EXERCISE_PROMPTS[name])
+        except Exception as e:
+            errors.append(f"{type(e).__name__}: {e}")
+            continue
+        samples["wall_ms"].append((time.perf_counter() - start) * 1000)
+        samples["model_ms"].append(timing.model_s * 1000)
+        samples["tool_ms"].append(timing.tool_s * 1000)
+
+    result: Dict[str, Any] = {f"{m}_p50": _p50(samples[m]) for m in METRICS}
+    result["wall_ms_cold"] = round(samples["wall_ms"][0], 2) if samples["wall_ms"] else 0.0
+    result["runs"] = repeat
+    result["errors"] = len(errors)
+    if errors:
+        result["first_error"] = errors[0]
+    return result
+
+
+def find_regressions(
+    current: Dict[str, Dict[str, Any]],
+    baseline: Dict[str, Dict[str, Any]],
+    tolerance: float,
+    floor_ms: float,
+) -> List[str]:
+    """A metric regresses when it exceeds baseline * (1 + tolerance) + floor_ms."""
+    regressions = []
+    for name, base in baseline.items():
+        cur = current.get(name)
+        if cur is None:
+            continue
+        if cur["errors"] > base.get("errors", 0):
+            regressions.append(f"{name}: errors {base.get('errors', 0)} -> {cur['errors']}")
+        for metric in (f"{m}_p50" for m in METRICS):
+            limit = base[metric] * (1 + tolerance) + floor_ms
+            if cur[metric] > limit:
+                regressions.append(f"{name}: {metric} {base[metric]:.1f} -> {cur[metric]:.1f} ms (limit {limit:.1f})")
+    return regressions
+
+
+async def run_suite(exercises: List[str], repeat: int) -> Dict[str, Dict[str, Any]]:
+    timing = TimingProcessor()
+    set_trace_processors([timing])
+    results = {}
+    for name in exercises:
+        results[name] = await bench_exercise(name, repeat, timing)
+        r = results[name]
+        print(
+            f"{name:<5} wall {r['wall_ms_p50']:>9.1f}  model {r['model_ms_p50']:>9.1f}  "
+            f"tool {r['tool_ms_p50']:>8.1f}  cold {r['wall_ms_cold']:>9.1f}  errors {r['errors']}"
+        )
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--exercises", default=",".join(EXERCISE_PROMPTS), help="comma-separated, e.g. ex1,ex7")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="mock server latency per request")
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--live", action="store_true", help="use the real endpoints instead of the mock server")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown")
+    parser.add_argument("--floor-ms", type=float, default=5.0, help="allowed absolute slowdown (noise floor)")
+    args = parser.parse_args(argv)
+
+    exercises = [e.strip() for e in args.exercises.split(",") if e.strip()]
+    unknown = [e for e in exercises if e not in EXERCISE_PROMPTS]
+    if unknown:
+        parser.error(f"unknown exercises: {', '.join(unknown)}")
+
+    config = {"repeat": args.repeat, "live": args.live, "latency_ms": args.latency_ms, "jitter_ms": args.jitter_ms}
+    if not args.live:
+        server = start_mock_server(
+            MockConfig(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate)
+        )
+        point_exercises_at(server.base_url)
+
+    results = asyncio.run(run_suite(exercises, args.repeat))
+    report = {"config": config, "exercises": results}
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline first.")
+        return 0
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline.get("config") != config:
+        print(f"WARNING: baseline config {baseline.get('config')} differs from {config}")
+
+    regressions = find_regressions(results, baseline["exercises"], args.tolerance, args.floor_ms)
+    for line in regressions:
+        print(f"REGRESSION {line}", file=sys.stderr)
+    if regressions:
+        print(f"FAILED: {len(regressions)} regression(s) against {args.baseline}", file=sys.stderr)
+        return 1
+    print(f"OK: no regressions against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
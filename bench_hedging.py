@@ -0,0 +1,82 @@
+"""
+Benchmark: model-call tail latency with and without request hedging, against the
+local mock server with an injected slow tail.
+
+    python bench_hedging.py --calls 300 --slow-rate 0.02 --slow-ms 500
+
+Each mode gets its own AsyncOpenAI client (same pool settings as llm.py); the hedged
+one goes through HedgingTransport. Reports p50/p95/p99 and the extra requests sent.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Dict, List
+
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+from hedging import HedgingTransport
+from mock_server import MockConfig, start_mock_server
+
+
+def percentiles(latencies: List[float]) -> Dict[str, float]:
+    ordered = sorted(latencies)
+
+    def pick(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+    return {"p50_ms": statistics.median(ordered), "p95_ms": pick(0.95), "p99_ms": pick(0.99), "max_ms": ordered[-1]}
+
+
+async def run_mode(base_url: str, hedged: bool, calls: int, concurrency: int) -> Dict[str, float]:
+    transport = httpx.AsyncHTTPTransport()
+    if hedged:
+        transport = HedgingTransport(transport, enabled=True)
+    client = AsyncOpenAI(api_key="mock", base_url=base_url, http_client=DefaultAsyncHttpxClient(transport=transport))
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def one() -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            await client.chat.completions.create(
+                model="mock-fast", messages=[{"role": "user", "content": "Determine if 42 is even or odd"}]
+            )
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    await asyncio.gather(*(one() for _ in range(calls)))
+    await client.close()
+    result = percentiles(latencies)
+    if hedged:
+        result["hedged"] = transport.stats["hedged"]
+        result["hedge_wins"] = transport.stats["hedge_wins"]
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--jitter-ms", type=float, default=5.0)
+    parser.add_argument("--slow-rate", type=float, default=0.02)
+    parser.add_argument("--slow-ms", type=float, default=500.0)
+    args = parser.parse_args()
+
+    server = start_mock_server(
+        MockConfig(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, slow_rate=args.slow_rate, slow_ms=args.slow_ms)
+    )
+    base_url = f"{server.base_url}/v1/"
+    print(f"calls={args.calls}  latency={args.latency_ms}±{args.jitter_ms} ms  slow={args.slow_rate:.0%} x +{args.slow_ms} ms")
+    print(f"{'mode':<10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}{'hedged':>9}{'wins':>7}")
+    for name, hedged in (("plain", False), ("hedged", True)):
+        r = asyncio.run(run_mode(base_url, hedged, args.calls, args.concurrency))
+        print(
+            f"{name:<10}{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}{r['p99_ms']:>10.1f}{r['max_ms']:>10.1f}"
+            f"{r.get('hedged', 0):>9}{r.get('hedge_wins', 0):>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
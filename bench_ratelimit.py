@@ -0,0 +1,77 @@
+"""
+Benchmark: a burst of model calls against a rate-limited endpoint, with and without
+the client-side rate limiter, using the local mock server's quota.
+
+    python bench_ratelimit.py --calls 120 --quota 20 --window-s 2
+
+The mock admits `quota` chat requests per sliding `window_s` and answers the rest
+with 429 + Retry-After. Without the limiter the OpenAI client's retries pile onto
+the quota; with it, calls queue in the limiter (sized to the same quota) and are
+sent as capacity frees up. Reports throughput, 429s, failures and queue waits.
+"""
+import argparse
+import asyncio
+import time
+from typing import Any, Dict
+
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, RateLimitError
+
+import ratelimit
+from mock_server import MockConfig, start_mock_server
+
+
+async def run_mode(base_url: str, limited: bool, calls: int, concurrency: int, quota: int, window: float) -> Dict[str, Any]:
+    transport: httpx.AsyncBaseTransport = httpx.AsyncHTTPTransport()
+    if limited:
+        transport = ratelimit.RateLimitedTransport(transport)
+        ratelimit._limiters.clear()
+        ratelimit._limiters[(base_url, "mock-fast")] = ratelimit.RateLimiter(quota, 0, window=window)
+    client = AsyncOpenAI(api_key="mock", base_url=base_url, http_client=DefaultAsyncHttpxClient(transport=transport))
+    semaphore = asyncio.Semaphore(concurrency)
+    failed = 0
+
+    async def one() -> None:
+        nonlocal failed
+        async with semaphore:
+            try:
+                await client.chat.completions.create(
+                    model="mock-fast", messages=[{"role": "user", "content": "Determine if 42 is even or odd"}]
+                )
+            except RateLimitError:
+                failed += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(calls)))
+    elapsed = time.perf_counter() - start
+    await client.close()
+    result: Dict[str, Any] = {"elapsed_s": elapsed, "ok_per_s": (calls - failed) / elapsed, "failed": failed}
+    if limited:
+        result.update(ratelimit.rate_limit_stats()[f"mock-fast @ {base_url}"])
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=120)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--quota", type=int, default=20, help="requests per window")
+    parser.add_argument("--window-s", type=float, default=2.0)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    print(f"calls={args.calls}  quota={args.quota} per {args.window_s}s  (sustained max {args.quota / args.window_s:.1f}/s)")
+    print(f"{'mode':<10}{'elapsed s':>11}{'ok/s':>8}{'429s':>7}{'failed':>8}{'max queue':>11}{'wait p95 ms':>13}")
+    for name, limited in (("plain", False), ("limited", True)):
+        server = start_mock_server(MockConfig(latency_ms=args.latency_ms, rpm=args.quota, quota_window_s=args.window_s))
+        base_url = f"{server.base_url}/v1/"
+        r = asyncio.run(run_mode(base_url, limited, args.calls, args.concurrency, args.quota, args.window_s))
+        server.shutdown()
+        print(
+            f"{name:<10}{r['elapsed_s']:>11.2f}{r['ok_per_s']:>8.1f}{server.config.stats.get('chat:429', 0):>7}"
+            f"{r['failed']:>8}{r.get('max_queue', 0):>11}{r.get('wait_p95_ms', 0.0):>13.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark: ex5 `query_sales` rebuild-per-call vs the shared, pre-indexed sales_db pool.
+
+    python bench_sales_db.py --rows 1000000 --calls 200
+
+The rebuild path replays what the original tool did (new in-memory DB, create table,
+insert every row, run the query) so it is capped by --rebuild-calls to keep runs short.
+"""
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from typing import Callable, Dict, List, Tuple
+
+from sales_db import SalesDatabase, build_database
+
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+QUERIES = [
+    "SELECT SUM(revenue) FROM sales WHERE month = 'Mar'",
+    "SELECT month, SUM(revenue) FROM sales WHERE month IN ('Jan', 'Feb', 'Mar') GROUP BY month",
+    "SELECT MAX(revenue) FROM sales WHERE month = 'Feb'",
+    "SELECT COUNT(*) FROM sales WHERE month = 'Apr'",
+]
+
+
+def synthetic_rows(n: int, seed: int = 7) -> List[Tuple[str, int]]:
+    rnd = random.Random(seed)
+    return [(MONTHS[rnd.randrange(12)], rnd.randrange(1_000, 50_000)) for _ in range(n)]
+
+
+def rebuild_per_call(rows: List[Tuple[str, int]], q: str) -> list:
+    conn = sqlite3.connect(":memory:")
+    cursor = conn.cursor()
+    cursor.execute("CREATE TABLE sales (id INTEGER PRIMARY KEY, month TEXT, revenue INTEGER)")
+    cursor.executemany("INSERT INTO sales (month, revenue) VALUES (?, ?)", rows)
+    cursor.execute(q)
+    result = cursor.fetchall()
+    conn.close()
+    return result
+
+
+def measure(fn: Callable[[str], list], calls: int) -> Dict[str, float]:
+    latencies = []
+    for i in range(calls):
+        q = QUERIES[i % len(QUERIES)]
+        start = time.perf_counter()
+        fn(q)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return {
+        "calls": calls,
+        "p50_ms": statistics.median(latencies),
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+        "mean_ms": statistics.fmean(latencies),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--rebuild-calls", type=int, default=10)
+    args = parser.parse_args()
+
+    rows = synthetic_rows(args.rows)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "sales.db")
+        start = time.perf_counter()
+        build_database(path, rows)
+        build_s = time.perf_counter() - start
+
+        db = SalesDatabase(path)
+        pooled = measure(db.execute, args.calls)
+        db.close()
+
+    rebuild = measure(lambda q: rebuild_per_call(rows, q), args.rebuild_calls)
+
+    print(f"rows={args.rows:,}  one-time build={build_s:.2f}s")
+    print(f"{'path':<18}{'calls':>7}{'p50 ms':>12}{'p99 ms':>12}{'mean ms':>12}")
+    for name, r in (("rebuild-per-call", rebuild), ("pooled+indexed", pooled)):
+        print(f"{name:<18}{r['calls']:>7}{r['p50_ms']:>12.3f}{r['p99_ms']:>12.3f}{r['mean_ms']:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark: ex10 `sales_data_tool` list-of-dicts scans vs the columnar, indexed SalesStore.
+
+    python bench_sales_store.py --rows 10000000 --calls 200
+
+The list path replays what the original tool did (comprehensions with .lower() on every
+row); it is capped by --scan-calls to keep runs short. Memory is the tracemalloc peak
+while building each representation (for the store, above what was allocated before).
+"""
+import argparse
+import random
+import statistics
+import time
+import tracemalloc
+from datetime import date
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sales_store import SalesStore
+
+REGIONS = ["NA", "EU", "APAC", "LATAM", "MEA"]
+PRODUCTS = ["Core", "Pro", "Enterprise", "Starter"]
+
+Query = Tuple[int, int, Optional[str], Optional[str]]
+
+
+def synthetic_rows(n: int, seed: int = 7) -> List[Dict]:
+    rnd = random.Random(seed)
+    first = date(2020, 1, 1).toordinal()
+    return [
+        {
+            "date": (date.fromordinal(first + rnd.randrange(6 * 365))).isoformat(),
+            "sales": rnd.randrange(1_000, 50_000),
+            "region": rnd.choice(REGIONS),
+            "product": rnd.choice(PRODUCTS),
+        }
+        for _ in range(n)
+    ]
+
+
+def queries(count: int, seed: int = 11) -> List[Query]:
+    rnd = random.Random(seed)
+    return [
+        (
+            rnd.randrange(2020, 2026),
+            rnd.randrange(1, 13),
+            rnd.choice([None, *REGIONS]),
+            rnd.choice([None, *PRODUCTS]),
+        )
+        for _ in range(count)
+    ]
+
+
+def list_scan(rows: List[Dict], q: Query) -> int:
+    year, month, region, product = q
+    prefix = f"{year:04d}-{month:02d}-"
+    selected = [r for r in rows if r["date"].startswith(prefix)]
+    if region:
+        selected = [r for r in selected if r["region"].lower() == region.lower()]
+    if product:
+        selected = [r for r in selected if r["product"].lower() == product.lower()]
+    return sum(r["sales"] for r in selected)
+
+
+def measure(fn: Callable[[Query], int], qs: List[Query]) -> Dict[str, float]:
+    latencies = []
+    for q in qs:
+        start = time.perf_counter()
+        fn(q)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return {
+        "calls": len(qs),
+        "p50_ms": statistics.median(latencies),
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+        "mean_ms": statistics.fmean(latencies),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--scan-calls", type=int, default=10)
+    args = parser.parse_args()
+
+    tracemalloc.start()
+    rows = synthetic_rows(args.rows)
+    list_bytes = tracemalloc.get_traced_memory()[1]
+
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    store = SalesStore.from_rows(rows)
+    build_s = time.perf_counter() - start
+    store_bytes = tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+
+    qs = queries(args.calls)
+    indexed = measure(lambda q: store.total(store.select(*q)), qs)
+    scanned = measure(lambda q: list_scan(rows, q), qs[: args.scan_calls])
+
+    print(f"rows={args.rows:,}  one-time build={build_s:.2f}s")
+    print(f"peak memory: list of dicts {list_bytes / 2**20:,.1f} MiB, columnar store {store_bytes / 2**20:,.1f} MiB")
+    print(f"{'path':<18}{'calls':>7}{'p50 ms':>12}{'p99 ms':>12}{'mean ms':>12}")
+    for name, r in (("list-of-dicts", scanned), ("columnar+indexed", indexed)):
+        print(f"{name:<18}{r['calls']:>7}{r['p50_ms']:>12.3f}{r['p99_ms']:>12.3f}{r['mean_ms']:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
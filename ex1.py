@@ -1,27 +1,17 @@
 import asyncio
 import os
 from dotenv import find_dotenv, load_dotenv
-from openai import AsyncOpenAI
-from agents import Agent, OpenAIChatCompletionsModel, Runner
+from agents import Agent, Model
+from router import get_cascade
+from streaming import run_and_print
 
 _: bool = load_dotenv(find_dotenv())
 
 # ONLY FOR TRACING
 os.environ["OPENAI_API_KEY"] = os.getenv("OPENAI_API_KEY", "")
 
-gemini_api_key: str = os.getenv("GEMINI_API_KEY", "")
-
-# 1. Which LLM Service?
-external_client: AsyncOpenAI = AsyncOpenAI(
-    api_key=gemini_api_key,
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-)
-
-# 2. Which LLM Model?
-llm_model: OpenAIChatCompletionsModel = OpenAIChatCompletionsModel(
-    model="gemini-2.0-flash",
-    openai_client=external_client
-)
+# LLM: fast model first, escalating to the strong one only for empty or hedged answers (see router.py)
+llm_model: Model = get_cascade()
 
 agent:Agent=Agent(
     name="Reasoning Assistant",
@@ -30,7 +20,7 @@ agent:Agent=Agent(
 )
 
 async def main():
-    result = await Runner.run(agent,"Determine if 42 is even or odd. Think step by step and explain your reasoning.")
-    print(result.final_output)
+    await run_and_print(agent,"Determine if 42 is even or odd. Think step by step and explain your reasoning.")
 
-asyncio.run(main())
+if __name__ == "__main__":
+    asyncio.run(main())
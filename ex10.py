@@ -1,25 +1,29 @@
 # ex10.py
 import asyncio
 import os
-from typing import List, Optional, Dict
+from itertools import islice
+from typing import Any, Optional, Dict
 from pydantic import BaseModel, Field
-from agents import Agent, OpenAIChatCompletionsModel, Runner, function_tool
+from agents import Agent
+from llm import OPENAI_BASE_URL, get_model
+from router import get_cascade
+from sales_store import get_sales_store
+from streaming import run_and_print
+from tool_encoding import compact_tool
 from dotenv import load_dotenv, find_dotenv
-from openai import AsyncOpenAI
 
 # ── Env ────────────────────────────────────────────────────────────────────────
 load_dotenv(find_dotenv())
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
+# Rows returned per sales_data_tool call; the total always covers every matching row
+SALES_TOOL_MAX_ROWS = int(os.getenv("SALES_TOOL_MAX_ROWS", "50"))
 
-# Use Gemini (OpenAI-compatible) if provided, else default to OpenAI model id
+# Use Gemini (OpenAI-compatible) if provided, else default to OpenAI model id.
+# A single tool lookup rarely needs the strong model: try the fast one first.
 if GEMINI_API_KEY:
-    external_client = AsyncOpenAI(
-        api_key=GEMINI_API_KEY,
-        base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-    )
-    model = OpenAIChatCompletionsModel("gemini-2.5-flash", openai_client=external_client)
+    model = get_cascade()
 else:
-    model = OpenAIChatCompletionsModel("gpt-4o-mini")
+    model = get_model("gpt-4o-mini", base_url=OPENAI_BASE_URL)
 
 # ── Tool Schemas ───────────────────────────────────────────────────────────────
 class SalesQuery(BaseModel):
@@ -28,39 +32,30 @@ class SalesQuery(BaseModel):
     region: Optional[str] = Field(None, description="Optional region filter")
     product: Optional[str] = Field(None, description="Optional product filter")
 
-# ── Mock Sales Data Source (replace with real DB/API as needed) ────────────────
-MOCK_MARCH_2025: List[Dict] = [
-    {"date": "2025-03-01", "sales": 12450, "region": "NA", "product": "Core"},
-    {"date": "2025-03-08", "sales": 13980, "region": "EU", "product": "Core"},
-    {"date": "2025-03-15", "sales": 15210, "region": "APAC", "product": "Pro"},
-    {"date": "2025-03-22", "sales": 16175, "region": "NA", "product": "Pro"},
-    {"date": "2025-03-29", "sales": 17040, "region": "EU", "product": "Core"},
-]
-
-# ── Tool: sales_data_tool ──────────────────────────────────────────────────────
-@function_tool
-def sales_data_tool(query: SalesQuery) -> Dict[str, List[str]]:
+# ── Tool: sales_data_tool (columnar, indexed store; see sales_store.py) ───────
+# Rows go to the model as one compact table, not as pre-formatted lines (see tool_encoding.py)
+@compact_tool
+def sales_data_tool(query: SalesQuery) -> Dict[str, Any]:
     """
-    Retrieve sales figures for a given month/year.
-    Returns a flat list of strings for quick display.
+    Retrieve sales figures (USD) for a given month/year.
+    Returns the total over all matching rows, the number of matching rows, and at most
+    SALES_TOOL_MAX_ROWS of the rows themselves (narrow by region/product for the rest).
     """
-    if query.year == 2025 and query.month == 3:
-        rows = MOCK_MARCH_2025
-    else:
-        rows = []  # in a real tool, query your DB/API here
-
-    # Optional filters
-    if query.region:
-        rows = [r for r in rows if r["region"].lower() == query.region.lower()]
-    if query.product:
-        rows = [r for r in rows if r["product"].lower() == query.product.lower()]
+    store = get_sales_store()
+    ids = store.select(query.year, query.month, query.region, query.product)
 
-    if not rows:
-        return {"items": ["No sales data found for the requested period/filters."]}
+    if not ids:
+        return {"message": "No sales data found for the requested period/filters."}
 
-    # Return quick list lines like: "2025-03-01 — $12,450"
-    items = [f'{r["date"]} — ${r["sales"]:,}'for r in rows]
-    return {"items": items}
+    # Only the rows that are returned are materialised
+    result: Dict[str, Any] = {
+        "sales": list(islice(store.rows(ids), SALES_TOOL_MAX_ROWS)),
+        "total": store.total(ids),
+        "rows": len(ids),
+    }
+    if len(ids) > SALES_TOOL_MAX_ROWS:
+        result["omitted"] = len(ids) - SALES_TOOL_MAX_ROWS
+    return result
 
 # ── Agent ─────────────────────────────────────────────────────────────────────
 agent = Agent(
@@ -70,7 +65,7 @@ agent = Agent(
     instructions=(
         "You are a precise data assistant. "
         "When asked for sales figures, call `sales_data_tool` with the correct year and month. "
-        "Return results quickly as a simple list (one item per line). "
+        "Return results quickly as a simple list (one item per line, like: 2025-03-01 — $12,450). "
         "Do not add extra commentary."
     ),
 )
@@ -85,9 +80,8 @@ async def main():
 
     # Optional: you can also nudge the tool args via few-shot in the prompt,
     # but the agent should infer (year=2025, month=3) from the text.
-    result = await Runner.run(agent, corrected_prompt)
     # Print exactly what the agent returns (ideally a list)
-    print(result.final_output if hasattr(result, "final_output") else result)
+    await run_and_print(agent, corrected_prompt)
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -1,53 +1,59 @@
 import asyncio
 import os
-from typing import List, Dict
+from typing import List, Dict, Optional, Union
 from dotenv import find_dotenv, load_dotenv
-from openai import AsyncOpenAI
 from pydantic import BaseModel
 
-from agents import Agent, Runner, function_tool, OpenAIChatCompletionsModel
+from agents import Agent, Model
+from llm import FAST_MODEL, get_model
+from stats_engine import compute_stats, iter_dataset, register_dataset
+from tool_encoding import compact_tool
+from usage import run_metered
 
 _: bool = load_dotenv(find_dotenv())
 
 # ONLY FOR TRACING
 os.environ["OPENAI_API_KEY"] = os.getenv("OPENAI_API_KEY", "")
 
-gemini_api_key: str = os.getenv("GEMINI_API_KEY", "")
-
-# 1. Which LLM Service?
-external_client: AsyncOpenAI = AsyncOpenAI(
-    api_key=gemini_api_key,
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-)
-
-# 2. Which LLM Model?
-llm_model: OpenAIChatCompletionsModel = OpenAIChatCompletionsModel(
-    model="gemini-2.0-flash",
-    openai_client=external_client
-)
+# LLM: shared, lazily-built client/model (see llm.py)
+llm_model: Model = get_model(FAST_MODEL)
 
 # ---- Tool for analyzing trends ----
 class TrendResult(BaseModel):
     trends: List[Dict[str, str]]  # each trend has a 'trend' and 'impact'
 
 
-@function_tool
-def stats_tool(dataset: List[int]) -> TrendResult:
+@compact_tool
+def stats_tool(
+    dataset: Optional[List[float]] = None,
+    dataset_ref: Optional[str] = None,
+    window: int = 3,
+) -> Union[TrendResult, str]:
     """
-    Analyze a dataset and return the top 3 trends in a table format.
-    Keeps context small and structured.
+    Analyze a dataset and return its key trends in a table format.
+    Pass small series inline as `dataset`, or large ones by `dataset_ref` (a dataset ID
+    or file name in the data directory) so the values never enter the conversation.
+    `window` is the moving-average length. Keeps context small and structured.
     """
-    if not dataset:
-        return TrendResult(trends=[])
-
-    avg = sum(dataset) / len(dataset)
-    max_val = max(dataset)
-    min_val = min(dataset)
-
+    if dataset_ref:
+        stats = compute_stats(iter_dataset(dataset_ref), window)
+    else:
+        stats = compute_stats([dataset or []], window)
+    if stats.count == 0:
+        return "No data points to analyze: pass a non-empty `dataset` or the `dataset_ref` of a non-empty dataset."
+
+    s = stats.as_dict()
+    direction = "rising" if s["slope"] > 0 else "falling" if s["slope"] < 0 else "flat"
     results = [
-        {"trend": "Average Value", "impact": f"{avg:.2f}"},
-        {"trend": "Maximum Value", "impact": str(max_val)},
-        {"trend": "Minimum Value", "impact": str(min_val)},
+        {"trend": "Average Value", "impact": f"{s['mean']:.2f}"},
+        {"trend": "Maximum Value", "impact": f"{s['max']:g}"},
+        {"trend": "Minimum Value", "impact": f"{s['min']:g}"},
+        {"trend": "Overall Direction", "impact": f"{direction}, {s['slope']:+.3f} per step"},
+        {"trend": "Variability", "impact": f"std dev {s['std']:.2f} over {s['count']} points"},
+        {
+            "trend": f"Moving Average ({window})",
+            "impact": f"{s['first_moving_average']:.2f} -> {s['last_moving_average']:.2f}",
+        },
     ]
     return TrendResult(trends=results)
 
@@ -67,18 +73,23 @@ async def main():
 
     # Prompt 1 (vague)
     prompt1="Analyze trends in this dataset: " + str(dataset)
-    resp1 = await Runner.run(agent,prompt1)
 
-    # Prompt 2 (specific, optimized)
-    prompt2=f"Analyze trends in this dataset using the stats tool: {str(dataset)} Limit to top 3 trends in a table, keeping context under 500 tokens."
-    resp2 = await Runner.run(agent,
-        prompt2
+    # Prompt 2 (specific, optimized): the data is passed by reference, not pasted into the prompt
+    register_dataset("ex11-sample", dataset)
+    prompt2="Analyze trends in dataset 'ex11-sample' using the stats tool (pass it as dataset_ref). Limit to top 3 trends in a table, keeping context under 500 tokens."
+
+    # The two runs are independent, so run them concurrently
+    (resp1, usage1), (resp2, usage2) = await asyncio.gather(
+        run_metered(agent, prompt1, exercise="ex11"),
+        run_metered(agent, prompt2, exercise="ex11"),
     )
 
     print("\n--- Prompt 1 (Vague) ---")
     print(resp1.final_output)
+    print(f"[tokens: {usage1.total_tokens}]")
     print("\n--- Prompt 2 (Optimized) ---")
     print(resp2.final_output)
+    print(f"[tokens: {usage2.total_tokens}]")
 
 
 if __name__ == "__main__":
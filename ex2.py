@@ -1,45 +1,54 @@
+import asyncio
 import os
 from dotenv import find_dotenv, load_dotenv
-from openai import AsyncOpenAI
-import requests
-from agents import Agent, OpenAIChatCompletionsModel, Runner, function_tool
+from agents import Agent, Model, function_tool
+from llm import FAST_MODEL, get_model
+from cache import TTLCache
+from http_client import get_http_client
+from streaming import run_and_print
 
 _: bool = load_dotenv(find_dotenv())
 
 # ONLY FOR TRACING
 os.environ["OPENAI_API_KEY"] = os.getenv("OPENAI_API_KEY", "")
 
-gemini_api_key: str = os.getenv("GEMINI_API_KEY", "")
-
-# 1. Which LLM Service?
-external_client: AsyncOpenAI = AsyncOpenAI(
-    api_key=gemini_api_key,
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-)
-
-# 2. Which LLM Model?
-llm_model: OpenAIChatCompletionsModel = OpenAIChatCompletionsModel(
-    model="gemini-2.0-flash",
-    openai_client=external_client
-)
+# LLM: shared, lazily-built client/model (see llm.py)
+llm_model: Model = get_model(FAST_MODEL)
 
 # Your OpenWeather API key (free tier works fine)
 OPENWEATHER_API_KEY = os.getenv("OPENWEATHER_API_KEY")
+OPENWEATHER_BASE_URL = os.getenv("OPENWEATHER_BASE_URL", "http://api.openweathermap.org")
+
+# Current weather changes slowly; reuse lookups for WEATHER_CACHE_TTL seconds.
+# weather_cache.stats() shows hits, misses and coalesced concurrent lookups.
+WEATHER_CACHE_TTL = float(os.getenv("WEATHER_CACHE_TTL", "600"))
+weather_cache: TTLCache[tuple, dict] = TTLCache(ttl=WEATHER_CACHE_TTL, maxsize=1024)
+
+
+async def fetch_weather(city: str, country: str) -> dict:
+    """Single upstream OpenWeather call on the shared keep-alive client."""
+    resp = await get_http_client().get(
+        f"{OPENWEATHER_BASE_URL}/data/2.5/weather",
+        params={"q": f"{city},{country}", "appid": OPENWEATHER_API_KEY, "units": "metric"},
+    )
+    resp.raise_for_status()
+    response = resp.json()
+
+    return {
+        "temperature": response["main"]["temp"],
+        "condition": response["weather"][0]["description"]
+    }
 
 # Define the weather tool
 @function_tool
-def get_weather(city: str, country: str = "UK") -> dict:
+async def get_weather(city: str, country: str = "UK") -> dict:
     """
     Fetches the current weather for a city using OpenWeather API.
     Returns temperature (°C) and weather condition.
     """
-    url = f"http://api.openweathermap.org/data/2.5/weather?q={city},{country}&appid={OPENWEATHER_API_KEY}&units=metric"
-    response = requests.get(url).json()
-
-    return {
-        "temperature": response["main"]["temp"],
-        "condition": response["weather"][0]["description"]
-    }
+    key = (city.strip().lower(), country.strip().upper())
+    # Concurrent runs asking for the same city share one in-flight request
+    return await weather_cache.get_or_fetch(key, lambda: fetch_weather(city, country))
 
 # Define the model (GPT-4.1 or GPT-4o recommended)
 #model = OpenAIChatCompletionsModel("gpt-4o-mini")
@@ -53,7 +62,11 @@ agent = Agent(
 )
 
 # Run the agent with the Exercise 2 prompt
+prompt = "Use the weather API tool to get the current weather in Karachi, Pakistan. Return the temperature and condition."
+
+def main():
+    asyncio.run(run_and_print(agent,prompt))
 
-result = Runner.run_sync(agent,"Use the weather API tool to get the current weather in Karachi, Pakistan. Return the temperature and condition.")
+if __name__ == "__main__":
+    main()
 
-print(result.final_output)
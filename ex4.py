@@ -1,26 +1,17 @@
+import asyncio
 import os
 from dotenv import find_dotenv, load_dotenv
-from openai import AsyncOpenAI
-from agents import Agent, OpenAIChatCompletionsModel, Runner
+from agents import Agent, Model
+from llm import FAST_MODEL, get_model
+from streaming import run_and_print
 
 _: bool = load_dotenv(find_dotenv())
 
 # ONLY FOR TRACING
 os.environ["OPENAI_API_KEY"] = os.getenv("OPENAI_API_KEY", "")
 
-gemini_api_key: str = os.getenv("GEMINI_API_KEY", "")
-
-# 1. Which LLM Service?
-external_client: AsyncOpenAI = AsyncOpenAI(
-    api_key=gemini_api_key,
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-)
-
-# 2. Which LLM Model?
-llm_model: OpenAIChatCompletionsModel = OpenAIChatCompletionsModel(
-    model="gemini-2.0-flash",
-    openai_client=external_client
-)
+# LLM: shared, lazily-built client/model (see llm.py)
+llm_model: Model = get_model(FAST_MODEL)
 agent = Agent(
     name="cost agent",
     instructions="You are a professional AI assistant. "
@@ -30,5 +21,8 @@ agent = Agent(
 )
 prompt="Respond to this query in a concise, professional tone: 'What are the ethical concerns of AI?' Limit to 50 words."
 
-result=Runner.run_sync(agent,prompt)
-print(result.final_output)
\ No newline at end of file
+def main():
+    asyncio.run(run_and_print(agent,prompt))
+
+if __name__ == "__main__":
+    main()
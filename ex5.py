@@ -1,64 +1,46 @@
+import asyncio
 import os
 import sqlite3
+from typing import Literal, Optional
 from dotenv import find_dotenv, load_dotenv
-from openai import AsyncOpenAI
-from agents import Agent, OpenAIChatCompletionsModel, Runner, function_tool
+from agents import Agent, Model, function_tool
+from llm import FAST_MODEL, get_model
+from sales_db import get_sales_db
+from streaming import run_and_print
 
 _: bool = load_dotenv(find_dotenv())
 
 # ONLY FOR TRACING
 os.environ["OPENAI_API_KEY"] = os.getenv("OPENAI_API_KEY", "")
 
-gemini_api_key: str = os.getenv("GEMINI_API_KEY", "")
-
-# 1. Which LLM Service?
-external_client: AsyncOpenAI = AsyncOpenAI(
-    api_key=gemini_api_key,
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-)
-
-# 2. Which LLM Model?
-llm_model: OpenAIChatCompletionsModel = OpenAIChatCompletionsModel(
-    model="gemini-2.0-flash",
-    openai_client=external_client
-)
+# LLM: shared, lazily-built client/model (see llm.py)
+llm_model: Model = get_model(FAST_MODEL)
 
 # -------------------------
 # Step 1: Mock Database Tool
 # -------------------------
 @function_tool
-def query_sales(q: str) -> dict:
-    """
-    Executes a SQL query on a mock SQLite database.
-    Returns results as a list of rows (for demonstration).
+def query_sales(q: str, mode: Literal["rows", "summary"] = "rows", cursor: Optional[str] = None) -> dict:
     """
+    Executes a read-only SQL query on the sales database (table: sales(id, month, revenue)).
 
-    # Connect to an in-memory SQLite database
-    conn = sqlite3.connect(":memory:")
-    cursor = conn.cursor()
-
-    # Create sample sales data
-    cursor.execute("""
-    CREATE TABLE sales (
-        id INTEGER PRIMARY KEY,
-        month TEXT,
-        revenue INTEGER
-    )
-    """)
-    sample_data = [
-        ("Jan", 12000),
-        ("Feb", 15000),
-        ("Mar", 18000),
-        ("Apr", 10000)
-    ]
-    cursor.executemany("INSERT INTO sales (month, revenue) VALUES (?, ?)", sample_data)
-
-    # Run the provided query
-    cursor.execute(q)
-    rows = cursor.fetchall()
+    Args:
+        q: The SQL query. Prefer GROUP BY / SUM / AVG over fetching raw rows.
+        mode: "rows" returns one page of rows; "summary" returns the row count and
+            per-column count, distinct, min, max, sum and avg of the result instead.
+        cursor: The next_cursor of a previous page, sent with the same query, to get more rows.
+    """
 
-    conn.close()
-    return {"results": rows}
+    # Reuse the shared, pre-loaded and indexed database instead of rebuilding it
+    # on every call (see sales_db.py). Pages are capped in rows, bytes and time, so
+    # a careless SELECT * cannot flood memory or the next prompt.
+    db = get_sales_db()
+    try:
+        if mode == "summary":
+            return db.summarize(q)
+        return db.query_page(q, cursor=cursor).as_dict()
+    except (ValueError, TimeoutError, sqlite3.Error) as e:
+        return {"error": str(e)}
 
 
 # -------------------------
@@ -67,7 +49,8 @@ def query_sales(q: str) -> dict:
 agent=Agent(
     name="Data Agent",
     instructions="You are a data analyst. Use the database query tool to analyze sales data "
-        "and summarize findings in clear bullet points.",
+        "and summarize findings in clear bullet points. Let SQL do the aggregation, or use "
+        "mode='summary'; results come in pages, so only pass next_cursor if you need more rows.",
     tools=[query_sales],
     model=llm_model
 )
@@ -79,5 +62,8 @@ prompt = (
     "and identify trends for Q1 2025. Return results in bullet points."
 )
 
-result = Runner.run_sync(agent,prompt)
-print(result.final_output)
\ No newline at end of file
+def main():
+    asyncio.run(run_and_print(agent,prompt))
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,19 @@
+import asyncio
 import os
+import sys
 from dotenv import find_dotenv, load_dotenv
-from openai import AsyncOpenAI
-from agents import Agent, OpenAIChatCompletionsModel, Runner
+from agents import Agent, Model
+from llm import FAST_MODEL, get_model
+from streaming import STREAM_OUTPUT
+from summarize import summarize
 
 _: bool = load_dotenv(find_dotenv())
 
 # ONLY FOR TRACING
 os.environ["OPENAI_API_KEY"] = os.getenv("OPENAI_API_KEY", "")
 
-gemini_api_key: str = os.getenv("GEMINI_API_KEY", "")
-
-# 1. Which LLM Service?
-external_client: AsyncOpenAI = AsyncOpenAI(
-    api_key=gemini_api_key,
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-)
-
-# 2. Which LLM Model?
-llm_model: OpenAIChatCompletionsModel = OpenAIChatCompletionsModel(
-    model="gemini-2.0-flash",
-    openai_client=external_client
-)
+# LLM: shared, lazily-built client/model (see llm.py)
+llm_model: Model = get_model(FAST_MODEL)
 
 agent=Agent(
     name="Article Summary Agent",
@@ -79,5 +72,15 @@ article_text = (
 # Exercise 6 Prompt
 prompt = f"Summarize this 500-word article in 100 words: {article_text}"
 
-result = Runner.run_sync(agent,prompt)
-print(result.final_output)
\ No newline at end of file
+async def main():
+    # Long inputs are split into chunks, summarised concurrently and reduced to 100 words;
+    # an article this size fits in one chunk and is summarised in a single call.
+    if STREAM_OUTPUT:
+        # The final call prints the summary as it is generated
+        await summarize(agent, article_text, target_words=100, out=sys.stdout)
+        return
+    summary = await summarize(agent, article_text, target_words=100)
+    print(summary)
+
+if __name__ == "__main__":
+    asyncio.run(main())
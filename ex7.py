@@ -1,11 +1,19 @@
 import asyncio
+import math
 import os
+import re
 import httpx
-from typing import Dict, Any, Tuple
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Tuple
 from pydantic import BaseModel
 from dotenv import find_dotenv, load_dotenv
-from openai import AsyncOpenAI
-from agents import Agent, OpenAIChatCompletionsModel, Runner, function_tool
+from agents import Agent, Model
+from llm import STRONG_MODEL, get_model
+from cache import TTLCache
+from geo_index import COUNTRY_CODES, US_STATE_CODES, get_geo_index
+from http_client import get_http_client
+from streaming import run_and_print
+from tool_encoding import compact_tool
 
 # Load env vars
 _ = load_dotenv(find_dotenv())
@@ -13,22 +21,27 @@ _ = load_dotenv(find_dotenv())
 # (Optional) ONLY FOR TRACING IN SOME SETUPS
 os.environ["OPENAI_API_KEY"] = os.getenv("OPENAI_API_KEY", "")
 
-# ---- LLM: Gemini via OpenAI-compatible endpoint ----
-gemini_api_key: str = os.getenv("GEMINI_API_KEY", "")
-external_client: AsyncOpenAI = AsyncOpenAI(
-    api_key=gemini_api_key,
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-)
-
-llm_model: OpenAIChatCompletionsModel = OpenAIChatCompletionsModel(
-    model="gemini-2.5-flash",
-    openai_client=external_client,
-)
+# LLM: shared, lazily-built client/model (see llm.py)
+llm_model: Model = get_model(STRONG_MODEL)
 
 # ---- ShipEngine ----
 SHIPENGINE_API_KEY = os.getenv("SHIPENGINE_API_KEY")
 if not SHIPENGINE_API_KEY:
     raise RuntimeError("Missing SHIPENGINE_API_KEY in environment.")
+SHIPENGINE_BASE_URL = os.getenv("SHIPENGINE_BASE_URL", "https://api.shipengine.com")
+
+# ---- Rate estimate cache ----
+# Quotes within the same weight bucket and route are reused for SHIPPING_QUOTE_TTL seconds
+SHIPPING_QUOTE_TTL = float(os.getenv("SHIPPING_QUOTE_TTL", "600"))
+SHIPPING_WEIGHT_BUCKET_KG = float(os.getenv("SHIPPING_WEIGHT_BUCKET_KG", "0.1"))
+_rate_cache: TTLCache[Tuple, Any] = TTLCache(ttl=SHIPPING_QUOTE_TTL, maxsize=4096)
+
+# Batch quotes: requests in flight at once, and shipments accepted per tool call
+SHIPPING_BATCH_CONCURRENCY = int(os.getenv("SHIPPING_BATCH_CONCURRENCY", "5"))
+SHIPPING_BATCH_MAX = int(os.getenv("SHIPPING_BATCH_MAX", "50"))
+
+# Dimensions are optional but improve estimate quality
+DEFAULT_DIMENSIONS: Tuple[float, float, float] = (30.0, 20.0, 10.0)  # length, width, height (cm)
 
 # ---------- Models ----------
 class ShippingCostResponse(BaseModel):
@@ -37,36 +50,60 @@ class ShippingCostResponse(BaseModel):
     step3: str
     final_cost: float
 
+class ShipmentRequest(BaseModel):
+    package_weight: float
+    origin: str
+    destination: str
+
+class BatchQuote(ShipmentRequest):
+    quote: Optional[ShippingCostResponse] = None
+    error: Optional[str] = None
+
+class BatchShippingResponse(BaseModel):
+    quotes: List[BatchQuote]
+
 # ---------- Helpers ----------
+@lru_cache(maxsize=4096)
 def resolve_location(city: str) -> Tuple[str, str]:
     """
-    Resolve a simple city name to (country_code, postal_code) for demo purposes.
-    Extend this mapping or accept structured input for production.
+    Resolve a city name (or alias, any case/accents) to (country_code, postal_code)
+    using the local place index (see geo_index.py). Explicit "City, CC POSTAL" input,
+    e.g. "Paris, FR 75001", is used as given when CC is an ISO country code, and
+    "City, ST 12345" is read as a US state and ZIP code.
+    Raises ValueError for unknown places instead of quoting a wrong route.
     """
-    city_key = city.strip().lower()
-
-    # Minimal demo mapping
-    presets = {
-        "new york": ("US", "10001"),
-        "nyc": ("US", "10001"),
-        "paris": ("FR", "75001"),
-        # Add more as needed...
-    }
+    parts = city.split(",")
+    if len(parts) == 2:
+        cc_and_postal = parts[1].strip().split()
+        if len(cc_and_postal) >= 2 and len(cc_and_postal[0]) == 2:
+            code, postal = cc_and_postal[0].upper(), " ".join(cc_and_postal[1:])
+            # Checked first: CA, IN, DE, ... are states as well as countries
+            if code in US_STATE_CODES and re.fullmatch(r"\d{5}(-\d{4})?", postal):
+                return ("US", postal)
+            if code in COUNTRY_CODES:
+                return (code, postal)
 
-    if city_key in presets:
-        return presets[city_key]
+    index = get_geo_index()
+    found = index.lookup(city)
+    if found is not None:
+        return found
 
-    # Fallback: simple heuristics (very naive)
-    # Expect "City, CC POSTAL" -> e.g., "Paris, FR 75001"
-    # Use only if you want loose parsing:
-    # parts = city.split(",")
-    # if len(parts) == 2:
-    #     cc_and_postal = parts[1].strip().split()
-    #     if len(cc_and_postal) >= 2:
-    #         return (cc_and_postal[0].upper(), cc_and_postal[-1])
+    # A prefix that names exactly one place ("san fran") is unambiguous enough
+    candidates = index.complete(city, limit=5) if len(city.strip()) >= 3 else []
+    if len({(cc, postal) for _, cc, postal in candidates}) == 1:
+        _, cc, postal = candidates[0]
+        return (cc, postal)
 
-    # If we cannot resolve, default to US 10001 to avoid 400 due to empty fields
-    return ("US", "10001")
+    hint = f" Did you mean: {', '.join(name for name, _, _ in candidates)}?" if candidates else ""
+    raise ValueError(
+        f"Unknown or ambiguous location {city!r}.{hint} Qualify it with a country code, e.g. 'Paris FR', "
+        "or pass it as 'City, CC POSTAL', e.g. 'Paris, FR 75001'."
+    )
+
+def weight_bucket(package_weight_kg: float) -> float:
+    """Round a weight up to the next SHIPPING_WEIGHT_BUCKET_KG step (never under-quote)."""
+    steps = math.ceil(round(float(package_weight_kg) / SHIPPING_WEIGHT_BUCKET_KG, 6))
+    return round(steps * SHIPPING_WEIGHT_BUCKET_KG, 3)
 
 async def get_shipping_rate_estimate(
     package_weight_kg: float,
@@ -77,7 +114,7 @@ async def get_shipping_rate_estimate(
     Calls ShipEngine /v1/rates/estimate with structured data.
     NOTE: We intentionally DO NOT send carrier_ids here to avoid invalid placeholder IDs.
     """
-    url = "https://api.shipengine.com/v1/rates/estimate"
+    url = f"{SHIPENGINE_BASE_URL}/v1/rates/estimate"
     headers = {
         "API-Key": SHIPENGINE_API_KEY,
         "Content-Type": "application/json",
@@ -85,6 +122,10 @@ async def get_shipping_rate_estimate(
 
     from_country, from_postal = resolve_location(origin_city)
     to_country, to_postal = resolve_location(destination_city)
+    weight = weight_bucket(package_weight_kg)
+    length, width, height = DEFAULT_DIMENSIONS
+
+    cache_key = (from_country, from_postal, to_country, to_postal, weight, DEFAULT_DIMENSIONS)
 
     payload: Dict[str, Any] = {
         #"carrier_ids": ["se-1646315","se-1646316","se-1646317","se-1646383","se-3004923"],  # Omit unless you have real carrier IDs connected
@@ -93,21 +134,22 @@ async def get_shipping_rate_estimate(
         "to_country_code": to_country,
         "to_postal_code": to_postal,
         "weight": {
-            "value": float(package_weight_kg),
+            "value": weight,
             "unit": "kilogram",
         },
-        # Dimensions are optional but improve estimate quality
         "dimensions": {
             "unit": "centimeter",
-            "length": 30.0,
-            "width": 20.0,
-            "height": 10.0,
+            "length": length,
+            "width": width,
+            "height": height,
         },
         "confirmation": "none",
         "address_residential_indicator": "no",
     }
 
-    async with httpx.AsyncClient(timeout=30) as client:
+    async def fetch() -> Any:
+        # Shared keep-alive client: no new TCP+TLS handshake per quote
+        client = get_http_client()
         resp = await client.post(url, headers=headers, json=payload)
         # Raise for HTTP errors so we can surface the error details below
         try:
@@ -121,25 +163,15 @@ async def get_shipping_rate_estimate(
             raise RuntimeError(
                 f"ShipEngine API error ({resp.status_code}): {err_json}"
             ) from e
-
         return resp.json()
 
-# ---------- Tool ----------
-@function_tool
-async def calculate_shipping(
-    package_weight: float,
-    origin: str,
-    destination: str
-) -> ShippingCostResponse:
-    """
-    Tool: Calculate shipping using ShipEngine estimate endpoint.
-    Returns step-by-step explanation + final cost.
-    """
+    # Concurrent quotes for the same route and weight bucket share one request
+    return await _rate_cache.get_or_fetch(cache_key, fetch)
+
+async def quote_shipping(package_weight: float, origin: str, destination: str) -> ShippingCostResponse:
+    """Query the estimate endpoint for one shipment and shape the answer as ShippingCostResponse."""
     # Step 1: Query API
-    step1 = (
-        f"Queried ShipEngine /v1/rates/estimate for {package_weight} kg "
-        f"from '{origin}' to '{destination}', including weight and dimensions."
-    )
+    step1 = f"Queried ShipEngine /v1/rates/estimate: {package_weight:g} kg, {origin} -> {destination}."
 
     api_response = await get_shipping_rate_estimate(
         package_weight_kg=package_weight,
@@ -176,7 +208,7 @@ async def calculate_shipping(
     else:
         raise RuntimeError(f"Unexpected ShipEngine response shape: {api_response}")
 
-    step2 = f"Processed response: found cost={cost} {currency} (first available estimate)."
+    step2 = f"First available estimate: {cost:g} {(currency or '').upper()}."
 
     # Step 3: Return structured result
     step3 = "Returned final shipping cost in structured format."
@@ -188,31 +220,92 @@ async def calculate_shipping(
         final_cost=cost if cost is not None else -1.0,
     )
 
+async def quote_shipments(shipments: List[ShipmentRequest]) -> List[BatchQuote]:
+    """
+    Quote many shipments with at most SHIPPING_BATCH_CONCURRENCY requests in flight.
+    Shipments that resolve to the same route and weight bucket are quoted once.
+    A shipment that fails gets an error entry; the others are still returned.
+    """
+    semaphore = asyncio.Semaphore(SHIPPING_BATCH_CONCURRENCY)
+
+    async def quote(s: ShipmentRequest) -> ShippingCostResponse:
+        async with semaphore:
+            return await quote_shipping(s.package_weight, s.origin, s.destination)
+
+    tasks: Dict[Tuple, "asyncio.Task[ShippingCostResponse]"] = {}
+    keys: List[Optional[Tuple]] = []
+    errors: Dict[int, str] = {}
+    for i, s in enumerate(shipments):
+        try:
+            key = (weight_bucket(s.package_weight), resolve_location(s.origin), resolve_location(s.destination))
+        except ValueError as e:
+            keys.append(None)
+            errors[i] = str(e)
+            continue
+        keys.append(key)
+        if key not in tasks:
+            tasks[key] = asyncio.ensure_future(quote(s))
+    if tasks:
+        await asyncio.wait(tasks.values())
+
+    results = []
+    for i, (s, key) in enumerate(zip(shipments, keys)):
+        item = BatchQuote(package_weight=s.package_weight, origin=s.origin, destination=s.destination)
+        if key is None:
+            item.error = errors[i]
+        elif tasks[key].exception() is not None:
+            item.error = str(tasks[key].exception())
+        else:
+            item.quote = tasks[key].result()
+        results.append(item)
+    return results
+
+# ---------- Tools ----------
+# Results reach the model as compact JSON without nulls and defaults (see tool_encoding.py)
+@compact_tool
+async def calculate_shipping(
+    package_weight: float,
+    origin: str,
+    destination: str
+) -> ShippingCostResponse:
+    """
+    Tool: Calculate shipping using ShipEngine estimate endpoint.
+    Returns step-by-step explanation + final cost.
+    """
+    return await quote_shipping(package_weight, origin, destination)
+
+@compact_tool
+async def calculate_shipping_batch(shipments: List[ShipmentRequest]) -> BatchShippingResponse:
+    """
+    Tool: Calculate shipping for several shipments at once, e.g. one package to many
+    destinations. Use this instead of repeated calculate_shipping calls when comparing
+    options. Returns one entry per shipment, in order, each with its quote or an error.
+    """
+    if len(shipments) > SHIPPING_BATCH_MAX:
+        raise ValueError(f"At most {SHIPPING_BATCH_MAX} shipments per call; got {len(shipments)}.")
+    return BatchShippingResponse(quotes=await quote_shipments(shipments))
+
 # ---------- Agent ----------
 agent = Agent(
     name="Shipping Agent",
     instructions=(
         "You are a shipping assistant. "
         "When the user asks for costs, call the tool and then present: "
-        "1) query step, 2) processing step, 3) final cost. Be concise and clear."
+        "1) query step, 2) processing step, 3) final cost. "
+        "To compare several shipments or destinations, call calculate_shipping_batch once "
+        "instead of calculate_shipping repeatedly. Be concise and clear."
     ),
-    tools=[calculate_shipping],
+    tools=[calculate_shipping, calculate_shipping_batch],
     model=llm_model,
 )
 
 # ---------- Runner ----------
 async def main():
-    result = await Runner.run(
+    await run_and_print(
         agent,
         "Calculate shipping costs for a 5kg package from New York to Paris using the ShipEngine API. "
         "Show your steps: 1) query API, 2) process data, 3) return cost."
     )
-    # Depending on your Agents SDK version, you might access either:
-    # print(result) or print(result.final_output). We'll print both safely.
-    try:
-        print(result.final_output)
-    except AttributeError:
-        print(result)
 
 if __name__ == "__main__":
     asyncio.run(main())
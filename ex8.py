@@ -1,37 +1,37 @@
 import asyncio
-from agents import Agent, OpenAIChatCompletionsModel, Runner, set_tracing_disabled
+from typing import List, Optional
+from pydantic import BaseModel, Field
+from agents import Agent, Runner
+from llm import FAST_MODEL, get_model
+from memory import SlidingWindowSession
+from router import get_cascade
+from structured import JsonObjectValidator
 import os
 from dotenv import find_dotenv, load_dotenv
-from openai import AsyncOpenAI
-from agents import Agent, OpenAIChatCompletionsModel, Runner
 
 _: bool = load_dotenv(find_dotenv())
 
 # ONLY FOR TRACING
 os.environ["OPENAI_API_KEY"] = os.getenv("OPENAI_API_KEY", "")
 
-gemini_api_key: str = os.getenv("GEMINI_API_KEY", "")
-
-# 1. Which LLM Service?
-external_client: AsyncOpenAI = AsyncOpenAI(
-    api_key=gemini_api_key,
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-)
-
-# 2. Which LLM Model?
-llm_model: OpenAIChatCompletionsModel = OpenAIChatCompletionsModel(
-    model="gemini-2.5-flash",
-    openai_client=external_client
-)
-# Disable tracing for clean output
-set_tracing_disabled(True)
+# Tracing: TRACE_EXPORT=chrome|jsonl writes local traces (see trace_export.py);
+# without it or an OPENAI_API_KEY, tracing is off (see llm.py)
 
 # Define the model
 # model = OpenAIChatCompletionsModel("gpt-4o-mini")
 
+# Typed output: the SDK requests this schema and parses the answer into it
+class ProfileSummary(BaseModel):
+    summary: str
+    headline: Optional[str] = None
+    top_skills: List[str] = Field(default_factory=list)
+
 # Build the agent
 profile_agent = Agent(
-    model=llm_model,
+    # Streamed JSON is checked as it arrives: an off-schema answer from the fast model is
+    # cut short and escalated to the strong one, which gets retries (see router.py)
+    model=get_cascade(validator=lambda: JsonObjectValidator(ProfileSummary)),
+    output_type=ProfileSummary,
     name="Profile Summarizer",
     instructions=(
         "You are an assistant that summarizes user profiles into JSON. "
@@ -40,6 +40,16 @@ profile_agent = Agent(
     ),
 )
 
+# Folds old turns into a rolling summary once the session outgrows its token budget
+memory_summarizer = Agent(
+    model=get_model(FAST_MODEL),
+    name="Memory Summarizer",
+    instructions="You condense conversation history into a short factual summary.",
+)
+
+# The agent batch.py, server.py and `main.py run ex8 "..."` use for this exercise
+AGENT = profile_agent
+
 async def main():
     # Example profile data
     profile_data = """
@@ -53,10 +63,20 @@ async def main():
     # Effective Prompt
     user_prompt = f"Summarize this user profile in JSON: {profile_data}. Start with: {{'summary':"
 
-    # Run the agent
-    
-    response = await Runner.run(profile_agent,user_prompt)
-    print(response.final_output)
+    # Run the agent; the session carries the conversation into follow-up turns
+    # while keeping the history sent per turn within a fixed token budget
+    session = SlidingWindowSession("profile", summarizer=memory_summarizer)
+
+    response = await Runner.run(profile_agent,user_prompt, session=session)
+    print(response.final_output.model_dump_json())
+
+    follow_ups = [
+        "Add a one-line headline for this profile to the JSON.",
+        "Which of these skills matter most for building AI agents? Answer in the same JSON.",
+    ]
+    for follow_up in follow_ups:
+        response = await Runner.run(profile_agent, follow_up, session=session)
+        print(response.final_output.model_dump_json())
 
 if __name__ == "__main__":
     asyncio.run(main())
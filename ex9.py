@@ -1,29 +1,19 @@
 import asyncio
 import os
 from dotenv import find_dotenv, load_dotenv
-from openai import AsyncOpenAI
 from pydantic import BaseModel
-from agents import Agent, OpenAIChatCompletionsModel, Runner, function_tool, set_tracing_disabled
+from agents import Agent, Model, ModelSettings
+from llm import STRONG_MODEL, get_model
+from streaming import run_and_print
+from tool_cache import pure_tool
 
-# Disable tracing (optional)
-#set_tracing_disabled(True)
+# Tracing: TRACE_EXPORT=chrome|jsonl writes local traces (see trace_export.py)
 _ = load_dotenv(find_dotenv())
 
 # API Keys
 os.environ["OPENAI_API_KEY"] = os.getenv("OPENAI_API_KEY", "")
-gemini_api_key: str = os.getenv("GEMINI_API_KEY", "")
-
-# 1. LLM Service
-external_client: AsyncOpenAI = AsyncOpenAI(
-    api_key=gemini_api_key,
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-)
-
-# 2. LLM Model
-llm_model: OpenAIChatCompletionsModel = OpenAIChatCompletionsModel(
-    model="gemini-2.5-flash",
-    openai_client=external_client,
-)
+# LLM: shared, lazily-built client/model (see llm.py)
+llm_model: Model = get_model(STRONG_MODEL)
 
 # -----------------------
 # Define Tool Schemas
@@ -39,8 +29,9 @@ class BudgetInput(BaseModel):
     content_creation: float
 
 
+# Both tools are pure: results are memoised per validated input (see tool_cache.py)
 # Fake analytics tool
-@function_tool
+@pure_tool
 def analytics_tool(data: AnalyticsInput):
     """Analyze target audience and competitors."""
     return {
@@ -49,7 +40,7 @@ def analytics_tool(data: AnalyticsInput):
     }
 
 # Fake budget calculator tool
-@function_tool
+@pure_tool
 def budget_calculator_tool(budget: BudgetInput):
     """Calculate total budget for marketing."""
     total = budget.advertising + budget.influencers + budget.content_creation
@@ -61,10 +52,13 @@ def budget_calculator_tool(budget: BudgetInput):
 marketing_agent = Agent(
     model=llm_model,
     tools=[analytics_tool, budget_calculator_tool],
+    # The tools are independent: ask for both in one turn, the SDK runs them concurrently
+    model_settings=ModelSettings(parallel_tool_calls=True),
     name="Marketing Planner",
     instructions=(
         "You are a marketing strategist. Use the analytics_tool and budget_calculator_tool "
         "to build a detailed 3-month marketing campaign plan. "
+        "They are independent, so call both in the same turn. "
         "Always include: strategy, timeline, and costs. "
         "Explain your reasoning step by step before giving the final structured plan."
     ),
@@ -80,9 +74,9 @@ async def main():
         "Explain your reasoning step by step."
     )
 
-    response = await Runner.run(marketing_agent, user_prompt)
     print("\n📌 Final Marketing Plan:\n")
-    print(response.final_output)
+    # Streamed as it is generated with STREAM_OUTPUT=1 (see streaming.py)
+    await run_and_print(marketing_agent, user_prompt)
 
 if __name__ == "__main__":
     asyncio.run(main())
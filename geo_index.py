@@ -0,0 +1,290 @@
+"""
+Compact place-name index: city names and aliases -> (country_code, postal_code).
+
+The index is one sorted, memory-mapped file, so every worker process shares the same
+OS page cache instead of holding its own dict. Lookups binary-search an offset table,
+and nothing is parsed up front.
+
+    python geo_index.py build allCountries.txt              # GeoNames postal-code dump
+    python geo_index.py build places.tsv --aliases aliases.tsv
+    python geo_index.py lookup "sao paulo"
+    python geo_index.py complete "san fr"
+
+Input is tab-separated, GeoNames layout (country, postal code, place, admin1, ...).
+Aliases are "alias<TAB>canonical place name" lines.
+"""
+import argparse
+import mmap
+import os
+import re
+import struct
+import sys
+import threading
+import unicodedata
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# ---- Config ----
+GEO_INDEX_PATH: str = os.getenv(
+    "GEO_INDEX_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "geo_index.bin")
+)
+
+MAGIC = b"GEOIDX1\0"
+_HEADER = struct.Struct("<8sI")  # magic, record count; then (count + 1) native uint32 offsets
+
+# Used when no index file has been built: (place, country_code, postal_code)
+SEED_PLACES: List[Tuple[str, str, str]] = [
+    ("New York", "US", "10001"),
+    ("Los Angeles", "US", "90012"),
+    ("Chicago", "US", "60601"),
+    ("San Francisco", "US", "94102"),
+    ("Seattle", "US", "98101"),
+    ("Boston", "US", "02108"),
+    ("Toronto", "CA", "M5H 2N2"),
+    ("London", "GB", "EC1A 1BB"),
+    ("Paris", "FR", "75001"),
+    ("Berlin", "DE", "10115"),
+    ("Munich", "DE", "80331"),
+    ("Madrid", "ES", "28001"),
+    ("Rome", "IT", "00184"),
+    ("Amsterdam", "NL", "1012"),
+    ("Tokyo", "JP", "100-0001"),
+    ("Sydney", "AU", "2000"),
+    ("Mumbai", "IN", "400001"),
+    ("Karachi", "PK", "74000"),
+    ("Lahore", "PK", "54000"),
+    ("Islamabad", "PK", "44000"),
+]
+SEED_ALIASES: Dict[str, str] = {
+    "nyc": "New York",
+    "new york city": "New York",
+    "la": "Los Angeles",
+    "sf": "San Francisco",
+    "munchen": "Munich",
+    "roma": "Rome",
+}
+
+# ISO 3166-1 alpha-2 codes, to tell "City, CC POSTAL" input from "City, ST ZIP"
+COUNTRY_CODES = frozenset(
+    """
+    AD AE AF AG AI AL AM AO AQ AR AS AT AU AW AX AZ BA BB BD BE BF BG BH BI BJ BL BM BN BO BQ BR
+    BS BT BV BW BY BZ CA CC CD CF CG CH CI CK CL CM CN CO CR CU CV CW CX CY CZ DE DJ DK DM DO DZ
+    EC EE EG EH ER ES ET FI FJ FK FM FO FR GA GB GD GE GF GG GH GI GL GM GN GP GQ GR GS GT GU GW
+    GY HK HM HN HR HT HU ID IE IL IM IN IO IQ IR IS IT JE JM JO JP KE KG KH KI KM KN KP KR KW KY
+    KZ LA LB LC LI LK LR LS LT LU LV LY MA MC MD ME MF MG MH MK ML MM MN MO MP MQ MR MS MT MU MV
+    MW MX MY MZ NA NC NE NF NG NI NL NO NP NR NU NZ OM PA PE PF PG PH PK PL PM PN PR PS PT PW PY
+    QA RE RO RS RU RW SA SB SC SD SE SG SH SI SJ SK SL SM SN SO SR SS ST SV SX SY SZ TC TD TF TG
+    TH TJ TK TL TM TN TO TR TT TV TW TZ UA UG UM US UY UZ VA VC VE VG VI VN VU WF WS YE YT ZA ZM ZW
+    """.split()
+)
+# US states, DC and territories: "Austin, TX 78701" is a US address, not country "TX"
+US_STATE_CODES = frozenset(
+    """
+    AL AK AZ AR CA CO CT DE FL GA HI ID IL IN IA KS KY LA ME MD MA MI MN MS MO MT NE NV NH NJ NM
+    NY NC ND OH OK OR PA RI SC SD TN TX UT VT VA WA WV WI WY DC PR GU VI AS MP
+    """.split()
+)
+
+
+def normalize(name: str) -> str:
+    """Accent-, case- and punctuation-insensitive form: "Saint-Étienne " -> "saint etienne"."""
+    text = unicodedata.normalize("NFKD", name)
+    text = "".join(c for c in text if not unicodedata.combining(c)).casefold()
+    return " ".join(re.sub(r"[^\w]+", " ", text).split())
+
+
+# ---------- Build ----------
+def _records(
+    places: Iterable[Tuple[str, str, str]],
+    aliases: Dict[str, str],
+) -> List[bytes]:
+    """
+    One record per distinct key. Every place gets a "name cc" key (with its lowest
+    postal code, so the result does not depend on input order). The bare name is only
+    a key when a single country has a place of that name: "paris" alone is ambiguous
+    in a worldwide dump and has to be asked for as "paris fr".
+    """
+    postals: Dict[str, Dict[str, str]] = {}  # name -> country -> lowest postal code
+    for place, country, postal in places:
+        key = normalize(place)
+        if key:
+            cc = country.upper()
+            by_country = postals.setdefault(key, {})
+            if cc not in by_country or postal < by_country[cc]:
+                by_country[cc] = postal
+    targets: Dict[str, Tuple[str, str]] = {}
+    for key, by_country in postals.items():
+        if len(by_country) == 1:
+            targets.setdefault(key, next(iter(by_country.items())))
+    for key, by_country in postals.items():
+        for cc, postal in by_country.items():
+            targets.setdefault(f"{key} {cc.casefold()}", (cc, postal))
+    for alias, canonical in aliases.items():
+        # An alias may name a qualified place ("Paris FR") to pick one of several
+        target = targets.get(normalize(canonical))
+        if target is not None:
+            targets.setdefault(normalize(alias), target)
+    return [f"{key}\t{cc}\t{postal}\n".encode("utf-8") for key, (cc, postal) in sorted(targets.items())]
+
+
+def build_index(
+    places: Iterable[Tuple[str, str, str]],
+    aliases: Optional[Dict[str, str]] = None,
+    path: Optional[str] = GEO_INDEX_PATH,
+) -> bytes:
+    """
+    Serialise `places` (and `aliases`) to the index format. Written atomically to `path`
+    unless it is None; the bytes are returned either way.
+    """
+    records = _records(places, aliases or {})
+    offsets = array("I", [0])
+    for record in records:
+        offsets.append(offsets[-1] + len(record))
+    blob = _HEADER.pack(MAGIC, len(records)) + offsets.tobytes() + b"".join(records)
+    if path is not None:
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(blob)
+        os.replace(tmp, path)
+    return blob
+
+
+def read_geonames(path: str) -> Iterator[Tuple[str, str, str]]:
+    """(place, country_code, postal_code) from a GeoNames postal-code dump (or the same TSV layout)."""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            cols = line.rstrip("\n").split("\t")
+            if len(cols) >= 3 and cols[0] and cols[1] and cols[2]:
+                yield cols[2], cols[0], cols[1]
+
+
+def read_aliases(path: str) -> Dict[str, str]:
+    aliases: Dict[str, str] = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            alias, sep, canonical = line.rstrip("\n").partition("\t")
+            if sep:
+                aliases[alias] = canonical
+    return aliases
+
+
+# ---------- Lookup ----------
+class GeoIndex:
+    """Read-only view over an index buffer (an mmap of the index file, or plain bytes)."""
+
+    def __init__(self, buffer) -> None:
+        magic, count = _HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ValueError("not a geo index file")
+        self._buffer = buffer
+        self._view = memoryview(buffer)
+        start = _HEADER.size
+        self._offsets = self._view[start : start + 4 * (count + 1)].cast("I")
+        self._data = start + 4 * (count + 1)
+        self._count = count
+
+    @classmethod
+    def open(cls, path: str = GEO_INDEX_PATH) -> "GeoIndex":
+        with open(path, "rb") as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _record(self, i: int) -> bytes:
+        return bytes(self._view[self._data + self._offsets[i] : self._data + self._offsets[i + 1]])
+
+    def _key(self, i: int) -> bytes:
+        record = self._record(i)
+        return record[: record.index(b"\t")]
+
+    def _lower_bound(self, key: bytes) -> int:
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _decode(self, i: int) -> Tuple[str, str, str]:
+        key, country, postal = self._record(i).decode("utf-8").rstrip("\n").split("\t")
+        return key, country, postal
+
+    def lookup(self, name: str) -> Optional[Tuple[str, str]]:
+        """Exact (normalised) match -> (country_code, postal_code)."""
+        key = normalize(name).encode("utf-8")
+        i = self._lower_bound(key)
+        if i < self._count and self._key(i) == key:
+            _, country, postal = self._decode(i)
+            return country, postal
+        return None
+
+    def complete(self, prefix: str, limit: int = 10) -> List[Tuple[str, str, str]]:
+        """Up to `limit` (name, country_code, postal_code) entries whose name starts with `prefix`."""
+        key = normalize(prefix).encode("utf-8")
+        matches = []
+        i = self._lower_bound(key)
+        while i < self._count and len(matches) < limit and self._key(i).startswith(key):
+            matches.append(self._decode(i))
+            i += 1
+        return matches
+
+    def close(self) -> None:
+        self._offsets.release()
+        self._view.release()
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+
+
+_index: Optional[GeoIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_geo_index() -> GeoIndex:
+    """Process-wide index, opened on first use: GEO_INDEX_PATH if built, else the seed places."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                if os.path.exists(GEO_INDEX_PATH):
+                    _index = GeoIndex.open(GEO_INDEX_PATH)
+                else:
+                    _index = GeoIndex(build_index(SEED_PLACES, SEED_ALIASES, path=None))
+    return _index
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="build the index from a GeoNames-style TSV")
+    build.add_argument("source")
+    build.add_argument("--aliases", help='TSV of "alias<TAB>place" lines')
+    build.add_argument("-o", "--output", default=GEO_INDEX_PATH)
+    lookup = sub.add_parser("lookup")
+    lookup.add_argument("name")
+    complete = sub.add_parser("complete")
+    complete.add_argument("prefix")
+    complete.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        aliases = {**SEED_ALIASES, **(read_aliases(args.aliases) if args.aliases else {})}
+        blob = build_index(read_geonames(args.source), aliases, path=args.output)
+        index = GeoIndex(blob)
+        print(f"{len(index):,} keys, {len(blob) / 2**20:.1f} MiB -> {args.output}")
+        return 0
+
+    index = get_geo_index()
+    if args.command == "lookup":
+        found = index.lookup(args.name)
+        print(" ".join(found) if found else "not found")
+        return 0 if found else 1
+    for name, country, postal in index.complete(args.prefix, args.limit):
+        print(f"{name}\t{country}\t{postal}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,212 @@
+import asyncio
+import json
+import os
+import statistics
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+import httpx
+
+import ratelimit
+
+# ---- Config ----
+LLM_HEDGE: bool = os.getenv("LLM_HEDGE", "1") == "1"
+# At most this share of requests (over the last LLM_HEDGE_WINDOW) may send a duplicate
+LLM_HEDGE_MAX_RATIO: float = float(os.getenv("LLM_HEDGE_MAX_RATIO", "0.05"))
+LLM_HEDGE_PERCENTILE: float = float(os.getenv("LLM_HEDGE_PERCENTILE", "0.95"))
+LLM_HEDGE_MIN_SAMPLES: int = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+LLM_HEDGE_MIN_DELAY: float = float(os.getenv("LLM_HEDGE_MIN_DELAY", "0.05"))
+LLM_HEDGE_WINDOW: int = int(os.getenv("LLM_HEDGE_WINDOW", "200"))
+# Opt-in adaptive per-attempt timeout: LLM_TIMEOUT_FACTOR x learned p99, kept within
+# [min, LLM_TIMEOUT]. Off by default: latency is learned per (model, stream), so short
+# calls would otherwise set the limit for long generations on the same model.
+LLM_ADAPTIVE_TIMEOUT: bool = os.getenv("LLM_ADAPTIVE_TIMEOUT", "0") == "1"
+LLM_TIMEOUT_FACTOR: float = float(os.getenv("LLM_TIMEOUT_FACTOR", "4"))
+LLM_ADAPTIVE_TIMEOUT_MIN: float = float(os.getenv("LLM_ADAPTIVE_TIMEOUT_MIN", "120"))
+
+# Only these calls are safe to duplicate: a second completion is wasted tokens, not a side effect
+HEDGEABLE_PATHS = ("/chat/completions", "/responses", "/embeddings")
+
+
+class LatencyTracker:
+    """Rolling window of response times (seconds) for one (model, stream) route."""
+
+    def __init__(self, window: int = LLM_HEDGE_WINDOW) -> None:
+        self.samples: Deque[float] = deque(maxlen=window)
+
+    def add(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if len(self.samples) < LLM_HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+class HedgingTransport(httpx.AsyncBaseTransport):
+    """
+    httpx transport that hedges slow model calls, optionally with adaptive timeouts.
+
+    Response times (to the response headers, i.e. time to first byte for streams) are
+    tracked per model and per streaming mode. Once a call has been waiting longer than
+    its route's learned p95, an identical request is sent; whichever answers first is
+    used and the other is cancelled. Duplicates are capped at LLM_HEDGE_MAX_RATIO of
+    recent requests. With LLM_ADAPTIVE_TIMEOUT=1 each attempt also gets a timeout of
+    LLM_TIMEOUT_FACTOR x p99 (within [LLM_ADAPTIVE_TIMEOUT_MIN, the client timeout]),
+    so a stuck call fails over to the client's retry instead of hanging for the full
+    static timeout. Otherwise the learned latency only triggers hedges, never aborts.
+    """
+
+    def __init__(
+        self,
+        inner: httpx.AsyncBaseTransport,
+        max_ratio: float = LLM_HEDGE_MAX_RATIO,
+        percentile: float = LLM_HEDGE_PERCENTILE,
+        enabled: bool = LLM_HEDGE,
+        adaptive_timeout: bool = LLM_ADAPTIVE_TIMEOUT,
+    ) -> None:
+        self.inner = inner
+        self.max_ratio = max_ratio
+        self.percentile = percentile
+        self.enabled = enabled
+        self.adaptive_timeout = adaptive_timeout
+        self._trackers: Dict[Tuple[str, bool], LatencyTracker] = {}
+        self._recent: Deque[bool] = deque(maxlen=LLM_HEDGE_WINDOW)  # hedged?, per request
+        self._recent_hedged = 0
+        self.stats: Dict[str, int] = {"requests": 0, "hedged": 0, "hedge_wins": 0, "timeouts": 0}
+
+    # ---------- Bookkeeping ----------
+    @staticmethod
+    def _route(request: httpx.Request) -> Optional[Tuple[str, bool]]:
+        if request.method != "POST" or not request.url.path.endswith(HEDGEABLE_PATHS):
+            return None
+        try:
+            body = json.loads(request.content or b"{}")
+        except (ValueError, httpx.RequestNotRead):
+            return None
+        return str(body.get("model", "")), bool(body.get("stream"))
+
+    def _note_request(self, hedged: bool) -> None:
+        if len(self._recent) == self._recent.maxlen and self._recent[0]:
+            self._recent_hedged -= 1
+        self._recent.append(hedged)
+        self._recent_hedged += hedged
+
+    def _hedge_allowed(self) -> bool:
+        # The +1 lets the very first slow call hedge before any history exists
+        return self._recent_hedged + 1 <= self.max_ratio * len(self._recent) + 1
+
+    def _timeout(self, request: httpx.Request, tracker: LatencyTracker) -> Optional[float]:
+        if not self.adaptive_timeout:
+            return None
+        p99 = tracker.percentile(0.99)
+        if p99 is None:
+            return None
+        limit = (request.extensions.get("timeout") or {}).get("read")
+        timeout = max(p99 * LLM_TIMEOUT_FACTOR, LLM_ADAPTIVE_TIMEOUT_MIN)
+        return min(timeout, limit) if limit else timeout
+
+    def latency_summary(self) -> Dict[str, Dict[str, Any]]:
+        summary = {}
+        for (model, stream), tracker in self._trackers.items():
+            ordered = sorted(tracker.samples)
+            summary[f"{model}{' (stream)' if stream else ''}"] = {
+                "samples": len(ordered),
+                "p50_ms": round(statistics.median(ordered) * 1000, 1) if ordered else 0.0,
+                "p95_ms": round((tracker.percentile(0.95) or 0.0) * 1000, 1),
+                "p99_ms": round((tracker.percentile(0.99) or 0.0) * 1000, 1),
+            }
+        return summary
+
+    # ---------- Sending ----------
+    async def _send(self, request: httpx.Request, timeout: Optional[float]) -> httpx.Response:
+        if timeout is None:
+            return await self.inner.handle_async_request(request)
+        try:
+            return await asyncio.wait_for(self.inner.handle_async_request(request), timeout)
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            raise httpx.ReadTimeout(f"no response within adaptive timeout {timeout:.1f}s", request=request) from None
+
+    @staticmethod
+    def _duplicate(request: httpx.Request) -> httpx.Request:
+        return httpx.Request(
+            request.method,
+            request.url,
+            headers=request.headers,
+            content=request.content,
+            extensions=request.extensions,
+        )
+
+    @staticmethod
+    async def _discard(task: "asyncio.Task[httpx.Response]") -> None:
+        if not task.done():
+            task.cancel()
+        try:
+            response = await task
+        except BaseException:
+            return
+        await response.aclose()
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        route = self._route(request)
+        if route is None:
+            return await self.inner.handle_async_request(request)
+
+        self.stats["requests"] += 1
+        tracker = self._trackers.setdefault(route, LatencyTracker())
+        timeout = self._timeout(request, tracker)
+        delay = tracker.percentile(self.percentile) if self.enabled else None
+        started = time.perf_counter()
+
+        primary = asyncio.ensure_future(self._send(request, timeout))
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait({primary}, timeout=max(delay, LLM_HEDGE_MIN_DELAY))
+                # A duplicate spends rate-limit quota too, so it is only sent if there is room
+                if not done and self._hedge_allowed() and ratelimit.try_acquire(request):
+                    return await self._race(request, primary, tracker, timeout, started)
+            self._note_request(False)
+            response = await primary
+        except asyncio.CancelledError:
+            primary.cancel()
+            raise
+        tracker.add(time.perf_counter() - started)
+        return response
+
+    async def _race(
+        self,
+        request: httpx.Request,
+        primary: "asyncio.Task[httpx.Response]",
+        tracker: LatencyTracker,
+        timeout: Optional[float],
+        started: float,
+    ) -> httpx.Response:
+        self.stats["hedged"] += 1
+        self._note_request(True)
+        hedge = asyncio.ensure_future(self._send(self._duplicate(request), timeout))
+        pending = {primary, hedge}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        error = error or task.exception()
+                        continue
+                    tracker.add(time.perf_counter() - started)
+                    if task is hedge:
+                        self.stats["hedge_wins"] += 1
+                    for loser in pending | (done - {task}):
+                        await self._discard(loser)
+                    return task.result()
+        finally:
+            for task in (primary, hedge):
+                if not task.done():
+                    task.cancel()
+        raise error
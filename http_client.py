@@ -0,0 +1,57 @@
+import asyncio
+import importlib.util
+import os
+import weakref
+
+import httpx
+
+from response_cache import with_http_cache
+
+# ---- Pool settings (override via env) ----
+HTTP_TIMEOUT: float = float(os.getenv("HTTP_TIMEOUT", "30"))
+HTTP_MAX_CONNECTIONS: int = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE: int = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+HTTP_KEEPALIVE_EXPIRY: float = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "60"))
+# HTTP/2 needs the optional `h2` package (pip install "httpx[http2]")
+HTTP2: bool = os.getenv("HTTP2", "0") == "1" and importlib.util.find_spec("h2") is not None
+
+# One client per event loop: pooled connections are bound to the loop that opened them.
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def build_http_client() -> httpx.AsyncClient:
+    """
+    Create a keep-alive AsyncClient with the configured pool limits. With LLM_CACHE
+    set, its requests are recorded and replayed like model calls (see response_cache.py).
+    """
+    transport = httpx.AsyncHTTPTransport(
+        http2=HTTP2,
+        limits=httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+    )
+    return httpx.AsyncClient(timeout=HTTP_TIMEOUT, transport=with_http_cache(transport))
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Return the shared AsyncClient for the running event loop.
+    It stays open for the life of the loop so repeated calls reuse warm TCP/TLS connections.
+    """
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = build_http_client()
+        _clients[loop] = client
+    return client
+
+
+async def aclose_http_client() -> None:
+    """Close the shared client of the running loop (e.g. on server shutdown)."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
@@ -0,0 +1,159 @@
+import asyncio
+import os
+import threading
+import weakref
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+import httpx
+from dotenv import find_dotenv, load_dotenv
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+from agents import Model, ModelSettings, OpenAIChatCompletionsModel
+from hedging import HedgingTransport
+from ratelimit import RateLimitedTransport
+from response_cache import with_response_cache
+from trace_export import configure_tracing
+from usage import MeteredModel
+
+_: bool = load_dotenv(find_dotenv())
+
+# Traces go to a local file with TRACE_EXPORT, remotely only with TRACE_REMOTE=1, else nowhere (see trace_export.py)
+configure_tracing()
+
+# ---- Endpoints & model names (override via env) ----
+GEMINI_BASE_URL = "https://generativelanguage.googleapis.com/v1beta/openai/"
+OPENAI_BASE_URL = "https://api.openai.com/v1/"
+
+LLM_BASE_URL: str = os.getenv("LLM_BASE_URL", GEMINI_BASE_URL)
+# Cheap/fast model for simple prompts and a stronger one for multi-step tool work
+FAST_MODEL: str = os.getenv("LLM_FAST_MODEL", "gemini-2.0-flash")
+STRONG_MODEL: str = os.getenv("LLM_STRONG_MODEL", "gemini-2.5-flash")
+
+# ---- Connection pool & timeouts ----
+LLM_TIMEOUT: float = float(os.getenv("LLM_TIMEOUT", "60"))
+LLM_CONNECT_TIMEOUT: float = float(os.getenv("LLM_CONNECT_TIMEOUT", "10"))
+LLM_MAX_RETRIES: int = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_MAX_CONNECTIONS: int = int(os.getenv("LLM_MAX_CONNECTIONS", "100"))
+LLM_MAX_KEEPALIVE: int = int(os.getenv("LLM_MAX_KEEPALIVE", "20"))
+LLM_KEEPALIVE_EXPIRY: float = float(os.getenv("LLM_KEEPALIVE_EXPIRY", "60"))
+
+# One client per event loop and endpoint: pooled connections are bound to the loop that opened them
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple[str, str], AsyncOpenAI]]" = (
+    weakref.WeakKeyDictionary()
+)
+_models: Dict[Tuple[str, str, str], Model] = {}
+_lock = threading.Lock()
+
+
+def default_api_key(base_url: str) -> str:
+    if base_url == GEMINI_BASE_URL:
+        return os.getenv("GEMINI_API_KEY", "")
+    return os.getenv("LLM_API_KEY") or os.getenv("OPENAI_API_KEY", "")
+
+
+def get_client(base_url: Optional[str] = None, api_key: Optional[str] = None) -> AsyncOpenAI:
+    """
+    Return the running event loop's AsyncOpenAI client for (base_url, api_key), creating
+    it on first use. All models on the same endpoint and loop share its keep-alive pool;
+    a client is never reused from another loop (e.g. after an earlier asyncio.run()).
+    """
+    base_url = base_url or LLM_BASE_URL
+    api_key = api_key if api_key is not None else default_api_key(base_url)
+    key = (base_url, api_key)
+    loop = asyncio.get_running_loop()
+
+    client = _clients.get(loop, {}).get(key)
+    if client is None:
+        with _lock:
+            clients = _clients.setdefault(loop, {})
+            client = clients.get(key)
+            if client is None:
+                client = AsyncOpenAI(
+                    api_key=api_key,
+                    base_url=base_url,
+                    max_retries=LLM_MAX_RETRIES,
+                    http_client=DefaultAsyncHttpxClient(
+                        timeout=httpx.Timeout(LLM_TIMEOUT, connect=LLM_CONNECT_TIMEOUT),
+                        # Model calls queue on their RPM/TPM quota (see ratelimit.py); slow
+                        # ones are hedged, optionally with adaptive timeouts (see hedging.py)
+                        transport=RateLimitedTransport(
+                            HedgingTransport(
+                                httpx.AsyncHTTPTransport(
+                                    limits=httpx.Limits(
+                                        max_connections=LLM_MAX_CONNECTIONS,
+                                        max_keepalive_connections=LLM_MAX_KEEPALIVE,
+                                        keepalive_expiry=LLM_KEEPALIVE_EXPIRY,
+                                    ),
+                                )
+                            )
+                        ),
+                    ),
+                )
+                clients[key] = client
+    return client
+
+
+def _with_stream_usage(args: tuple, kwargs: Dict[str, Any]) -> Tuple[tuple, Dict[str, Any]]:
+    """
+    stream_response arguments that ask for token usage at the end of the stream. The SDK
+    only asks by default on OpenAI's own base URL; on Gemini and other compatible
+    endpoints a streamed response would otherwise report 0 tokens to the usage meter.
+    """
+    include = ModelSettings(include_usage=True)
+    if "model_settings" in kwargs:
+        if kwargs["model_settings"].include_usage is None:
+            kwargs = {**kwargs, "model_settings": kwargs["model_settings"].resolve(include)}
+    elif len(args) > 2 and args[2].include_usage is None:
+        args = args[:2] + (args[2].resolve(include),) + args[3:]
+    return args, kwargs
+
+
+class LazyModel(Model):
+    """
+    A chat-completions model whose client is only built on the first model call.
+    Importing an exercise therefore costs nothing until an agent actually runs.
+    Each call uses the client of the loop it runs on (see get_client).
+    """
+
+    def __init__(self, model: str, base_url: str, api_key: Optional[str]) -> None:
+        self.model = model
+        self.base_url = base_url
+        self._api_key = api_key
+        self._delegate: Optional[Tuple[AsyncOpenAI, OpenAIChatCompletionsModel]] = None
+
+    def resolve(self) -> OpenAIChatCompletionsModel:
+        client = get_client(self.base_url, self._api_key)
+        if self._delegate is None or self._delegate[0] is not client:
+            self._delegate = (client, OpenAIChatCompletionsModel(model=self.model, openai_client=client))
+        return self._delegate[1]
+
+    async def get_response(self, *args, **kwargs):
+        return await self.resolve().get_response(*args, **kwargs)
+
+    async def stream_response(self, *args, **kwargs) -> AsyncIterator:
+        args, kwargs = _with_stream_usage(args, kwargs)
+        async for event in self.resolve().stream_response(*args, **kwargs):
+            yield event
+
+
+def get_model(
+    model: Optional[str] = None,
+    base_url: Optional[str] = None,
+    api_key: Optional[str] = None,
+) -> Model:
+    """
+    Return the shared model for (base_url, api_key, model). Defaults to FAST_MODEL on LLM_BASE_URL.
+    With LLM_CACHE=readwrite|replay the model is served through the on-disk response cache.
+    Token usage is recorded for runs started with usage.run_metered.
+
+        llm_model = get_model(STRONG_MODEL)
+    """
+    model = model or FAST_MODEL
+    base_url = base_url or LLM_BASE_URL
+    key = (base_url, api_key or "", model)
+
+    with _lock:
+        instance = _models.get(key)
+        if instance is None:
+            instance = MeteredModel(with_response_cache(LazyModel(model, base_url, api_key), model), model)
+            _models[key] = instance
+    return instance
@@ -1,6 +1,188 @@
-def main():
-    print("Hello from prompt-engineering!")
+"""
+Single entry point for the exercises and tools.
+
+    python main.py list                          # exercises, agents and tools
+    python main.py run ex7                       # run the exercise's own main()
+    python main.py run ex1 "Is 7 even or odd?"   # one prompt through its agent
+    python main.py run ex9 --importtime          # also report what importing it costs
+    python main.py bench --exercises ex1,ex7     # bench.py
+    python main.py batch jobs.jsonl -c 8         # batch.py
+    python main.py stream ex9                    # streaming.py
+    python main.py serve --agents ex1,ex7        # server.py
+
+Exercises are discovered by parsing exN.py, not importing it, so `list` and usage
+errors start in milliseconds. Only the exercise that runs pulls in `agents`, `openai`
+and friends.
+"""
+import argparse
+import ast
+import os
+import re
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Subcommands handed to another module's main(argv), imported only when used
+TOOLS: Dict[str, str] = {"bench": "bench", "batch": "batch", "stream": "streaming", "serve": "server"}
+
+TOOL_DECORATORS = {"function_tool", "pure_tool", "compact_tool", "compact_result"}
+
+
+@dataclass
+class Exercise:
+    name: str
+    path: str
+    agents: List[Tuple[str, str]] = field(default_factory=list)  # (attribute, Agent name=)
+    tools: List[str] = field(default_factory=list)
+    has_main: bool = False
+
+
+# ---------- Discovery ----------
+def _call_name(node: ast.AST) -> str:
+    if isinstance(node, ast.Call):
+        node = node.func
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    return node.id if isinstance(node, ast.Name) else ""
+
+
+def inspect_exercise(path: str) -> Exercise:
+    """Read an exercise's agents, tools and entry point from its source."""
+    name = os.path.splitext(os.path.basename(path))[0]
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+    exercise = Exercise(name, path)
+    for node in tree.body:
+        if isinstance(node, (ast.Assign, ast.AnnAssign)) and _call_name(node.value) == "Agent":
+            target = node.targets[0] if isinstance(node, ast.Assign) else node.target
+            label = next(
+                (kw.value.value for kw in node.value.keywords if kw.arg == "name" and isinstance(kw.value, ast.Constant)),
+                "",
+            )
+            exercise.agents.append((getattr(target, "id", "?"), label))
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            if node.name == "main":
+                exercise.has_main = True
+            if any(_call_name(d) in TOOL_DECORATORS for d in node.decorator_list):
+                exercise.tools.append(node.name)
+    return exercise
+
+
+def discover() -> Dict[str, Exercise]:
+    names = [f for f in os.listdir(ROOT) if re.fullmatch(r"ex\d+\.py", f)]
+    names.sort(key=lambda f: int(f[2:-3]))
+    return {f[:-3]: inspect_exercise(os.path.join(ROOT, f)) for f in names}
+
+
+# ---------- Import cost ----------
+def import_profile(module: str, top: int = 12) -> List[Tuple[str, float]]:
+    """
+    Import `module` in a fresh interpreter under -X importtime and return its total
+    cost followed by its costliest direct imports, as (package, cumulative ms).
+    """
+    import subprocess
+
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    children: List[Tuple[str, float]] = []
+    for line in proc.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package", children indented and listed before their parent
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \| ( *)(\S+)", line)
+        if not match:
+            continue
+        depth, package, ms = len(match.group(2)) // 2, match.group(3), int(match.group(1)) / 1000
+        if depth == 1:
+            children.append((package, ms))
+        elif depth == 0:
+            if package == module:
+                return [(package, ms)] + sorted(children, key=lambda c: -c[1])[:top]
+            children = []
+    return []
+
+
+def print_import_profile(module: str) -> None:
+    profile = import_profile(module)
+    print(f"{'import':<28}{'cumulative ms':>14}", file=sys.stderr)
+    for package, ms in profile:
+        print(f"{package:<28}{ms:>14.1f}", file=sys.stderr)
+
+
+# ---------- Commands ----------
+def cmd_list(exercises: Dict[str, Exercise]) -> int:
+    rows = [
+        (ex.name, ", ".join(f"{label or attr} ({attr})" for attr, label in ex.agents) or "-", ", ".join(ex.tools) or "-")
+        for ex in exercises.values()
+    ]
+    width = max([len("agents")] + [len(agents) for _, agents, _ in rows]) + 2
+    print(f"{'exercise':<10}{'agents':<{width}}tools")
+    for name, agents, tools in rows:
+        print(f"{name:<10}{agents:<{width}}{tools}")
+    return 0
+
+
+def cmd_run(exercise: Exercise, prompt: Optional[str], importtime: bool) -> int:
+    if importtime:
+        print_import_profile(exercise.name)
+
+    import asyncio
+    import importlib
+    import inspect
+
+    started = time.perf_counter()
+    module = importlib.import_module(exercise.name)
+    print(f"[imported {exercise.name} in {(time.perf_counter() - started) * 1000:.0f} ms]", file=sys.stderr)
+
+    if prompt is None:
+        if not exercise.has_main:
+            print(f"{exercise.name} has no main(); pass a prompt", file=sys.stderr)
+            return 2
+        result = module.main()
+        if inspect.isawaitable(result):
+            asyncio.run(result)
+        return 0
+
+    from agents import Runner
+    from pydantic import BaseModel
+    from batch import load_agent
+
+    output = Runner.run_sync(load_agent(exercise.name), prompt).final_output
+    print(output.model_dump_json() if isinstance(output, BaseModel) else output)
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] in TOOLS:
+        import asyncio
+        import importlib
+        import inspect
+
+        result = importlib.import_module(TOOLS[argv[0]]).main(argv[1:])
+        return (asyncio.run(result) if inspect.isawaitable(result) else result) or 0
+
+    exercises = discover()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="list exercises without importing them")
+    run = commands.add_parser("run", help="run an exercise, or one prompt through its agent")
+    run.add_argument("exercise", choices=list(exercises))
+    run.add_argument("prompt", nargs="?")
+    run.add_argument("--importtime", action="store_true", help="report the import cost of the exercise first")
+    for name, module in TOOLS.items():
+        commands.add_parser(name, help=f"{module}.py (arguments pass through)", add_help=False)
+    args = parser.parse_args(argv)
+
+    if args.command == "list":
+        return cmd_list(exercises)
+    return cmd_run(exercises[args.exercise], args.prompt, args.importtime)
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,163 @@
+import asyncio
+import json
+import os
+from typing import Any, Dict, List, Optional
+
+from agents import Agent, Runner
+
+from usage import estimate_tokens
+
+# ---- Config ----
+MEMORY_BUDGET_TOKENS: int = int(os.getenv("MEMORY_BUDGET_TOKENS", "2000"))
+MEMORY_RECENT_TOKENS: int = int(os.getenv("MEMORY_RECENT_TOKENS", "800"))
+
+SUMMARY_PREFIX = "Summary of the earlier conversation: "
+
+
+def _item_text(item: Dict[str, Any]) -> str:
+    """Render one input item as a line of plain text for the summariser."""
+    kind = item.get("type")
+    if kind == "function_call":
+        return f"[tool call] {item.get('name')}({item.get('arguments')})"
+    if kind == "function_call_output":
+        return f"[tool result] {item.get('output')}"
+    content = item.get("content", "")
+    if isinstance(content, list):
+        content = " ".join(str(part.get("text", "")) for part in content if isinstance(part, dict))
+    return f"{item.get('role', kind or 'item')}: {content}"
+
+
+class SlidingWindowSession:
+    """
+    Session memory (agents `Session` protocol) with a bounded token footprint.
+
+    Recent items are kept verbatim. Once the stored history exceeds `budget_tokens`,
+    the oldest turns are folded into a rolling summary by `summarizer`, keeping about
+    `recent_tokens` of the latest turns as-is. Folding runs in the background after a
+    turn is saved; the next `get_items` waits for it, so it overlaps with user think time.
+    Without a summarizer, old turns are simply dropped.
+    """
+
+    def __init__(
+        self,
+        session_id: str,
+        summarizer: Optional[Agent] = None,
+        budget_tokens: int = MEMORY_BUDGET_TOKENS,
+        recent_tokens: int = MEMORY_RECENT_TOKENS,
+    ) -> None:
+        if recent_tokens >= budget_tokens:
+            raise ValueError("recent_tokens must be smaller than budget_tokens")
+        self.session_id = session_id
+        self.summarizer = summarizer
+        self.budget_tokens = budget_tokens
+        self.recent_tokens = recent_tokens
+        self.summary = ""
+        self._items: List[Dict[str, Any]] = []
+        self._tokens: List[int] = []
+        self._compaction: Optional[asyncio.Task] = None
+
+    @property
+    def total_tokens(self) -> int:
+        return estimate_tokens(self.summary) + sum(self._tokens) if self.summary else sum(self._tokens)
+
+    async def _wait_for_compaction(self) -> None:
+        if self._compaction is not None:
+            task, self._compaction = self._compaction, None
+            await task
+
+    # ---------- Session protocol ----------
+    async def get_items(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        await self._wait_for_compaction()
+        items = list(self._items)
+        if self.summary:
+            items.insert(0, {"role": "system", "content": SUMMARY_PREFIX + self.summary})
+        return items if limit is None else items[-limit:]
+
+    async def add_items(self, items: List[Dict[str, Any]]) -> None:
+        await self._wait_for_compaction()
+        for item in items:
+            self._items.append(item)
+            self._tokens.append(estimate_tokens(json.dumps(item, ensure_ascii=False, default=str)))
+        if self.total_tokens > self.budget_tokens:
+            self._compaction = asyncio.ensure_future(self._compact())
+
+    async def pop_item(self) -> Optional[Dict[str, Any]]:
+        await self._wait_for_compaction()
+        if not self._items:
+            return None
+        self._tokens.pop()
+        return self._items.pop()
+
+    async def clear_session(self) -> None:
+        await self._wait_for_compaction()
+        self._items.clear()
+        self._tokens.clear()
+        self.summary = ""
+
+    # ---------- Compaction ----------
+    def _fold_point(self) -> int:
+        """
+        Index of the first item to keep verbatim: the oldest user message such that
+        everything from it onwards fits in `recent_tokens`. Cutting at a user message
+        never separates a tool call from its result. When that would fold nothing (one
+        long turn behind a single user message), see `_tool_boundary`.
+        """
+        kept = 0
+        cut = len(self._items)
+        for i in range(len(self._items) - 1, -1, -1):
+            kept += self._tokens[i]
+            if kept > self.recent_tokens and cut < len(self._items):
+                break
+            if self._items[i].get("role") == "user":
+                cut = i
+        if cut == 0 and sum(self._tokens) > self.recent_tokens:
+            return self._tool_boundary()
+        return cut
+
+    def _tool_boundary(self) -> int:
+        """
+        Fallback fold point inside a turn: the oldest index whose tail fits in
+        `recent_tokens` and that has every earlier tool call's result before it, else
+        the newest such index. 0 if there is none (a single oversized item).
+        """
+        boundaries = []
+        pending = set()  # call_ids of tool calls still waiting for their result
+        for i, item in enumerate(self._items[:-1]):
+            if item.get("type") == "function_call":
+                pending.add(item.get("call_id"))
+            elif item.get("type") == "function_call_output":
+                pending.discard(item.get("call_id"))
+            if not pending:
+                boundaries.append(i + 1)
+        tail = sum(self._tokens)
+        folded = 0
+        for i in boundaries:
+            tail -= sum(self._tokens[folded:i])
+            folded = i
+            if tail <= self.recent_tokens:
+                return i
+        return boundaries[-1] if boundaries else 0
+
+    async def _compact(self) -> None:
+        cut = self._fold_point()
+        if cut == 0:
+            return
+        folded, self._items = self._items[:cut], self._items[cut:]
+        self._tokens = self._tokens[cut:]
+        if self.summarizer is None:
+            return
+
+        transcript = "\n".join(_item_text(item) for item in folded)
+        prompt = (
+            "Update the running summary of a conversation with the turns below. "
+            "Keep names, facts, decisions and open questions; drop pleasantries. "
+            f"Answer with the new summary only, in at most {self.recent_tokens // 2} words.\n\n"
+            f"Current summary:\n{self.summary or '(none)'}\n\nNew turns:\n{transcript}"
+        )
+        try:
+            result = await Runner.run(self.summarizer, prompt)
+            self.summary = str(result.final_output).strip()
+        except Exception:
+            # Never lose the folded turns: keep a truncated transcript until the next fold
+            limit = self.recent_tokens * 2  # ~half the recent window, in characters
+            self.summary = f"{self.summary}\n{transcript}".strip()[-limit:]
@@ -0,0 +1,367 @@
+"""
+Local stand-in for the services the exercises call, so they can run and be benchmarked
+without Gemini, OpenWeather or ShipEngine keys.
+
+    python mock_server.py --port 8765 --latency-ms 300 --jitter-ms 100 --error-rate 0.05
+
+Endpoints:
+    POST /v1/chat/completions   OpenAI-compatible chat completions (plain and streamed)
+    GET  /data/2.5/weather      OpenWeather current weather
+    POST /v1/rates/estimate     ShipEngine rate estimate
+
+Chat replies are scripted. The first rule whose `match` appears in the request's
+instructions or first user message decides the reply: its `tool_calls` are returned
+until the conversation holds tool results, then its `final` text (or `content`).
+"""
+import argparse
+import json
+import random
+import socket
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+# Replies for the eleven exercises, keyed on text from their instructions or prompts
+DEFAULT_SCRIPT: List[Dict[str, Any]] = [
+    {"match": "Determine if 42 is even or odd", "content": "42 divided by 2 is 21 with no remainder, so 42 is even."},
+    {
+        "match": "weather API tool",
+        "tool_calls": [{"name": "get_weather", "arguments": {"city": "Karachi", "country": "PK"}}],
+        "final": "Karachi: 31.5°C, clear sky.",
+    },
+    {
+        "match": "project ideas",
+        "content": "| Name | Description |\n|---|---|\n| AI Chat | A chatbot for customer support |\n"
+        "| DocSum | Summarises long documents |\n| VisionQA | Answers questions about images |",
+    },
+    {"match": "ethical concerns of AI", "content": "Key concerns: bias, privacy, accountability, transparency and job displacement."},
+    {
+        "match": "database query tool",
+        "tool_calls": [{"name": "query_sales", "arguments": {"q": "SELECT month, revenue FROM sales"}}],
+        "final": "- Revenue rose from $12,000 in Jan to $18,000 in Mar.\n- Growth of $3,000 per month in Q1.",
+    },
+    {"match": "-word article in", "content": "Renewable energy is growing fast thanks to cheaper solar and wind."},
+    {
+        "match": "shipping costs",
+        "tool_calls": [
+            {"name": "calculate_shipping", "arguments": {"package_weight": 5, "origin": "New York", "destination": "Paris"}}
+        ],
+        "final": "1) Queried ShipEngine 2) Processed the estimate 3) Final cost: 42.50 USD",
+    },
+    {"match": "Summarize this user profile", "content": '{"summary": "Karachi-based web developer interested in AI agents."}'},
+    {
+        "match": "marketing campaign plan",
+        "tool_calls": [
+            {"name": "analytics_tool", "arguments": {"data": {"target_audience": "students", "competitors": ["A", "B"]}}},
+            {
+                "name": "budget_calculator_tool",
+                "arguments": {"budget": {"advertising": 5000, "influencers": 3000, "content_creation": 2000}},
+            },
+        ],
+        "final": "Strategy: social-first. Timeline: 3 months. Total cost: $10,000.",
+    },
+    {
+        "match": "sales figures for March 2025",
+        "tool_calls": [{"name": "sales_data_tool", "arguments": {"query": {"year": 2025, "month": 3}}}],
+        "final": "- 2025-03-01 — $12,450\n- 2025-03-08 — $13,980",
+    },
+    {
+        "match": "Analyze trends in this dataset",
+        "tool_calls": [{"name": "stats_tool", "arguments": {"dataset": [12, 15, 20, 22, 18, 25, 30, 28]}}],
+        "final": "| Trend | Impact |\n|---|---|\n| Average Value | 21.25 |\n| Maximum Value | 30 |\n| Minimum Value | 12 |",
+    },
+    {
+        "match": "Analyze trends in dataset 'ex11-sample'",
+        "tool_calls": [{"name": "stats_tool", "arguments": {"dataset_ref": "ex11-sample"}}],
+        "final": "| Trend | Impact |\n|---|---|\n| Overall Direction | rising |\n| Average Value | 21.25 |\n| Maximum Value | 30 |",
+    },
+]
+
+
+@dataclass
+class MockConfig:
+    script: List[Dict[str, Any]] = field(default_factory=lambda: list(DEFAULT_SCRIPT))
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 503
+    # Delay between streamed chunks, to exercise time-to-first-token measurements
+    token_delay_ms: float = 0.0
+    # Tail latency: this share of requests takes slow_ms extra, to exercise request hedging
+    slow_rate: float = 0.0
+    slow_ms: float = 0.0
+    # Quota: more than `rpm` chat requests in any `quota_window_s` get a 429, like a free tier
+    rpm: int = 0
+    quota_window_s: float = 60.0
+    stats: Dict[str, int] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+    _admitted: Deque[float] = field(default_factory=deque)
+
+    def count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] = self.stats.get(key, 0) + 1
+
+    def over_quota(self) -> Optional[float]:
+        """Seconds until the quota admits another request, or None (and count it) if it does now."""
+        if not self.rpm:
+            return None
+        with self._lock:
+            now = time.monotonic()
+            while self._admitted and self._admitted[0] <= now - self.quota_window_s:
+                self._admitted.popleft()
+            if len(self._admitted) >= self.rpm:
+                return self._admitted[0] + self.quota_window_s - now
+            self._admitted.append(now)
+            return None
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def _message_text(message: Dict[str, Any]) -> str:
+    content = message.get("content") or ""
+    if isinstance(content, list):
+        return " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return str(content)
+
+
+def scripted_reply(script: List[Dict[str, Any]], messages: List[Dict[str, Any]]) -> Tuple[str, List[Dict[str, Any]]]:
+    """Return (content, tool_calls) for a chat request according to `script`."""
+    system = " ".join(_message_text(m) for m in messages if m.get("role") in ("system", "developer"))
+    first_user = next((_message_text(m) for m in messages if m.get("role") == "user"), "")
+    has_tool_results = bool(messages) and messages[-1].get("role") == "tool"
+
+    for rule in script:
+        if rule["match"] in first_user or rule["match"] in system:
+            if rule.get("tool_calls") and not has_tool_results:
+                return "", rule["tool_calls"]
+            return rule.get("final") or rule.get("content", ""), []
+
+    if has_tool_results:
+        results = "; ".join(_message_text(m) for m in messages if m.get("role") == "tool")
+        return f"Mock answer from tool results: {results[:400]}", []
+    return "Mock response.", []
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "MockServer"
+
+    def setup(self) -> None:
+        super().setup()
+        # Headers and body go out in separate writes; without this Nagle + delayed ACK add ~40 ms
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def handle(self) -> None:
+        try:
+            super().handle()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client gave up on the request, e.g. the losing copy of a hedged call
+
+    def log_message(self, format: str, *args: Any) -> None:  # keep benchmark output clean
+        pass
+
+    # ---------- plumbing ----------
+    def _send_json(self, status: int, body: Any) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_quota_error(self, retry_after: float) -> None:
+        data = json.dumps({"error": {"message": "quota exceeded", "type": "rate_limit_exceeded"}}).encode("utf-8")
+        self.send_response(429)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("Retry-After", f"{retry_after:.2f}")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_json(self) -> Any:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _simulate_network(self, key: str) -> bool:
+        """Apply configured latency; return False (after replying) if an error is injected."""
+        cfg = self.server.config
+        cfg.count(key)
+        delay = cfg.latency_ms + random.uniform(-cfg.jitter_ms, cfg.jitter_ms)
+        if cfg.slow_rate and random.random() < cfg.slow_rate:
+            cfg.count(f"{key}:slow")
+            delay += cfg.slow_ms
+        if delay > 0:
+            time.sleep(delay / 1000)
+        if cfg.error_rate and random.random() < cfg.error_rate:
+            cfg.count(f"{key}:error")
+            self._send_json(cfg.error_status, {"error": {"message": "injected mock error", "type": "server_error"}})
+            return False
+        return True
+
+    # ---------- routes ----------
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        if url.path.endswith("/data/2.5/weather"):
+            if not self._simulate_network("weather"):
+                return
+            city = parse_qs(url.query).get("q", ["Unknown"])[0].split(",")[0]
+            self._send_json(200, {"name": city, "main": {"temp": 31.5}, "weather": [{"description": "clear sky"}]})
+            return
+        self._send_json(404, {"error": {"message": f"no route for GET {url.path}"}})
+
+    def do_POST(self) -> None:
+        path = urlparse(self.path).path
+        body = self._read_json()
+        if path.endswith("/chat/completions"):
+            retry_after = self.server.config.over_quota()
+            if retry_after is not None:
+                self.server.config.count("chat:429")
+                self._send_quota_error(retry_after)
+            elif self._simulate_network("chat"):
+                self._chat(body)
+        elif path.endswith("/v1/rates/estimate"):
+            if self._simulate_network("shipengine"):
+                weight = float(body.get("weight", {}).get("value", 1.0))
+                self._send_json(
+                    200,
+                    [
+                        {"carrier_id": "se-mock", "service_code": "mock_ground", "amount": round(7.5 + 7 * weight, 2), "currency": "usd"},
+                    ],
+                )
+        else:
+            self._send_json(404, {"error": {"message": f"no route for POST {path}"}})
+
+    def _chat(self, body: Dict[str, Any]) -> None:
+        messages = body.get("messages", [])
+        content, tool_calls = scripted_reply(self.server.config.script, messages)
+        calls = [
+            {
+                "id": f"call_{i}_{random.getrandbits(32):08x}",
+                "type": "function",
+                "function": {"name": tc["name"], "arguments": json.dumps(tc.get("arguments", {}))},
+            }
+            for i, tc in enumerate(tool_calls)
+        ]
+        prompt_tokens = _estimate_tokens(json.dumps(messages)) + _estimate_tokens(json.dumps(body.get("tools", [])))
+        completion_tokens = _estimate_tokens(content + json.dumps(tool_calls))
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+        base = {"id": f"chatcmpl-mock-{random.getrandbits(48):012x}", "created": int(time.time()), "model": body.get("model", "mock")}
+        finish_reason = "tool_calls" if calls else "stop"
+
+        if not body.get("stream"):
+            message: Dict[str, Any] = {"role": "assistant", "content": content or None}
+            if calls:
+                message["tool_calls"] = calls
+            self._send_json(
+                200,
+                {
+                    **base,
+                    "object": "chat.completion",
+                    "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+                    "usage": usage,
+                },
+            )
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        def send(delta: Dict[str, Any], finish: Optional[str] = None, **extra: Any) -> None:
+            chunk = {**base, "object": "chat.completion.chunk", "choices": [{"index": 0, "delta": delta, "finish_reason": finish}], **extra}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        token_delay = self.server.config.token_delay_ms / 1000
+        send({"role": "assistant", "content": ""})
+        # Stream word by word so clients see many small deltas
+        words = content.split(" ") if content else []
+        for i, word in enumerate(words):
+            if token_delay:
+                time.sleep(token_delay)
+            send({"content": word if i == len(words) - 1 else word + " "})
+        for i, call in enumerate(calls):
+            send({"tool_calls": [{"index": i, **call}]})
+        send({}, finish_reason)
+        # Like the real endpoints, streams only report usage when the client asks for it
+        if (body.get("stream_options") or {}).get("include_usage"):
+            usage_chunk = {**base, "object": "chat.completion.chunk", "choices": [], "usage": usage}
+            self.wfile.write(f"data: {json.dumps(usage_chunk)}\n\n".encode("utf-8"))
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+class MockServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], config: MockConfig) -> None:
+        super().__init__(address, MockHandler)
+        self.config = config
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def start_mock_server(config: Optional[MockConfig] = None, host: str = "127.0.0.1", port: int = 0) -> MockServer:
+    """Start a mock server on a background thread; `server.base_url` tells you where."""
+    server = MockServer((host, port), config or MockConfig())
+    threading.Thread(target=server.serve_forever, name="mock-server", daemon=True).start()
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--script", help="JSON file with a list of reply rules (default: built-in exercise script)")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--token-delay-ms", type=float, default=0.0)
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="share of requests that are slow")
+    parser.add_argument("--slow-ms", type=float, default=0.0, help="extra latency of a slow request")
+    parser.add_argument("--rpm", type=int, default=0, help="chat requests allowed per quota window (0 = no quota)")
+    parser.add_argument("--quota-window-s", type=float, default=60.0)
+    args = parser.parse_args()
+
+    config = MockConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        token_delay_ms=args.token_delay_ms,
+        slow_rate=args.slow_rate,
+        slow_ms=args.slow_ms,
+        rpm=args.rpm,
+        quota_window_s=args.quota_window_s,
+    )
+    if args.script:
+        with open(args.script, encoding="utf-8") as f:
+            config.script = json.load(f)
+
+    server = MockServer((args.host, args.port), config)
+    print(f"Mock server on {server.base_url}  (LLM_BASE_URL={server.base_url}/v1/)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+import asyncio
+import json
+import os
+import statistics
+import threading
+import time
+import weakref
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+import httpx
+
+from usage import estimate_tokens
+
+# ---- Config ----
+# Published free-tier quotas, (requests per minute, tokens per minute); LLM_RATE_LIMITS=gemini-free
+GEMINI_FREE_TIER: Dict[str, Tuple[int, int]] = {
+    "gemini-2.0-flash": (15, 1_000_000),
+    "gemini-2.5-flash": (10, 250_000),
+}
+# Limits for every model without an entry below (0 = unlimited)
+LLM_RPM: int = int(os.getenv("LLM_RPM", "0"))
+LLM_TPM: int = int(os.getenv("LLM_TPM", "0"))
+# Per-model limits: "gemini-free", or JSON like '{"gemini-2.0-flash": [15, 1000000]}'
+_limits_env = os.getenv("LLM_RATE_LIMITS", "")
+LLM_RATE_LIMITS: Dict[str, Tuple[int, int]] = (
+    dict(GEMINI_FREE_TIER)
+    if _limits_env == "gemini-free"
+    else {model: (int(rpm), int(tpm)) for model, (rpm, tpm) in json.loads(_limits_env or "{}").items()}
+)
+# Share of a quota that may go out as a burst. The rest refills evenly, so no window
+# of a minute ever sees more than the quota; 0 paces requests strictly.
+LLM_RATE_BURST: float = float(os.getenv("LLM_RATE_BURST", "0.1"))
+# Completion tokens assumed for a request that sets no max_tokens, until its usage is known
+LLM_RATE_OUTPUT_TOKENS: int = int(os.getenv("LLM_RATE_OUTPUT_TOKENS", "256"))
+
+# Endpoints that consume model quota; everything before them in the URL is the base_url
+METERED_PATHS = ("/chat/completions", "/responses", "/embeddings")
+
+
+class TokenBucket:
+    """
+    Holds up to `burst` x `limit` units and refills the rest of `limit` evenly over
+    `window` seconds, so any `window` admits at most `limit` units.
+    """
+
+    def __init__(self, limit: int, window: float = 60.0, burst: float = LLM_RATE_BURST) -> None:
+        self.capacity = max(1.0, limit * burst)
+        self.rate = max(limit - self.capacity, 1.0) / window
+        self.level = self.capacity
+        self._updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_for(self, amount: float) -> float:
+        """Seconds until `amount` is available (0 if it is now)."""
+        missing = min(amount, self.capacity) - self.level
+        return max(0.0, missing / self.rate)
+
+
+class RateLimiter:
+    """
+    Request and token buckets for one (base_url, model) quota of `rpm` requests and
+    `tpm` tokens per `window` seconds.
+
+    Callers queue in arrival order (one FIFO per event loop) and the head of the queue
+    sleeps exactly until both buckets can cover it, so a burst is spread over the
+    quota instead of failing with 429s. Token costs are estimated before sending and
+    corrected once the response reports real usage; the difference is carried as debt
+    or credit. A 429 that still gets through pauses the limiter for its Retry-After.
+    """
+
+    def __init__(self, rpm: int, tpm: int, window: float = 60.0) -> None:
+        self.requests = TokenBucket(rpm, window) if rpm else None
+        self.tokens = TokenBucket(tpm, window) if tpm else None
+        self._mutex = threading.Lock()
+        self._queues: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._paused_until = 0.0
+        self.waiting = 0
+        self.stats: Dict[str, Any] = {"requests": 0, "queued": 0, "max_queue": 0, "rate_limited": 0, "tokens": 0}
+        self.waits_ms: Deque[float] = deque(maxlen=1000)
+
+    def _reserve(self, tokens: int) -> float:
+        """Take a request and `tokens` if both buckets allow it; else return the seconds to wait."""
+        with self._mutex:
+            now = time.monotonic()
+            wait = self._paused_until - now
+            for bucket, amount in ((self.requests, 1), (self.tokens, tokens)):
+                if bucket is not None:
+                    bucket.refill(now)
+                    wait = max(wait, bucket.wait_for(amount))
+            if wait > 0:
+                return wait
+            if self.requests is not None:
+                self.requests.level -= 1
+            if self.tokens is not None:
+                self.tokens.level -= tokens  # beyond capacity becomes debt
+            self.stats["requests"] += 1
+            self.stats["tokens"] += tokens
+            return 0.0
+
+    def try_acquire(self, tokens: int) -> bool:
+        """Non-blocking acquire, for optional traffic such as hedged duplicates."""
+        if self.waiting:
+            return False
+        return self._reserve(tokens) == 0.0
+
+    async def acquire(self, tokens: int) -> None:
+        if not self.waiting and self._reserve(tokens) == 0.0:
+            self.waits_ms.append(0.0)
+            return
+        loop = asyncio.get_running_loop()
+        queue = self._queues.get(loop)
+        if queue is None:
+            queue = self._queues[loop] = asyncio.Lock()
+        started = time.perf_counter()
+        self.waiting += 1
+        self.stats["queued"] += 1
+        self.stats["max_queue"] = max(self.stats["max_queue"], self.waiting)
+        try:
+            async with queue:  # asyncio.Lock wakes waiters in FIFO order
+                while True:
+                    wait = self._reserve(tokens)
+                    if wait == 0.0:
+                        break
+                    await asyncio.sleep(wait)
+        finally:
+            self.waiting -= 1
+        self.waits_ms.append((time.perf_counter() - started) * 1000)
+
+    def settle(self, estimated: int, actual: int) -> None:
+        """Correct the token bucket once the real usage of a request is known."""
+        if self.tokens is None:
+            return
+        with self._mutex:
+            self.tokens.level -= actual - estimated
+            self.stats["tokens"] += actual - estimated
+
+    def pause(self, seconds: float) -> None:
+        with self._mutex:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            if self.requests is not None:
+                self.requests.level = min(self.requests.level, 0.0)
+            self.stats["rate_limited"] += 1
+
+    def summary(self) -> Dict[str, Any]:
+        ordered = sorted(self.waits_ms)
+        return {
+            **self.stats,
+            "queue_depth": self.waiting,
+            "wait_p50_ms": round(statistics.median(ordered), 1) if ordered else 0.0,
+            "wait_p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 1) if ordered else 0.0,
+            "wait_max_ms": round(ordered[-1], 1) if ordered else 0.0,
+        }
+
+
+# ---------- Registry ----------
+_limiters: Dict[Tuple[str, str], Optional[RateLimiter]] = {}
+_registry_lock = threading.Lock()
+
+
+def get_limiter(base_url: str, model: str) -> Optional[RateLimiter]:
+    """The process-wide limiter for (base_url, model), or None if it has no limits."""
+    key = (base_url, model)
+    if key not in _limiters:
+        with _registry_lock:
+            if key not in _limiters:
+                rpm, tpm = LLM_RATE_LIMITS.get(model, (LLM_RPM, LLM_TPM))
+                _limiters[key] = RateLimiter(rpm, tpm) if rpm or tpm else None
+    return _limiters[key]
+
+
+def rate_limit_stats() -> Dict[str, Dict[str, Any]]:
+    return {f"{model} @ {base}": limiter.summary() for (base, model), limiter in _limiters.items() if limiter}
+
+
+def _parse(request: httpx.Request) -> Optional[Tuple[str, str, int]]:
+    """(base_url, model, estimated tokens) for a metered model call, else None."""
+    path = request.url.path
+    if request.method != "POST" or not path.endswith(METERED_PATHS):
+        return None
+    try:
+        body = json.loads(request.content or b"{}")
+    except (ValueError, httpx.RequestNotRead):
+        return None
+    suffix = next(p for p in METERED_PATHS if path.endswith(p))
+    base_url = str(request.url.copy_with(path=path[: -len(suffix)] + "/", query=None))
+    prompt = json.dumps([body.get("messages") or body.get("input"), body.get("tools")], ensure_ascii=False)
+    completion = body.get("max_completion_tokens") or body.get("max_tokens") or LLM_RATE_OUTPUT_TOKENS
+    return base_url, str(body.get("model", "")), estimate_tokens(prompt) + int(completion)
+
+
+def try_acquire(request: httpx.Request) -> bool:
+    """Admit `request` without waiting if its quota has room (always True when unlimited)."""
+    parsed = _parse(request)
+    if parsed is None:
+        return True
+    limiter = get_limiter(parsed[0], parsed[1])
+    return limiter is None or limiter.try_acquire(parsed[2])
+
+
+def _retry_after(response: httpx.Response) -> float:
+    try:
+        return max(0.0, float(response.headers.get("retry-after", "1")))
+    except ValueError:
+        return 1.0
+
+
+class RateLimitedTransport(httpx.AsyncBaseTransport):
+    """httpx transport that queues model calls on their (base_url, model) RateLimiter."""
+
+    def __init__(self, inner: httpx.AsyncBaseTransport) -> None:
+        self.inner = inner
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        parsed = _parse(request)
+        limiter = get_limiter(parsed[0], parsed[1]) if parsed else None
+        if limiter is None:
+            return await self.inner.handle_async_request(request)
+
+        estimated = parsed[2]
+        await limiter.acquire(estimated)
+        response = await self.inner.handle_async_request(request)
+        if response.status_code == 429:
+            limiter.pause(_retry_after(response))
+        elif response.status_code == 200 and "json" in response.headers.get("content-type", ""):
+            # Non-streamed replies are small and read in full by the client anyway
+            await response.aread()
+            try:
+                usage = json.loads(response.content).get("usage") or {}
+            except ValueError:
+                usage = {}
+            if usage.get("total_tokens"):
+                limiter.settle(estimated, int(usage["total_tokens"]))
+        return response
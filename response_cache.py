@@ -0,0 +1,348 @@
+import base64
+import dataclasses
+import hashlib
+import json
+import os
+import re
+import threading
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import httpx
+from openai.types.responses.response_output_item import ResponseOutputItem
+from pydantic import BaseModel, TypeAdapter
+from agents import Model, ModelResponse, Usage
+
+# ---- Config ----
+# off: always call the model | readwrite: serve hits, store misses | replay: hits only, never call the model
+LLM_CACHE: str = os.getenv("LLM_CACHE", "off").lower()
+LLM_CACHE_DIR: str = os.getenv(
+    "LLM_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".llm_cache")
+)
+LLM_CACHE_MAX_MB: float = float(os.getenv("LLM_CACHE_MAX_MB", "256"))
+
+CACHE_MODES = ("off", "readwrite", "replay")
+
+_output_adapter: TypeAdapter = TypeAdapter(List[ResponseOutputItem])
+
+
+class CacheMissError(RuntimeError):
+    """Raised in replay mode when a model call or tool HTTP request has no recorded response."""
+
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json", exclude_unset=True)
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    return repr(value)
+
+
+def _tool_fingerprint(tool: Any) -> Dict[str, Any]:
+    return {
+        "name": getattr(tool, "name", type(tool).__name__),
+        "description": getattr(tool, "description", None),
+        "parameters": getattr(tool, "params_json_schema", None),
+        "strict": getattr(tool, "strict_json_schema", None),
+    }
+
+
+def cache_key(
+    model: str,
+    system_instructions: Optional[str],
+    input: Any,
+    model_settings: Any,
+    tools: List[Any],
+    output_schema: Any,
+    handoffs: List[Any],
+    prompt: Any = None,
+) -> str:
+    """Content hash of everything that determines the model's answer."""
+    payload = {
+        "model": model,
+        "instructions": system_instructions,
+        "input": input,
+        "settings": model_settings.to_json_dict() if model_settings is not None else None,
+        "tools": [_tool_fingerprint(t) for t in tools],
+        "output_schema": (
+            None
+            if output_schema is None or output_schema.is_plain_text()
+            else output_schema.json_schema()
+        ),
+        "handoffs": [{"name": h.tool_name, "schema": h.input_json_schema} for h in handoffs],
+        "prompt": prompt,
+    }
+    blob = json.dumps(payload, sort_keys=True, default=_jsonable, ensure_ascii=False)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+# ---------- Disk store ----------
+class ResponseStore:
+    """
+    One JSON file per cache key. File mtimes double as LRU order: hits touch the file,
+    and writes evict the least recently used files once the directory exceeds `max_bytes`.
+    """
+
+    def __init__(self, directory: str = LLM_CACHE_DIR, max_bytes: int = int(LLM_CACHE_MAX_MB * 1024 * 1024)) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # key -> (size, last access); loaded from disk on first use
+        self._index: Optional[Dict[str, Tuple[int, float]]] = None
+        self._total = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _load_index(self) -> Dict[str, Tuple[int, float]]:
+        if self._index is None:
+            os.makedirs(self.directory, exist_ok=True)
+            index: Dict[str, Tuple[int, float]] = {}
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if entry.name.endswith(".json"):
+                        st = entry.stat()
+                        index[entry.name[:-5]] = (st.st_size, st.st_mtime)
+            self._index = index
+            self._total = sum(size for size, _ in index.values())
+        return self._index
+
+    def read(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            index = self._load_index()
+            if key not in index:
+                return None
+            path = self._path(key)
+            try:
+                with open(path, encoding="utf-8") as f:
+                    data = json.load(f)
+                os.utime(path)
+            except (OSError, ValueError):
+                self._drop(key)
+                return None
+            index[key] = (index[key][0], os.path.getmtime(path))
+        return data
+
+    def write(self, key: str, data: Dict[str, Any]) -> None:
+        blob = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        with self._lock:
+            index = self._load_index()
+            path = self._path(key)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(blob)
+            os.replace(tmp, path)
+            if key in index:
+                self._total -= index[key][0]
+            index[key] = (len(blob), os.path.getmtime(path))
+            self._total += len(blob)
+            self._evict()
+
+    def get(self, key: str) -> Optional[ModelResponse]:
+        data = self.read(key)
+        if data is None:
+            return None
+        return ModelResponse(
+            output=_output_adapter.validate_python(data["output"]),
+            # Nothing was billed for a cache hit
+            usage=Usage(),
+            response_id=data.get("response_id"),
+        )
+
+    def put(self, key: str, response: ModelResponse) -> None:
+        usage = response.usage
+        data = {
+            "output": [item.model_dump(mode="json", exclude_unset=True) for item in response.output],
+            "response_id": response.response_id,
+            "usage": {
+                "requests": usage.requests,
+                "input_tokens": usage.input_tokens,
+                "output_tokens": usage.output_tokens,
+                "total_tokens": usage.total_tokens,
+            },
+        }
+        self.write(key, data)
+
+    def _drop(self, key: str) -> None:
+        size, _ = self._index.pop(key, (0, 0.0))
+        self._total -= size
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def _evict(self) -> None:
+        if self._total <= self.max_bytes:
+            return
+        for key, _ in sorted(self._index.items(), key=lambda kv: kv[1][1]):
+            self._drop(key)
+            if self._total <= self.max_bytes:
+                break
+
+
+# ---------- Model wrapper ----------
+class CachingModel(Model):
+    """
+    Serves `get_response` from the disk store when the same request was seen before,
+    skipping the model call entirely. In replay mode a miss raises CacheMissError,
+    so runs are deterministic and never touch the network.
+    """
+
+    def __init__(self, inner: Model, model_name: str, store: ResponseStore, mode: str = "readwrite") -> None:
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Unknown LLM_CACHE mode {mode!r}; expected one of {CACHE_MODES}")
+        self.inner = inner
+        self.model = model_name
+        self.store = store
+        self.mode = mode
+        self.hits = 0
+        self.misses = 0
+
+    async def get_response(
+        self,
+        system_instructions,
+        input,
+        model_settings,
+        tools,
+        output_schema,
+        handoffs,
+        tracing,
+        *,
+        previous_response_id=None,
+        prompt=None,
+    ) -> ModelResponse:
+        key = cache_key(
+            self.model, system_instructions, input, model_settings, tools, output_schema, handoffs, prompt
+        )
+        cached = self.store.get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        self.misses += 1
+        if self.mode == "replay":
+            raise CacheMissError(
+                f"No recorded response for {self.model} (key {key[:12]}); "
+                "record one with LLM_CACHE=readwrite first."
+            )
+
+        response = await self.inner.get_response(
+            system_instructions,
+            input,
+            model_settings,
+            tools,
+            output_schema,
+            handoffs,
+            tracing,
+            previous_response_id=previous_response_id,
+            prompt=prompt,
+        )
+        self.store.put(key, response)
+        return response
+
+    async def stream_response(self, *args, **kwargs) -> AsyncIterator:
+        # Streamed runs are not cached; in replay mode they must not reach the network either
+        if self.mode == "replay":
+            raise CacheMissError(f"Streaming is not available in replay mode ({self.model}).")
+        async for event in self.inner.stream_response(*args, **kwargs):
+            yield event
+
+
+# ---------- Tool HTTP calls ----------
+# Query parameters that carry credentials; left out of the key so recordings replay with any key
+_SECRET_PARAM = re.compile(r"key|token|secret|password|appid|auth", re.IGNORECASE)
+
+
+def http_cache_key(request: httpx.Request) -> str:
+    """Content hash of a tool's HTTP request: method, URL without credentials, and body."""
+    params = sorted((k, v) for k, v in request.url.params.multi_items() if not _SECRET_PARAM.search(k))
+    payload = {
+        "method": request.method,
+        "url": str(request.url.copy_with(query=None)),
+        "params": params,
+        "body": hashlib.sha256(request.content).hexdigest(),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class HttpCacheTransport(httpx.AsyncBaseTransport):
+    """
+    httpx transport for the tools' shared client (see http_client.py) that records
+    responses to the same store as model calls, so LLM_CACHE=replay covers whole runs,
+    tool calls included. Headers are not part of the key and are not stored, except
+    Content-Type. Server errors (5xx) are passed through without being recorded.
+    """
+
+    def __init__(self, inner: httpx.AsyncBaseTransport, store: ResponseStore, mode: str = "readwrite") -> None:
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Unknown LLM_CACHE mode {mode!r}; expected one of {CACHE_MODES}")
+        self.inner = inner
+        self.store = store
+        self.mode = mode
+        self.hits = 0
+        self.misses = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        key = http_cache_key(request)
+        cached = self.store.read(key)
+        if cached is not None:
+            self.hits += 1
+            return httpx.Response(
+                cached["status"],
+                headers={"content-type": cached["content_type"]} if cached.get("content_type") else None,
+                content=base64.b64decode(cached["content"]),
+                request=request,
+            )
+
+        self.misses += 1
+        if self.mode == "replay":
+            raise CacheMissError(
+                f"No recorded response for {request.method} {request.url.copy_with(query=None)} "
+                f"(key {key[:12]}); record one with LLM_CACHE=readwrite first."
+            )
+
+        response = await self.inner.handle_async_request(request)
+        try:
+            content = await response.aread()
+        finally:
+            await response.aclose()
+        content_type = response.headers.get("content-type")
+        if response.status_code < 500:
+            self.store.write(
+                key,
+                {"status": response.status_code, "content_type": content_type, "content": base64.b64encode(content).decode("ascii")},
+            )
+        # aread() decoded any Content-Encoding, so only the content type carries over
+        return httpx.Response(
+            response.status_code,
+            headers={"content-type": content_type} if content_type else None,
+            content=content,
+            request=request,
+        )
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+
+_store: Optional[ResponseStore] = None
+_http_store: Optional[ResponseStore] = None
+
+
+def with_response_cache(inner: Model, model_name: str, mode: str = LLM_CACHE) -> Model:
+    """Wrap `inner` in the shared on-disk response cache unless caching is off."""
+    global _store
+    if mode == "off":
+        return inner
+    if _store is None:
+        _store = ResponseStore()
+    return CachingModel(inner, model_name, _store, mode)
+
+
+def with_http_cache(inner: httpx.AsyncBaseTransport, mode: str = LLM_CACHE) -> httpx.AsyncBaseTransport:
+    """Wrap a tool HTTP transport in the on-disk cache (LLM_CACHE_DIR/http) unless caching is off."""
+    global _http_store
+    if mode == "off":
+        return inner
+    if _http_store is None:
+        _http_store = ResponseStore(os.path.join(LLM_CACHE_DIR, "http"))
+    return HttpCacheTransport(inner, _http_store, mode)
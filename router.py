@@ -0,0 +1,191 @@
+import asyncio
+import json
+import os
+import re
+import statistics
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional, Sequence
+
+import openai
+from agents import Model, ModelResponse
+from agents.exceptions import ModelBehaviorError
+
+from llm import FAST_MODEL, STRONG_MODEL, get_model
+from structured import ValidatingModel, calls_tools, response_text
+
+# ---- Config ----
+# USD per 1M (input, output) tokens, for the per-route cost estimate.
+# Override or extend with LLM_PRICES='{"model": [in, out], ...}'.
+MODEL_PRICES: Dict[str, List[float]] = {
+    "gemini-2.0-flash": [0.10, 0.40],
+    "gemini-2.5-flash": [0.30, 2.50],
+    "gpt-4o-mini": [0.15, 0.60],
+    **json.loads(os.getenv("LLM_PRICES", "{}")),
+}
+
+# Answers that signal the cheap model was out of its depth
+_HEDGES = re.compile(
+    r"\b(i'?m not sure|i am not sure|i don'?t know|i do not know|"
+    r"i (?:cannot|can'?t|am unable to) (?:answer|determine|help with|solve)|unable to determine)\b",
+    re.IGNORECASE,
+)
+
+# Failures of one route that a stronger route may not share
+ESCALATE_ON = (ModelBehaviorError, openai.APIError, asyncio.TimeoutError)
+
+
+def low_confidence(response: ModelResponse) -> Optional[str]:
+    """Default acceptance check: the reason to escalate `response`, or None to keep it."""
+    if calls_tools(response):
+        return None
+    text = response_text(response).strip()
+    if not text:
+        return "empty answer"
+    if _HEDGES.search(text):
+        return "hedged answer"
+    return None
+
+
+@dataclass
+class RouteStats:
+    requests: int = 0
+    served: int = 0
+    escalated: int = 0
+    errors: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cost_usd: float = 0.0
+    latencies_ms: Deque[float] = field(default_factory=lambda: deque(maxlen=1000))
+    reasons: Dict[str, int] = field(default_factory=dict)
+
+    def summary(self) -> Dict[str, Any]:
+        ordered = sorted(self.latencies_ms)
+        return {
+            "requests": self.requests,
+            "served": self.served,
+            "escalated": self.escalated,
+            "escalation_rate": round(self.escalated / self.requests, 3) if self.requests else 0.0,
+            "errors": self.errors,
+            "p50_ms": round(statistics.median(ordered), 1) if ordered else 0.0,
+            "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 1) if ordered else 0.0,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "cost_usd": round(self.cost_usd, 6),
+            "reasons": dict(self.reasons),
+        }
+
+
+# Process-wide stats by model name, shared by every cascade
+_stats: Dict[str, RouteStats] = {}
+
+
+def route_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: stats.summary() for name, stats in _stats.items()}
+
+
+class CascadeModel(Model):
+    """
+    Tries `models` from cheapest to strongest. A response is kept unless `accept`
+    returns a reason to escalate (by default: empty or hedged answers); a route that
+    fails with a model, API or timeout error also escalates. The last route's answer
+    is always returned. Latency, tokens, cost and escalations are recorded per route.
+
+    Streamed runs use the first route, falling back only if it fails before
+    producing any output.
+    """
+
+    def __init__(
+        self,
+        models: Sequence[Model],
+        accept: Callable[[ModelResponse], Optional[str]] = low_confidence,
+    ) -> None:
+        if not models:
+            raise ValueError("CascadeModel needs at least one model")
+        self.models = list(models)
+        self.names = [str(getattr(m, "model", m)) for m in self.models]
+        self.model = "cascade:" + ">".join(self.names)
+        self.accept = accept
+        for name in self.names:
+            _stats.setdefault(name, RouteStats())
+
+    def _record(self, name: str, response: ModelResponse, started: float) -> RouteStats:
+        stats = _stats[name]
+        stats.latencies_ms.append((time.perf_counter() - started) * 1000)
+        stats.input_tokens += response.usage.input_tokens
+        stats.output_tokens += response.usage.output_tokens
+        price_in, price_out = MODEL_PRICES.get(name, (0.0, 0.0))
+        stats.cost_usd += (response.usage.input_tokens * price_in + response.usage.output_tokens * price_out) / 1e6
+        return stats
+
+    @staticmethod
+    def _escalate(stats: RouteStats, reason: str) -> None:
+        stats.escalated += 1
+        stats.reasons[reason] = stats.reasons.get(reason, 0) + 1
+
+    async def get_response(self, *args, **kwargs) -> ModelResponse:
+        last = len(self.models) - 1
+        for i, (model, name) in enumerate(zip(self.models, self.names)):
+            stats = _stats[name]
+            stats.requests += 1
+            started = time.perf_counter()
+            try:
+                response = await model.get_response(*args, **kwargs)
+            except ESCALATE_ON as e:
+                stats.errors += 1
+                if i == last:
+                    raise
+                self._escalate(stats, type(e).__name__)
+                continue
+            self._record(name, response, started)
+            reason = self.accept(response) if i < last else None
+            if reason is None:
+                stats.served += 1
+                return response
+            self._escalate(stats, reason)
+        raise AssertionError("unreachable")
+
+    async def stream_response(self, *args, **kwargs) -> AsyncIterator:
+        last = len(self.models) - 1
+        for i, (model, name) in enumerate(zip(self.models, self.names)):
+            stats = _stats[name]
+            stats.requests += 1
+            started_output = False
+            try:
+                async for event in model.stream_response(*args, **kwargs):
+                    started_output = True
+                    yield event
+            except ESCALATE_ON as e:
+                stats.errors += 1
+                if started_output or i == last:
+                    raise
+                self._escalate(stats, type(e).__name__)
+                continue
+            stats.served += 1
+            return
+
+
+def get_cascade(
+    models: Sequence[str] = (FAST_MODEL, STRONG_MODEL),
+    validator: Optional[Callable[[], Any]] = None,
+    accept: Callable[[ModelResponse], Optional[str]] = low_confidence,
+    **model_kwargs: Any,
+) -> CascadeModel:
+    """
+    Cascade over shared models (see llm.get_model), cheapest first.
+
+    With a `validator` (see structured.py) every route streams through it; cheaper
+    routes get a single attempt, so an off-format answer escalates at once instead of
+    being retried on the same model.
+
+        llm_model = get_cascade()                       # FAST_MODEL, then STRONG_MODEL
+    """
+    routes: List[Model] = []
+    for i, name in enumerate(models):
+        model = get_model(name, **model_kwargs)
+        if validator is not None:
+            final = i == len(models) - 1
+            model = ValidatingModel(model, validator) if final else ValidatingModel(model, validator, max_attempts=1)
+        routes.append(model)
+    return CascadeModel(routes, accept=accept)
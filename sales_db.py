@@ -0,0 +1,313 @@
+import base64
+import hashlib
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# ---- Config ----
+SALES_DB_PATH: str = os.getenv(
+    "SALES_DB_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "sales.db")
+)
+SALES_DB_POOL_SIZE: int = int(os.getenv("SALES_DB_POOL_SIZE", "4"))
+SALES_DB_TIMEOUT: float = float(os.getenv("SALES_DB_TIMEOUT", "2.0"))
+# Caps on one page of query results handed back to a model (see SalesDatabase.query_page)
+SALES_PAGE_ROWS: int = int(os.getenv("SALES_PAGE_ROWS", "50"))
+SALES_PAGE_BYTES: int = int(os.getenv("SALES_PAGE_BYTES", "4000"))
+SALES_CELL_CHARS: int = int(os.getenv("SALES_CELL_CHARS", "200"))
+
+# Same rows the original in-memory mock was seeded with
+SAMPLE_SALES: List[Tuple[str, int]] = [
+    ("Jan", 12000),
+    ("Feb", 15000),
+    ("Mar", 18000),
+    ("Apr", 10000),
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sales (
+    id INTEGER PRIMARY KEY,
+    month TEXT,
+    revenue INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_sales_month ON sales (month, revenue);
+"""
+
+# How many SQLite VM instructions run between two timeout checks
+_PROGRESS_STEPS = 1000
+
+
+# ---------- Build ----------
+def build_database(
+    path: str = SALES_DB_PATH,
+    rows: Iterable[Tuple[str, int]] = SAMPLE_SALES,
+    batch_size: int = 50_000,
+) -> None:
+    """
+    Create (or replace) the file-backed sales database and load `rows` into it.
+    The file is written next to `path` first and swapped in atomically, so readers
+    never see a half-loaded table.
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.execute("PRAGMA journal_mode=OFF")
+        conn.execute("PRAGMA synchronous=OFF")
+        # Load first, index after: building the index once is much cheaper than
+        # maintaining it row by row.
+        conn.execute("CREATE TABLE sales (id INTEGER PRIMARY KEY, month TEXT, revenue INTEGER)")
+        batch: List[Tuple[str, int]] = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                conn.executemany("INSERT INTO sales (month, revenue) VALUES (?, ?)", batch)
+                batch.clear()
+        if batch:
+            conn.executemany("INSERT INTO sales (month, revenue) VALUES (?, ?)", batch)
+        conn.executescript(SCHEMA)
+        conn.execute("ANALYZE")
+        conn.commit()
+    finally:
+        conn.close()
+
+    os.replace(tmp_path, path)
+
+
+# ---------- Paged results ----------
+@dataclass
+class QueryPage:
+    """One bounded page of a query's rows, with a cursor to the next page if there is one."""
+
+    columns: List[str]
+    rows: List[list] = field(default_factory=list)
+    offset: int = 0
+    # Why the page ended early: "rows", "bytes" or "time" (None if the result is complete)
+    stopped: Optional[str] = None
+    next_cursor: Optional[str] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        page: Dict[str, Any] = {"columns": self.columns, "rows": self.rows, "offset": self.offset}
+        if self.next_cursor:
+            page["stopped"] = self.stopped
+            page["next_cursor"] = self.next_cursor
+        return page
+
+
+def _fingerprint(sql: str) -> str:
+    return hashlib.sha1(" ".join(sql.split()).encode("utf-8")).hexdigest()[:12]
+
+
+def encode_cursor(sql: str, offset: int) -> str:
+    """Opaque continuation token: the query it belongs to and where the next page starts."""
+    raw = json.dumps({"q": _fingerprint(sql), "o": offset}).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(sql: str, cursor: str) -> int:
+    try:
+        state = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        offset = int(state["o"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("invalid cursor") from e
+    if state.get("q") != _fingerprint(sql):
+        raise ValueError("cursor belongs to a different query; resend the query it came with")
+    return offset
+
+
+def _cell(value: Any) -> Any:
+    if isinstance(value, bytes):
+        return f"<{len(value)} bytes>"
+    if isinstance(value, str) and len(value) > SALES_CELL_CHARS:
+        return value[:SALES_CELL_CHARS] + "..."
+    return value
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+# ---------- Read-only pool ----------
+class SalesDatabase:
+    """
+    A small pool of long-lived, read-only connections over the sales database.
+
+    Connections are opened once and reused, so each query skips connect/schema/load
+    work and benefits from sqlite3's per-connection prepared-statement cache.
+    Every query runs under a wall-clock timeout enforced by a progress handler.
+    """
+
+    def __init__(
+        self,
+        path: str = SALES_DB_PATH,
+        pool_size: int = SALES_DB_POOL_SIZE,
+        timeout: float = SALES_DB_TIMEOUT,
+        cached_statements: int = 256,
+    ) -> None:
+        self.path = path
+        self.timeout = timeout
+        self._cached_statements = cached_statements
+        self._pool: "queue.Queue[sqlite3.Connection]" = queue.Queue(maxsize=pool_size)
+        for _ in range(pool_size):
+            self._pool.put(self._connect())
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            f"file:{self.path}?mode=ro",
+            uri=True,
+            check_same_thread=False,
+            cached_statements=self._cached_statements,
+        )
+        conn.execute("PRAGMA query_only=ON")
+        conn.execute("PRAGMA mmap_size=268435456")
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        conn = self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    @contextmanager
+    def _budgeted(self, timeout: Optional[float]) -> Iterator[Tuple[sqlite3.Connection, float]]:
+        """A pooled connection whose statements are interrupted past the time budget."""
+        budget = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + budget
+        with self.connection() as conn:
+            conn.set_progress_handler(lambda: time.monotonic() > deadline, _PROGRESS_STEPS)
+            try:
+                yield conn, budget
+            finally:
+                conn.set_progress_handler(None, 0)
+
+    def execute(
+        self, sql: str, params: Tuple = (), timeout: Optional[float] = None
+    ) -> List[tuple]:
+        """
+        Run a read-only query and return all rows.
+        Raises TimeoutError if the query runs longer than `timeout` seconds.
+        """
+        with self._budgeted(timeout) as (conn, budget):
+            try:
+                return conn.execute(sql, params).fetchall()
+            except sqlite3.OperationalError as e:
+                if str(e) == "interrupted":
+                    raise TimeoutError(f"Query exceeded {budget:.1f}s budget") from e
+                raise
+
+    def query_page(
+        self,
+        sql: str,
+        cursor: Optional[str] = None,
+        max_rows: int = SALES_PAGE_ROWS,
+        max_bytes: int = SALES_PAGE_BYTES,
+        timeout: Optional[float] = None,
+    ) -> QueryPage:
+        """
+        Run a read-only query and return at most `max_rows` rows / about `max_bytes`
+        of JSON, starting where `cursor` (from a previous page) left off.
+
+        Rows are streamed from SQLite and never materialised beyond the page. If the
+        time budget runs out mid-page, the rows read so far are returned with a cursor.
+        """
+        offset = decode_cursor(sql, cursor) if cursor else 0
+        with self._budgeted(timeout) as (conn, budget):
+            try:
+                cur = conn.execute(sql)
+            except sqlite3.OperationalError as e:
+                if str(e) == "interrupted":
+                    raise TimeoutError(f"Query exceeded {budget:.1f}s budget") from e
+                raise
+            page = QueryPage(columns=[d[0] for d in cur.description or ()], offset=offset)
+            size = len(json.dumps(page.columns))
+            try:
+                skipped = 0
+                while skipped < offset:
+                    batch = cur.fetchmany(min(offset - skipped, 1000))
+                    if not batch:
+                        return page
+                    skipped += len(batch)
+                for row in cur:
+                    cells = [_cell(v) for v in row]
+                    size += len(json.dumps(cells, default=str)) + 1
+                    if len(page.rows) >= max_rows or (page.rows and size > max_bytes):
+                        page.stopped = "rows" if len(page.rows) >= max_rows else "bytes"
+                        break
+                    page.rows.append(cells)
+            except sqlite3.OperationalError as e:
+                if str(e) != "interrupted":
+                    raise
+                if not page.rows:
+                    raise TimeoutError(f"Query exceeded {budget:.1f}s budget") from e
+                page.stopped = "time"
+            finally:
+                cur.close()  # release the statement; the rest of the result is never read
+        if page.stopped:
+            page.next_cursor = encode_cursor(sql, offset + len(page.rows))
+        return page
+
+    def summarize(self, sql: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Aggregate a SELECT's result inside SQLite instead of returning it: the row
+        count and, per column, non-null and distinct counts, min/max, and sum/avg
+        when the values are numeric.
+        """
+        inner = sql.strip().rstrip(";")
+        # The closing parentheses go on their own line so a trailing "-- comment" can't swallow them
+        with self._budgeted(timeout) as (conn, budget):
+            try:
+                columns = [d[0] for d in conn.execute(f"SELECT * FROM ({inner}\n) LIMIT 0").description]
+                parts = ["COUNT(*)"]
+                for name in columns:
+                    c = _quote(name)
+                    parts += [
+                        f"COUNT({c})",
+                        f"COUNT(DISTINCT {c})",
+                        f"MIN({c})",
+                        f"MAX({c})",
+                        f"SUM(typeof({c}) IN ('integer', 'real'))",
+                        f"SUM({c})",
+                        f"AVG({c})",
+                    ]
+                row = conn.execute(f"SELECT {', '.join(parts)} FROM ({inner}\n)").fetchone()
+            except sqlite3.OperationalError as e:
+                if str(e) == "interrupted":
+                    raise TimeoutError(f"Query exceeded {budget:.1f}s budget") from e
+                raise
+        summary: Dict[str, Any] = {"rows": row[0], "columns": {}}
+        for i, name in enumerate(columns):
+            non_null, distinct, low, high, numeric, total, mean = row[1 + 7 * i : 8 + 7 * i]
+            stats: Dict[str, Any] = {"non_null": non_null, "distinct": distinct, "min": _cell(low), "max": _cell(high)}
+            if numeric and numeric == non_null:
+                stats.update(sum=total, avg=round(mean, 4) if mean is not None else None)
+            summary["columns"][name] = stats
+        return summary
+
+    def close(self) -> None:
+        while not self._pool.empty():
+            self._pool.get_nowait().close()
+
+
+_db: Optional[SalesDatabase] = None
+_db_lock = threading.Lock()
+
+
+def get_sales_db() -> SalesDatabase:
+    """Return the process-wide sales database, building the file on first use if needed."""
+    global _db
+    if _db is None:
+        with _db_lock:
+            if _db is None:
+                if not os.path.exists(SALES_DB_PATH):
+                    build_database(SALES_DB_PATH)
+                _db = SalesDatabase(SALES_DB_PATH)
+    return _db
@@ -0,0 +1,235 @@
+import json
+import os
+import threading
+from array import array
+from bisect import bisect_left
+from datetime import date
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+# ---- Config ----
+# Optional file written by SalesStore.save(); the sample rows are used when it does not exist
+SALES_STORE_PATH: str = os.getenv(
+    "SALES_STORE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "sales_store.bin")
+)
+
+# Same rows ex10 used to keep in MOCK_MARCH_2025
+SAMPLE_SALES: List[Dict] = [
+    {"date": "2025-03-01", "sales": 12450, "region": "NA", "product": "Core"},
+    {"date": "2025-03-08", "sales": 13980, "region": "EU", "product": "Core"},
+    {"date": "2025-03-15", "sales": 15210, "region": "APAC", "product": "Pro"},
+    {"date": "2025-03-22", "sales": 16175, "region": "NA", "product": "Pro"},
+    {"date": "2025-03-29", "sales": 17040, "region": "EU", "product": "Core"},
+]
+
+_FORMAT_VERSION = 2  # 2: amounts are stored in cents
+
+
+class _Dictionary:
+    """Dictionary encoding for a low-cardinality string column; lookups ignore case."""
+
+    def __init__(self, names: Sequence[str] = ()) -> None:
+        self.names: List[str] = list(names)
+        self._codes: Dict[str, int] = {name.casefold(): i for i, name in enumerate(self.names)}
+
+    def encode(self, name: str) -> int:
+        key = name.casefold()
+        code = self._codes.get(key)
+        if code is None:
+            if len(self.names) >= 1 << 16:
+                raise ValueError("too many distinct values for a 16-bit dictionary column")
+            code = self._codes[key] = len(self.names)
+            self.names.append(name)
+        return code
+
+    def lookup(self, name: str) -> Optional[int]:
+        return self._codes.get(name.strip().casefold())
+
+
+class SalesStore:
+    """
+    Read-only, column-oriented sales table.
+
+    Rows are kept sorted by date in parallel arrays (day ordinal, amount, region code,
+    product code); region and product are dictionary-encoded to 16-bit codes. Three
+    indexes are built once: (year, month) -> contiguous row range, and region/product ->
+    sorted row ids. A filtered lookup bisects the smallest posting list to the month's
+    range and checks the remaining filter against its code column, so it touches only
+    the rows it could return. Amounts are kept as integer cents, so fractional figures
+    survive and totals are exact. About 24 bytes per row, versus several hundred for a dict.
+    """
+
+    def __init__(self) -> None:
+        self.days = array("I")
+        self.amounts = array("q")
+        self.region_codes = array("H")
+        self.product_codes = array("H")
+        self.regions = _Dictionary()
+        self.products = _Dictionary()
+        self.month_index: Dict[Tuple[int, int], Tuple[int, int]] = {}
+        self.by_region: List[array] = []
+        self.by_product: List[array] = []
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    # ---------- Build ----------
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict]) -> "SalesStore":
+        """Build from dicts with "date" (YYYY-MM-DD), "sales", "region" and "product"."""
+        store = cls()
+        for r in sorted(rows, key=lambda r: r["date"]):
+            store.days.append(date.fromisoformat(r["date"]).toordinal())
+            store.amounts.append(_to_cents(r["sales"]))
+            store.region_codes.append(store.regions.encode(r["region"]))
+            store.product_codes.append(store.products.encode(r["product"]))
+        store._build_indexes()
+        return store
+
+    def _build_indexes(self) -> None:
+        self.month_index.clear()
+        current: Optional[Tuple[int, int]] = None
+        last_day = -1
+        for i, day in enumerate(self.days):
+            if day == last_day:
+                continue
+            last_day = day
+            d = date.fromordinal(day)
+            if (d.year, d.month) != current:
+                if current is not None:
+                    self.month_index[current] = (self.month_index[current][0], i)
+                current = (d.year, d.month)
+                self.month_index[current] = (i, i)
+        if current is not None:
+            self.month_index[current] = (self.month_index[current][0], len(self.days))
+
+        self.by_region = _postings(self.region_codes, len(self.regions.names))
+        self.by_product = _postings(self.product_codes, len(self.products.names))
+
+    # ---------- Persistence ----------
+    def save(self, path: str = SALES_STORE_PATH) -> None:
+        """Write the columns and indexes to one binary file (atomically replaced)."""
+        header = {
+            "version": _FORMAT_VERSION,
+            "rows": len(self),
+            "regions": self.regions.names,
+            "products": self.products.names,
+            "months": [[y, m, s, e] for (y, m), (s, e) in sorted(self.month_index.items())],
+            "region_postings": [len(p) for p in self.by_region],
+            "product_postings": [len(p) for p in self.by_product],
+        }
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(json.dumps(header).encode("utf-8") + b"\n")
+            for column in (self.days, self.amounts, self.region_codes, self.product_codes):
+                column.tofile(f)
+            for posting in self.by_region + self.by_product:
+                posting.tofile(f)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str = SALES_STORE_PATH) -> "SalesStore":
+        store = cls()
+        with open(path, "rb") as f:
+            header = json.loads(f.readline())
+            if header.get("version") != _FORMAT_VERSION:
+                raise ValueError(f"{path}: unsupported sales store version {header.get('version')}")
+            n = header["rows"]
+            for column in (store.days, store.amounts, store.region_codes, store.product_codes):
+                column.fromfile(f, n)
+            store.regions = _Dictionary(header["regions"])
+            store.products = _Dictionary(header["products"])
+            store.month_index = {(y, m): (s, e) for y, m, s, e in header["months"]}
+            for sizes, target in (
+                (header["region_postings"], store.by_region),
+                (header["product_postings"], store.by_product),
+            ):
+                for size in sizes:
+                    posting = array("I")
+                    posting.fromfile(f, size)
+                    target.append(posting)
+        return store
+
+    # ---------- Query ----------
+    def select(
+        self,
+        year: int,
+        month: int,
+        region: Optional[str] = None,
+        product: Optional[str] = None,
+    ) -> Sequence[int]:
+        """Row ids for one month, optionally filtered by region and/or product (case-insensitive)."""
+        span = self.month_index.get((year, month))
+        if span is None:
+            return ()
+        start, end = span
+
+        # (posting slice, code column, code) for every active filter
+        filters = []
+        for value, dictionary, postings, column in (
+            (region, self.regions, self.by_region, self.region_codes),
+            (product, self.products, self.by_product, self.product_codes),
+        ):
+            if not value:
+                continue
+            code = dictionary.lookup(value)
+            if code is None:
+                return ()
+            ids = postings[code]
+            lo = bisect_left(ids, start)
+            hi = bisect_left(ids, end, lo)
+            filters.append((ids[lo:hi], column, code))
+
+        if not filters:
+            return range(start, end)
+        filters.sort(key=lambda f: len(f[0]))
+        rows = filters[0][0]
+        for _, column, code in filters[1:]:
+            rows = array("I", (i for i in rows if column[i] == code))
+        return rows
+
+    def rows(self, ids: Iterable[int]) -> Iterator[Dict]:
+        """Materialise row ids back into dicts (only for the rows being returned)."""
+        for i in ids:
+            yield {
+                "date": date.fromordinal(self.days[i]).isoformat(),
+                "sales": _from_cents(self.amounts[i]),
+                "region": self.regions.names[self.region_codes[i]],
+                "product": self.products.names[self.product_codes[i]],
+            }
+
+    def total(self, ids: Iterable[int]) -> Union[int, float]:
+        amounts = self.amounts
+        return _from_cents(sum(amounts[i] for i in ids))
+
+
+def _to_cents(amount) -> int:
+    return round(float(amount) * 100)
+
+
+def _from_cents(cents: int) -> Union[int, float]:
+    # Whole amounts stay ints, so the tool output reads 12450 rather than 12450.0
+    return cents // 100 if cents % 100 == 0 else cents / 100
+
+
+def _postings(codes: array, cardinality: int) -> List[array]:
+    postings = [array("I") for _ in range(cardinality)]
+    for i, code in enumerate(codes):
+        postings[code].append(i)
+    return postings
+
+
+_store: Optional[SalesStore] = None
+_store_lock = threading.Lock()
+
+
+def get_sales_store() -> SalesStore:
+    """Process-wide store: loaded from SALES_STORE_PATH if present, else built from SAMPLE_SALES."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                if os.path.exists(SALES_STORE_PATH):
+                    _store = SalesStore.load(SALES_STORE_PATH)
+                else:
+                    _store = SalesStore.from_rows(SAMPLE_SALES)
+    return _store
@@ -0,0 +1,314 @@
+"""
+Serve the exercise agents over local HTTP from one long-running process, so requests
+reuse imported modules, warm model clients and pooled tool connections.
+
+    python server.py                      # all exercises on 127.0.0.1:8700
+    python server.py --agents ex1,ex7,ex10,ex9:marketing_agent --port 8700
+
+    curl -s localhost:8700/v1/agents
+    curl -s localhost:8700/v1/agents/ex7/run -d '{"prompt": "Ship 5kg from New York to Paris"}'
+    curl -s localhost:8700/metrics
+
+Each agent runs at most its concurrency limit (SERVE_AGENT_CONCURRENCY, or per agent
+via SERVE_AGENT_LIMITS) and all agents together at most SERVE_WORKERS. Requests
+beyond that wait in a bounded queue. When the queue is full, or a request has waited
+longer than SERVE_QUEUE_TIMEOUT, the server answers 503 with Retry-After instead of
+letting latency grow without bound. On SIGINT/SIGTERM it stops accepting, lets
+in-flight runs finish, then closes its clients. An agent that fails to load (e.g. ex7
+without SHIPENGINE_API_KEY) is listed as unavailable and answers 503; the rest are served.
+"""
+import argparse
+import asyncio
+import json
+import os
+import signal
+import statistics
+import sys
+import time
+from collections import deque
+from dataclasses import asdict
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+from batch import BatchJob, load_agent, run_job
+from http_client import aclose_http_client, get_http_client
+from llm import get_client
+from main import discover
+from ratelimit import rate_limit_stats
+from tool_encoding import encoding_stats
+
+# ---- Config ----
+SERVE_HOST: str = os.getenv("SERVE_HOST", "127.0.0.1")
+SERVE_PORT: int = int(os.getenv("SERVE_PORT", "8700"))
+# Agent runs in flight across all agents
+SERVE_WORKERS: int = int(os.getenv("SERVE_WORKERS", "16"))
+# Runs in flight per agent, unless overridden: SERVE_AGENT_LIMITS='{"ex7": 2}'
+SERVE_AGENT_CONCURRENCY: int = int(os.getenv("SERVE_AGENT_CONCURRENCY", "4"))
+SERVE_AGENT_LIMITS: Dict[str, int] = json.loads(os.getenv("SERVE_AGENT_LIMITS", "{}"))
+# Requests allowed to wait for a slot; beyond this they are rejected with 503
+SERVE_QUEUE: int = int(os.getenv("SERVE_QUEUE", "64"))
+SERVE_QUEUE_TIMEOUT: float = float(os.getenv("SERVE_QUEUE_TIMEOUT", "30"))
+SERVE_RUN_TIMEOUT: float = float(os.getenv("SERVE_RUN_TIMEOUT", "120"))
+SERVE_DRAIN_TIMEOUT: float = float(os.getenv("SERVE_DRAIN_TIMEOUT", "30"))
+SERVE_MAX_BODY: int = int(os.getenv("SERVE_MAX_BODY", str(1 << 20)))
+# Token budget per run (see usage.py); 0 = none
+SERVE_TOKEN_BUDGET: int = int(os.getenv("SERVE_TOKEN_BUDGET", "0"))
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large",
+           500: "Internal Server Error", 503: "Service Unavailable", 504: "Gateway Timeout"}
+
+
+class Overloaded(Exception):
+    """The request could not get a slot; answered with 503."""
+
+
+class AgentSlot:
+    """Concurrency limit and counters for one served agent."""
+
+    def __init__(self, spec: str, name: str, limit: int) -> None:
+        self.spec = spec
+        self.name = name
+        self.limit = limit
+        self.semaphore = asyncio.Semaphore(limit)
+        self.running = 0
+        self.waiting = 0
+        self.stats: Dict[str, int] = {"completed": 0, "failed": 0, "rejected": 0, "timeouts": 0}
+        self.latencies_ms: Deque[float] = deque(maxlen=1000)
+
+    def summary(self) -> Dict[str, Any]:
+        ordered = sorted(self.latencies_ms)
+        return {
+            "name": self.name,
+            "limit": self.limit,
+            "running": self.running,
+            "waiting": self.waiting,
+            **self.stats,
+            "p50_ms": round(statistics.median(ordered), 1) if ordered else 0.0,
+            "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 1) if ordered else 0.0,
+        }
+
+
+class AgentServer:
+    """Admission control in front of batch.run_job for the registered agents."""
+
+    def __init__(
+        self,
+        specs: List[str],
+        workers: int = SERVE_WORKERS,
+        queue_size: int = SERVE_QUEUE,
+        queue_timeout: float = SERVE_QUEUE_TIMEOUT,
+    ) -> None:
+        self.slots: Dict[str, AgentSlot] = {}
+        # Agents whose module failed to load (e.g. ex7 without SHIPENGINE_API_KEY) -> error
+        self.unavailable: Dict[str, str] = {}
+        for spec in specs:
+            try:
+                name = load_agent(spec).name
+            except Exception as e:
+                self.unavailable[spec] = f"{type(e).__name__}: {e}"
+                print(f"Skipping {spec}: {self.unavailable[spec]}", file=sys.stderr, flush=True)
+                continue
+            limit = SERVE_AGENT_LIMITS.get(spec, SERVE_AGENT_CONCURRENCY)
+            self.slots[spec] = AgentSlot(spec, name, limit)
+        self.workers = asyncio.Semaphore(workers)
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.waiting = 0
+        self.running = 0
+        self.started = time.time()
+        self.closing = False
+        self._idle: Set[asyncio.StreamWriter] = set()
+
+    async def _acquire(self, slot: AgentSlot) -> None:
+        if not slot.semaphore.locked() and not self.workers.locked():
+            # Both free: acquire() returns without suspending, so this request never queues
+            await slot.semaphore.acquire()
+            await self.workers.acquire()
+            return
+        if self.waiting >= self.queue_size:
+            raise Overloaded(f"queue full ({self.queue_size} waiting)")
+        self.waiting += 1
+        slot.waiting += 1
+        started = time.monotonic()
+        try:
+            # The agent's own limit first, so a saturated agent does not hold shared workers
+            await asyncio.wait_for(slot.semaphore.acquire(), self.queue_timeout)
+            try:
+                await asyncio.wait_for(self.workers.acquire(), self.queue_timeout - (time.monotonic() - started))
+            except BaseException:
+                slot.semaphore.release()
+                raise
+        except asyncio.TimeoutError:
+            raise Overloaded(f"no slot for {slot.spec} within {self.queue_timeout:.0f}s") from None
+        finally:
+            self.waiting -= 1
+            slot.waiting -= 1
+
+    async def run(self, spec: str, prompt: str, job_id: Optional[str]) -> Tuple[int, Dict[str, Any]]:
+        slot = self.slots[spec]
+        try:
+            await self._acquire(slot)
+        except Overloaded as e:
+            slot.stats["rejected"] += 1
+            return 503, {"error": str(e)}
+        self.running += 1
+        slot.running += 1
+        try:
+            result = await asyncio.wait_for(
+                run_job(0, BatchJob(agent=spec, prompt=prompt, id=job_id), SERVE_TOKEN_BUDGET or None),
+                SERVE_RUN_TIMEOUT,
+            )
+        except asyncio.TimeoutError:
+            slot.stats["timeouts"] += 1
+            return 504, {"error": f"run exceeded {SERVE_RUN_TIMEOUT:.0f}s"}
+        finally:
+            self.running -= 1
+            slot.running -= 1
+            self.workers.release()
+            slot.semaphore.release()
+        slot.latencies_ms.append(result.latency_ms)
+        slot.stats["failed" if result.error else "completed"] += 1
+        body = asdict(result)
+        del body["index"]
+        return (500 if result.error else 200), body
+
+    def close_idle(self) -> None:
+        """Stop keep-alive: drop idle connections; busy ones close after their response."""
+        self.closing = True
+        for writer in list(self._idle):
+            writer.close()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "uptime_s": round(time.time() - self.started, 1),
+            "running": self.running,
+            "waiting": self.waiting,
+            "queue_size": self.queue_size,
+            "agents": {spec: slot.summary() for spec, slot in self.slots.items()},
+            "unavailable": dict(self.unavailable),
+            "rate_limits": rate_limit_stats(),
+            "tool_encoding": encoding_stats(),
+        }
+
+    # ---------- HTTP ----------
+    async def route(self, method: str, path: str, body: bytes) -> Tuple[int, Dict[str, Any]]:
+        if path == "/healthz":
+            return 200, {"status": "ok"}
+        if path == "/metrics":
+            return 200, self.metrics()
+        if path == "/v1/agents":
+            return 200, {
+                "agents": [{"id": s.spec, "name": s.name, "limit": s.limit} for s in self.slots.values()],
+                "unavailable": [{"id": spec, "error": error} for spec, error in self.unavailable.items()],
+            }
+        parts = path.strip("/").split("/")
+        if len(parts) == 4 and parts[:2] == ["v1", "agents"] and parts[3] == "run":
+            if parts[2] in self.unavailable:
+                return 503, {"error": f"agent {parts[2]!r} failed to load: {self.unavailable[parts[2]]}"}
+            if parts[2] not in self.slots:
+                return 404, {"error": f"unknown agent {parts[2]!r}"}
+            if method != "POST":
+                return 405, {"error": "use POST"}
+            try:
+                payload = json.loads(body or b"{}")
+                prompt = payload["prompt"]
+            except (ValueError, KeyError, TypeError):
+                return 400, {"error": 'expected a JSON body like {"prompt": "..."}'}
+            return await self.run(parts[2], str(prompt), payload.get("id"))
+        return 404, {"error": f"no route for {path}"}
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Minimal HTTP/1.1 with keep-alive: enough for curl, httpx and load generators."""
+        try:
+            while not self.closing:
+                self._idle.add(writer)
+                try:
+                    request_line = await reader.readline()
+                finally:
+                    self._idle.discard(writer)
+                if not request_line.strip():
+                    return
+                method, target, version = request_line.decode("latin-1").split(" ", 2)
+                headers: Dict[str, str] = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+                length = int(headers.get("content-length") or 0)
+                if length > SERVE_MAX_BODY:
+                    status, payload = 413, {"error": f"body over {SERVE_MAX_BODY} bytes"}
+                    await self._respond(writer, status, payload, keep_alive=False)
+                    return
+                body = await reader.readexactly(length) if length else b""
+                try:
+                    status, payload = await self.route(method, target.split("?", 1)[0], body)
+                except Exception as e:  # a bug in one request must not take the connection loop down
+                    status, payload = 500, {"error": f"{type(e).__name__}: {e}"}
+                keep_alive = (
+                    not self.closing
+                    and headers.get("connection", "").lower() != "close"
+                    and version.strip() == "HTTP/1.1"
+                )
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    return
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            return
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer: asyncio.StreamWriter, status: int, payload: Dict[str, Any], keep_alive: bool) -> None:
+        data = json.dumps(payload, default=str).encode("utf-8")
+        head = [
+            f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(data)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        if status == 503:
+            head.append("Retry-After: 1")
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + data)
+        await writer.drain()
+
+
+async def serve(specs: List[str], host: str = SERVE_HOST, port: int = SERVE_PORT) -> None:
+    app = AgentServer(specs)
+    # Build the shared clients now so the first request does not pay for them
+    get_client()
+    get_http_client()
+    server = await asyncio.start_server(app.handle, host, port)
+    print(f"Serving {', '.join(app.slots)} on http://{host}:{port}", flush=True)
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:  # Windows
+            pass
+    async with server:
+        await stop.wait()
+        server.close()
+        app.close_idle()
+        deadline = time.monotonic() + SERVE_DRAIN_TIMEOUT
+        while (app.running or app.waiting) and time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+    await aclose_http_client()
+    print(f"Stopped; {json.dumps(app.metrics()['agents'])}", flush=True)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--agents", help='comma-separated "exN" or "exN:attr" (default: every exercise)')
+    parser.add_argument("--host", default=SERVE_HOST)
+    parser.add_argument("--port", type=int, default=SERVE_PORT)
+    args = parser.parse_args(argv)
+    specs = [s.strip() for s in args.agents.split(",") if s.strip()] if args.agents else list(discover())
+    asyncio.run(serve(specs, args.host, args.port))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,194 @@
+import math
+import os
+from array import array
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, Iterable, Iterator, List, Sequence
+
+try:
+    import numpy as np  # optional: vectorised chunk statistics and .npy files
+except ImportError:
+    np = None
+
+# ---- Config ----
+# Dataset references resolve to files inside this directory (never outside it)
+STATS_DATA_DIR: str = os.getenv(
+    "STATS_DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+)
+STATS_CHUNK_SIZE: int = int(os.getenv("STATS_CHUNK_SIZE", "65536"))
+
+# Extensions tried, in order, for a dataset ID given without one
+DATASET_EXTENSIONS = (".f64", ".npy", ".csv", ".txt")
+
+
+# ---------- One-pass statistics ----------
+@dataclass
+class SeriesStats:
+    """
+    Streaming statistics of a numeric series: mean, min, max, variance, least-squares
+    trend slope (value per step) and first/last moving averages.
+
+    Values are fed in chunks. Each chunk's moments are computed locally (with NumPy when
+    it is installed) and merged with Chan et al.'s pairwise update, the chunked form of
+    Welford's algorithm, so the series is read exactly once and memory stays O(window).
+    """
+
+    window: int = 3
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0  # sum of squared deviations from the mean
+    cxy: float = 0.0  # co-moment of (index, value), for the slope
+    minimum: float = math.inf
+    maximum: float = -math.inf
+    head: List[float] = field(default_factory=list)
+    tail: Deque[float] = field(default_factory=deque)
+
+    def update(self, chunk: Sequence[float]) -> None:
+        n = len(chunk)
+        if n == 0:
+            return
+        if np is not None:
+            values = np.asarray(chunk, dtype=np.float64)
+            mean = float(values.mean())
+            dev = values - mean
+            m2 = float(dev @ dev)
+            cxy = float((np.arange(n) - (n - 1) / 2) @ dev)
+            lo, hi = float(values.min()), float(values.max())
+        else:
+            mean = math.fsum(chunk) / n
+            m2 = math.fsum((v - mean) ** 2 for v in chunk)
+            mid = (n - 1) / 2
+            cxy = math.fsum((i - mid) * (v - mean) for i, v in enumerate(chunk))
+            lo, hi = min(chunk), max(chunk)
+
+        total = self.count + n
+        delta = mean - self.mean
+        # The chunk's indices start at self.count, so its index mean is total/2 past ours
+        delta_x = total / 2
+        weight = self.count * n / total
+        self.mean += delta * n / total
+        self.m2 += m2 + delta * delta * weight
+        self.cxy += cxy + delta_x * delta * weight
+        self.count = total
+        self.minimum = min(self.minimum, lo)
+        self.maximum = max(self.maximum, hi)
+
+        if len(self.head) < self.window:
+            self.head.extend(float(v) for v in chunk[: self.window - len(self.head)])
+        if self.tail.maxlen != self.window:
+            self.tail = deque(self.tail, maxlen=self.window)
+        self.tail.extend(float(v) for v in chunk[-self.window :])
+
+    @property
+    def variance(self) -> float:
+        """Sample variance (n - 1)."""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def slope(self) -> float:
+        """Least-squares slope of value against position."""
+        if self.count < 2:
+            return 0.0
+        m2x = self.count * (self.count * self.count - 1) / 12
+        return self.cxy / m2x
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "min": self.minimum,
+            "max": self.maximum,
+            "variance": self.variance,
+            "std": math.sqrt(self.variance),
+            "slope": self.slope,
+            "first_moving_average": sum(self.head) / len(self.head) if self.head else 0.0,
+            "last_moving_average": sum(self.tail) / len(self.tail) if self.tail else 0.0,
+        }
+
+
+def compute_stats(chunks: Iterable[Sequence[float]], window: int = 3) -> SeriesStats:
+    stats = SeriesStats(window=max(1, window))
+    for chunk in chunks:
+        stats.update(chunk)
+    return stats
+
+
+# ---------- Sources ----------
+_registry: Dict[str, Sequence[float]] = {}
+
+
+def register_dataset(dataset_id: str, values: Sequence[float]) -> None:
+    """Make an in-memory series available to `dataset_ref` lookups under `dataset_id`."""
+    _registry[dataset_id] = values
+
+
+def _chunked(values: Sequence[float], size: int) -> Iterator[Sequence[float]]:
+    for i in range(0, len(values), size):
+        yield values[i : i + size]
+
+
+def _read_text(path: str, size: int, column: int) -> Iterator[List[float]]:
+    """One value per line, or comma-separated rows; non-numeric cells (headers) are skipped."""
+    chunk: List[float] = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            cells = line.split(",")
+            if len(cells) <= column:
+                continue
+            try:
+                chunk.append(float(cells[column]))
+            except ValueError:
+                continue
+            if len(chunk) >= size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+
+def _read_f64(path: str, size: int) -> Iterator[array]:
+    """Raw native-endian float64 values, e.g. written with array('d').tofile()."""
+    with open(path, "rb") as f:
+        while True:
+            chunk = array("d")
+            try:
+                chunk.fromfile(f, size)
+            except EOFError:
+                pass  # short final read: `chunk` holds what was left
+            if not chunk:
+                return
+            yield chunk
+
+
+def _read_npy(path: str, size: int) -> Iterator[Sequence[float]]:
+    if np is None:
+        raise ValueError(f"{os.path.basename(path)}: reading .npy files needs numpy installed")
+    values = np.load(path, mmap_mode="r").ravel()
+    for i in range(0, len(values), size):
+        yield values[i : i + size]
+
+
+def resolve_dataset(ref: str) -> str:
+    """Map a dataset ID or relative file name to a file inside STATS_DATA_DIR."""
+    root = os.path.realpath(STATS_DATA_DIR)
+    base = os.path.realpath(os.path.join(root, ref))
+    if os.path.commonpath([root, base]) != root:
+        raise ValueError(f"dataset {ref!r} is outside the data directory")
+    candidates = [base] if os.path.splitext(base)[1] else [base + ext for ext in DATASET_EXTENSIONS]
+    for path in candidates:
+        if os.path.isfile(path):
+            return path
+    raise FileNotFoundError(f"unknown dataset {ref!r}")
+
+
+def iter_dataset(ref: str, chunk_size: int = STATS_CHUNK_SIZE, column: int = 0) -> Iterator[Sequence[float]]:
+    """Stream a registered dataset or data file as chunks of at most `chunk_size` values."""
+    if ref in _registry:
+        return _chunked(_registry[ref], chunk_size)
+    path = resolve_dataset(ref)
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".f64":
+        return _read_f64(path, chunk_size)
+    if ext == ".npy":
+        return _read_npy(path, chunk_size)
+    return _read_text(path, chunk_size, column)
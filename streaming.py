@@ -0,0 +1,148 @@
+"""
+Stream an exercise agent's answer to the terminal as it is generated, and measure
+perceived latency: time to first token (TTFT), the gaps between streamed chunks and
+total run time.
+
+    python streaming.py ex9                       # the exercise's own prompt
+    python streaming.py ex1 "Is 7 even or odd?"   # any prompt
+    python streaming.py ex9 --metrics-jsonl stream_metrics.jsonl
+
+Exercise scripts print their answer with `await run_and_print(agent, prompt)`, which
+streams it when STREAM_OUTPUT=1; `stream_run` is the lower-level form.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, List, Optional, TextIO, Tuple
+
+from agents import Agent, Runner
+from agents.result import RunResultStreaming
+
+# ---- Config ----
+STREAM_OUTPUT: bool = os.getenv("STREAM_OUTPUT", "0") == "1"
+
+
+@dataclass
+class StreamMetrics:
+    """Latency profile of one streamed run, in milliseconds from the start of the run."""
+
+    ttft_ms: Optional[float] = None  # first visible text; None if the run produced none
+    total_ms: float = 0.0
+    chunks: int = 0
+    chars: int = 0
+    gaps_ms: List[float] = field(default_factory=list)  # between consecutive text chunks
+
+    @property
+    def inter_token_p50_ms(self) -> float:
+        return round(statistics.median(self.gaps_ms), 2) if self.gaps_ms else 0.0
+
+    @property
+    def inter_token_p95_ms(self) -> float:
+        if not self.gaps_ms:
+            return 0.0
+        ordered = sorted(self.gaps_ms)
+        return round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 2)
+
+    @property
+    def chars_per_s(self) -> float:
+        """Generation throughput after the first token."""
+        if self.ttft_ms is None or self.total_ms <= self.ttft_ms:
+            return 0.0
+        return round(self.chars / ((self.total_ms - self.ttft_ms) / 1000), 1)
+
+    def summary(self) -> dict:
+        data = {k: v for k, v in asdict(self).items() if k != "gaps_ms"}
+        data["inter_token_p50_ms"] = self.inter_token_p50_ms
+        data["inter_token_p95_ms"] = self.inter_token_p95_ms
+        data["chars_per_s"] = self.chars_per_s
+        return data
+
+    def __str__(self) -> str:
+        ttft = "n/a" if self.ttft_ms is None else f"{self.ttft_ms:.0f} ms"
+        return (
+            f"[ttft {ttft} | inter-token p50 {self.inter_token_p50_ms:.1f} ms, "
+            f"p95 {self.inter_token_p95_ms:.1f} ms | total {self.total_ms:.0f} ms | "
+            f"{self.chunks} chunks, {self.chars_per_s:.0f} chars/s]"
+        )
+
+
+async def stream_run(
+    agent: Agent,
+    input: Any,
+    *,
+    out: Optional[TextIO] = sys.stdout,
+    **kwargs: Any,
+) -> Tuple[RunResultStreaming, StreamMetrics]:
+    """
+    Runner.run_streamed, writing text deltas to `out` (None to stay silent) as they
+    arrive. Returns the finished result (final_output is set) and its latency metrics.
+    """
+    metrics = StreamMetrics()
+    started = last = time.perf_counter()
+    result = Runner.run_streamed(agent, input, **kwargs)
+    async for event in result.stream_events():
+        if event.type != "raw_response_event" or event.data.type != "response.output_text.delta":
+            continue
+        now = time.perf_counter()
+        if metrics.ttft_ms is None:
+            metrics.ttft_ms = round((now - started) * 1000, 2)
+        else:
+            metrics.gaps_ms.append(round((now - last) * 1000, 2))
+        last = now
+        metrics.chunks += 1
+        metrics.chars += len(event.data.delta)
+        if out is not None:
+            out.write(event.data.delta)
+            out.flush()
+    metrics.total_ms = round((time.perf_counter() - started) * 1000, 2)
+    if out is not None and metrics.chunks:
+        out.write("\n")
+    return result, metrics
+
+
+async def run_and_print(agent: Agent, input: Any, **kwargs: Any) -> Any:
+    """
+    Run `agent` on `input` and print its final output: streamed as it is generated when
+    STREAM_OUTPUT=1 (latency metrics go to stderr), otherwise once the run is done.
+    Returns the final output.
+    """
+    if not STREAM_OUTPUT:
+        result = await Runner.run(agent, input, **kwargs)
+        print(result.final_output)
+        return result.final_output
+    result, metrics = await stream_run(agent, input, **kwargs)
+    if not metrics.chunks:
+        print(result.final_output)
+    print(metrics, file=sys.stderr)
+    return result.final_output
+
+
+async def main(argv: Optional[List[str]] = None) -> int:
+    from bench import EXERCISE_PROMPTS
+    from batch import load_agent
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("agent", help='exercise module, optionally "exN:attr"')
+    parser.add_argument("prompt", nargs="?", help="defaults to the exercise's own prompt")
+    parser.add_argument("--metrics-jsonl", help="append the run's metrics as one JSON line")
+    args = parser.parse_args(argv)
+
+    prompt = args.prompt or EXERCISE_PROMPTS.get(args.agent.partition(":")[0])
+    if prompt is None:
+        parser.error(f"no default prompt for {args.agent}; pass one")
+
+    _, metrics = await stream_run(load_agent(args.agent), prompt)
+    print(metrics, file=sys.stderr)
+    if args.metrics_jsonl:
+        with open(args.metrics_jsonl, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"agent": args.agent, "ts": time.time(), **metrics.summary()}) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
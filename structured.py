@@ -0,0 +1,405 @@
+import os
+import re
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence, Set, Type
+
+from agents import Model, ModelResponse, custom_span
+from agents.exceptions import ModelBehaviorError
+from pydantic import BaseModel
+
+from response_cache import LLM_CACHE
+from usage import response_usage
+
+# ---- Config ----
+STRUCTURED_MAX_ATTEMPTS: int = int(os.getenv("STRUCTURED_MAX_ATTEMPTS", "3"))
+
+
+class OutputFormatError(ValueError):
+    """Raised by a validator as soon as the output so far can no longer match the expected format."""
+
+
+# ---------- JSON ----------
+_WHITESPACE = " \t\r\n"
+_NUMBER_CHARS = set("+-.eE0123456789")
+_NUMBER = re.compile(r"-?(0|[1-9]\d*)(\.\d+)?([eE][+-]?\d+)?")
+_LITERALS = ("true", "false", "null")
+_ESCAPES = set('"\\/bfnrtu')
+
+# First character each JSON schema type can start with
+_TYPE_STARTS = {
+    "string": '"',
+    "number": "-0123456789",
+    "integer": "-0123456789",
+    "boolean": "tf",
+    "null": "n",
+    "array": "[",
+    "object": "{",
+}
+
+
+def _value_starts(schema: Dict[str, Any]) -> str:
+    if "$ref" in schema:
+        return "{"
+    if "anyOf" in schema:
+        return "".join(_value_starts(option) for option in schema["anyOf"])
+    kind = schema.get("type")
+    if isinstance(kind, list):
+        return "".join(_TYPE_STARTS.get(k, "") for k in kind)
+    return _TYPE_STARTS.get(kind, "") if kind else '"-0123456789tfn[{'
+
+
+class JsonObjectValidator:
+    """
+    Incremental check that streamed text is a JSON object for `model`.
+
+    Fed chunk by chunk, it fails on the first character that cannot belong to valid JSON
+    (prose, code fences, a second top-level value), on a top-level key the model does not
+    define, and on a top-level value whose type cannot match its field. `close()` checks
+    that the object is complete and has every required field. Nested values are only
+    checked for JSON syntax; the SDK validates the full object against `model` afterwards.
+    """
+
+    def __init__(self, model: Type[BaseModel]) -> None:
+        schema = model.model_json_schema()
+        self._starts = {name: _value_starts(prop) for name, prop in schema.get("properties", {}).items()}
+        self._required: Set[str] = {
+            field.alias or name for name, field in model.model_fields.items() if field.is_required()
+        }
+        self._closed = model.model_config.get("extra") != "allow"
+        self._stack: List[str] = []
+        self._state = "start"
+        self._token = ""
+        self._escape = False
+        self._unicode_left = 0
+        self._is_key = False
+        self._key: Optional[str] = None
+        self._seen: Set[str] = set()
+        self._pos = 0
+
+    def _fail(self, message: str) -> None:
+        raise OutputFormatError(f"{message} at character {self._pos}")
+
+    def feed(self, text: str) -> None:
+        for c in text:
+            self._step(c)
+            self._pos += 1
+
+    def _value_done(self) -> None:
+        self._state = "comma_or_end" if self._stack else "done"
+
+    def _start_value(self, c: str) -> None:
+        if len(self._stack) == 1 and self._stack[0] == "{" and self._key in self._starts:
+            if c not in self._starts[self._key]:
+                self._fail(f"unexpected {c!r} for field {self._key!r}")
+        if c == "{":
+            self._stack.append("{")
+            self._state = "key_or_end"
+        elif c == "[":
+            self._stack.append("[")
+            self._state = "value_or_end"
+        elif c == '"':
+            self._state, self._is_key, self._token = "string", False, ""
+        elif c == "-" or c.isdigit():
+            self._state, self._token = "number", c
+        elif c in "tfn":
+            self._state, self._token = "literal", c
+        else:
+            self._fail(f"unexpected {c!r} where a value should start")
+
+    def _step(self, c: str) -> None:
+        state = self._state
+        if state == "string":
+            if self._unicode_left:
+                if c not in "0123456789abcdefABCDEF":
+                    self._fail("bad \\u escape")
+                self._unicode_left -= 1
+            elif self._escape:
+                if c not in _ESCAPES:
+                    self._fail(f"bad escape \\{c}")
+                self._escape = False
+                self._unicode_left = 4 if c == "u" else 0
+            elif c == "\\":
+                self._escape = True
+            elif c == '"':
+                if self._is_key:
+                    self._end_key()
+                else:
+                    self._value_done()
+            elif ord(c) < 0x20:
+                self._fail("control character in string")
+            elif self._is_key:
+                self._token += c
+            return
+        if state == "number":
+            if c in _NUMBER_CHARS:
+                self._token += c
+                return
+            if not _NUMBER.fullmatch(self._token):
+                self._fail(f"bad number {self._token!r}")
+            self._value_done()
+            self._step(c)
+            return
+        if state == "literal":
+            self._token += c
+            if not any(lit.startswith(self._token) for lit in _LITERALS):
+                self._fail(f"bad literal {self._token!r}")
+            if self._token in _LITERALS:
+                self._value_done()
+            return
+
+        if c in _WHITESPACE:
+            return
+        if state == "start":
+            if c != "{":
+                self._fail(f"expected a JSON object, got {c!r}")
+            self._start_value(c)
+        elif state == "value":
+            self._start_value(c)
+        elif state == "value_or_end":
+            if c == "]":
+                self._close_container("[")
+            else:
+                self._start_value(c)
+        elif state in ("key_or_end", "key"):
+            if c == "}" and state == "key_or_end":
+                self._close_container("{")
+            elif c == '"':
+                self._state, self._is_key, self._token = "string", True, ""
+            else:
+                self._fail(f"expected a key, got {c!r}")
+        elif state == "colon":
+            if c != ":":
+                self._fail(f"expected ':', got {c!r}")
+            self._state = "value"
+        elif state == "comma_or_end":
+            if c == ",":
+                self._state = "key" if self._stack[-1] == "{" else "value"
+            elif c in "}]":
+                self._close_container("{" if c == "}" else "[")
+            else:
+                self._fail(f"expected ',' or a closing bracket, got {c!r}")
+        elif state == "done":
+            self._fail(f"unexpected {c!r} after the JSON object")
+
+    def _end_key(self) -> None:
+        if len(self._stack) == 1:
+            if self._closed and self._starts and self._token not in self._starts:
+                self._fail(f"unknown field {self._token!r}")
+            self._key = self._token
+            self._seen.add(self._token)
+        self._state = "colon"
+
+    def _close_container(self, opener: str) -> None:
+        if not self._stack or self._stack[-1] != opener:
+            self._fail("mismatched bracket")
+        self._stack.pop()
+        if not self._stack:
+            missing = self._required - self._seen
+            if missing:
+                self._fail(f"missing required field(s) {', '.join(sorted(missing))}")
+        self._value_done()
+
+    def close(self) -> None:
+        if self._state != "done":
+            self._fail("incomplete JSON object")
+
+
+# ---------- Markdown table ----------
+_CELL_SPLIT = re.compile(r"(?<!\\)\|")
+_SEPARATOR_CELL = re.compile(r":?-{3,}:?")
+
+
+def _cells(line: str) -> List[str]:
+    line = line.strip()
+    if line.startswith("|"):
+        line = line[1:]
+    if line.endswith("|") and not line.endswith("\\|"):
+        line = line[:-1]
+    return [cell.strip() for cell in _CELL_SPLIT.split(line)]
+
+
+def _norm(cell: str) -> str:
+    return re.sub(r"[^\w ]", "", cell).strip().casefold()
+
+
+class TableValidator:
+    """
+    Incremental check that streamed text is a Markdown table with `columns`.
+
+    The first non-blank line must be the header (case and punctuation are ignored),
+    followed by a separator row and at least `min_rows` rows of the same width. Text
+    after the table ends is allowed. A line that cannot be part of the table fails on
+    its first character; header and cell counts are checked as each line completes.
+    """
+
+    def __init__(self, columns: Sequence[str], min_rows: int = 1) -> None:
+        self.columns = [_norm(c) for c in columns]
+        self.min_rows = min_rows
+        self.rows = 0
+        self._state = "header"
+        self._line = ""
+
+    def feed(self, text: str) -> None:
+        self._line += text
+        *complete, self._line = self._line.split("\n")
+        for line in complete:
+            self._check_line(line)
+        self._check_partial(self._line)
+
+    def _check_partial(self, line: str) -> None:
+        stripped = line.lstrip()
+        if not stripped or self._state in ("rows", "after"):
+            return
+        if not stripped.startswith("|"):
+            raise OutputFormatError(f"expected a table {self._state} line, got {stripped[:40]!r}")
+        if self._state == "separator" and not set(stripped) <= set("|-: "):
+            raise OutputFormatError(f"expected a separator row, got {stripped[:40]!r}")
+
+    def _check_line(self, line: str) -> None:
+        if self._state == "after":
+            return
+        if not line.strip():
+            if self._state == "rows":
+                self._end_table()
+            return
+        self._check_partial(line)
+        cells = _cells(line)
+        if self._state == "header":
+            if [_norm(c) for c in cells] != self.columns:
+                raise OutputFormatError(f"table header {cells} does not match columns {self.columns}")
+            self._state = "separator"
+        elif self._state == "separator":
+            if len(cells) != len(self.columns) or not all(_SEPARATOR_CELL.fullmatch(c) for c in cells):
+                raise OutputFormatError(f"bad separator row {line.strip()!r}")
+            self._state = "rows"
+        elif not line.lstrip().startswith("|"):
+            self._end_table()
+        elif len(cells) != len(self.columns):
+            raise OutputFormatError(f"row has {len(cells)} cells, expected {len(self.columns)}: {line.strip()[:60]!r}")
+        else:
+            self.rows += 1
+
+    def _end_table(self) -> None:
+        if self.rows < self.min_rows:
+            raise OutputFormatError(f"table has {self.rows} rows, expected at least {self.min_rows}")
+        self._state = "after"
+
+    def close(self) -> None:
+        if self._line:
+            self._check_line(self._line)
+            self._line = ""
+        if self._state == "rows":
+            self._end_table()
+        elif self._state != "after":
+            raise OutputFormatError("output ended before the table was complete")
+
+
+# ---------- Complete responses ----------
+def response_text(response: ModelResponse) -> str:
+    """The assistant text of a model response (empty for tool-call turns)."""
+    return "".join(
+        getattr(part, "text", "")
+        for item in response.output
+        if getattr(item, "type", "") == "message"
+        for part in item.content
+    )
+
+
+def calls_tools(response: ModelResponse) -> bool:
+    return any(getattr(i, "type", "") == "function_call" for i in response.output)
+
+
+def validate_response(response: ModelResponse, validator: Callable[[], Any]) -> None:
+    """Run a complete response through a fresh validator; tool-call turns are skipped."""
+    if calls_tools(response):
+        return
+    text = response_text(response)
+    if text:
+        checker = validator()
+        checker.feed(text)
+        checker.close()
+
+
+# ---------- Model wrapper ----------
+class ValidatingModel(Model):
+    """
+    Streams each response through a fresh validator (from `validator`) and aborts the
+    request on the first off-format chunk, retrying at once up to `max_attempts` times.
+    A bad answer therefore costs only the tokens before the mistake, not a full
+    generation. Turns that call tools instead of answering are not validated.
+
+    With the response cache enabled, responses are validated once complete instead:
+    cached responses are not streamed.
+    """
+
+    def __init__(
+        self,
+        inner: Model,
+        validator: Callable[[], Any],
+        max_attempts: int = STRUCTURED_MAX_ATTEMPTS,
+        stream: Optional[bool] = None,
+    ) -> None:
+        self.inner = inner
+        self.model = getattr(inner, "model", "")
+        self.validator = validator
+        self.max_attempts = max(1, max_attempts)
+        self.stream = LLM_CACHE == "off" if stream is None else stream
+        self.attempts = 0
+        self.aborts = 0
+        self.wasted_chars = 0
+
+    async def _streamed(self, args: tuple, kwargs: Dict[str, Any]) -> ModelResponse:
+        validator = self.validator()
+        response = None
+        text_chars = 0
+        async with aclosing(self.inner.stream_response(*args, **kwargs)) as stream:
+            async for event in stream:
+                kind = getattr(event, "type", "")
+                if kind == "response.output_text.delta":
+                    text_chars += len(event.delta)
+                    try:
+                        validator.feed(event.delta)
+                    except OutputFormatError:
+                        # Leaving the block closes the stream, which drops the HTTP request
+                        self.wasted_chars += text_chars
+                        raise
+                elif kind == "response.completed":
+                    response = event.response
+        if response is None:
+            raise ModelBehaviorError("stream ended without a completed response")
+        if text_chars and not calls_tools(response):
+            try:
+                validator.close()
+            except OutputFormatError:
+                self.wasted_chars += text_chars
+                raise
+        return ModelResponse(output=response.output, usage=response_usage(response), response_id=None)
+
+    async def _complete(self, args: tuple, kwargs: Dict[str, Any]) -> ModelResponse:
+        response = await self.inner.get_response(*args, **kwargs)
+        validate_response(response, self.validator)
+        return response
+
+    async def get_response(self, *args, **kwargs) -> ModelResponse:
+        error: Optional[OutputFormatError] = None
+        for attempt in range(1, self.max_attempts + 1):
+            self.attempts += 1
+            # Shows up in traces as the parent of the model call it checks
+            with custom_span("structured_output", {"model": str(self.model), "attempt": attempt}) as span:
+                try:
+                    if self.stream:
+                        return await self._streamed(args, kwargs)
+                    return await self._complete(args, kwargs)
+                except OutputFormatError as e:
+                    self.aborts += 1
+                    error = e
+                    span.span_data.data["aborted"] = str(e)
+        raise ModelBehaviorError(f"{self.model}: output off-format after {self.max_attempts} attempts: {error}")
+
+    async def stream_response(self, *args, **kwargs) -> AsyncIterator:
+        # Streamed runs show tokens to the user as they arrive, so there is nothing to retry
+        async for event in self.inner.stream_response(*args, **kwargs):
+            yield event
+
+    def stats(self) -> Dict[str, int]:
+        return {"attempts": self.attempts, "aborts": self.aborts, "wasted_chars": self.wasted_chars}
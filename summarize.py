@@ -0,0 +1,192 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+from typing import List, Optional, TextIO
+
+from agents import Agent, Runner
+
+from response_cache import LLM_CACHE, LLM_CACHE_DIR, ResponseStore
+from streaming import stream_run
+from usage import estimate_tokens
+
+# ---- Config ----
+SUMMARY_CHUNK_TOKENS: int = int(os.getenv("SUMMARY_CHUNK_TOKENS", "1500"))
+SUMMARY_CONCURRENCY: int = int(os.getenv("SUMMARY_CONCURRENCY", "8"))
+SUMMARY_CACHE_DIR: str = os.getenv("SUMMARY_CACHE_DIR", os.path.join(LLM_CACHE_DIR, "summaries"))
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+# ---------- Chunking ----------
+def _split_oversized(paragraph: str, max_tokens: int) -> List[str]:
+    """Split a paragraph that is too big on its own at sentence, then word, boundaries."""
+    pieces: List[str] = []
+    for sentence in _SENTENCE_END.split(paragraph):
+        if estimate_tokens(sentence) <= max_tokens:
+            pieces.append(sentence)
+            continue
+        words = sentence.split()
+        step = max(1, int(max_tokens * 0.6))  # ~1.5 tokens per word keeps slices under budget
+        pieces.extend(" ".join(words[i : i + step]) for i in range(0, len(words), step))
+    return pieces
+
+
+def _is_anchor(piece: str) -> bool:
+    # Roughly one paragraph in four is an anchor; depends only on the paragraph's own text
+    return hashlib.blake2b(piece.encode("utf-8"), digest_size=2).digest()[0] % 4 == 0
+
+
+def chunk_text(text: str, max_tokens: int = SUMMARY_CHUNK_TOKENS) -> List[str]:
+    """
+    Pack paragraphs (falling back to sentences) into chunks of at most `max_tokens`.
+
+    Besides the size limit, a chunk also ends after an "anchor" paragraph once it is half
+    full. Anchors are picked by content hash, so an edit only moves the boundaries up to
+    the next anchor and the chunks after it keep their exact text (and cache entries).
+    """
+    pieces: List[str] = []
+    for paragraph in (p.strip() for p in text.split("\n\n")):
+        if not paragraph:
+            continue
+        if estimate_tokens(paragraph) <= max_tokens:
+            pieces.append(paragraph)
+        else:
+            pieces.extend(_split_oversized(paragraph, max_tokens))
+
+    chunks: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+    for piece in pieces:
+        tokens = estimate_tokens(piece)
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append("\n\n".join(current))
+            current, current_tokens = [], 0
+        current.append(piece)
+        current_tokens += tokens
+        if current_tokens >= max_tokens // 2 and _is_anchor(piece):
+            chunks.append("\n\n".join(current))
+            current, current_tokens = [], 0
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+
+# ---------- Cache ----------
+class SummaryCache:
+    """
+    Summaries keyed by a hash of (model, instructions, prompt), kept in a size-bounded
+    ResponseStore under SUMMARY_CACHE_DIR. Follows LLM_CACHE like model responses do:
+    with "off" nothing is read or written.
+    """
+
+    def __init__(self, directory: str = SUMMARY_CACHE_DIR, mode: str = LLM_CACHE) -> None:
+        self.mode = mode
+        self.store = ResponseStore(directory) if mode != "off" else None
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, agent: Agent, prompt: str) -> str:
+        model = getattr(agent.model, "model", agent.model)
+        blob = json.dumps([str(model), str(agent.instructions), prompt], ensure_ascii=False)
+        return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        data = self.store.read(key) if self.store is not None else None
+        if data is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return data["summary"]
+
+    def set(self, key: str, value: str) -> None:
+        if self.store is not None:
+            self.store.write(key, {"summary": value})
+
+
+# ---------- Map-reduce ----------
+class Summarizer:
+    """
+    Map-reduce summarisation on top of an existing summary agent.
+
+    Map: the document is split into token-bounded chunks that are summarised concurrently.
+    Reduce: partial summaries are grouped to fit the same budget and summarised again,
+    level by level, until one summary of `target_words` remains. Every call is cached,
+    so re-summarising an edited document only recomputes the changed chunks and the
+    reduce steps above them.
+    """
+
+    def __init__(
+        self,
+        agent: Agent,
+        chunk_tokens: int = SUMMARY_CHUNK_TOKENS,
+        concurrency: int = SUMMARY_CONCURRENCY,
+        cache: Optional[SummaryCache] = None,
+    ) -> None:
+        self.agent = agent
+        self.chunk_tokens = chunk_tokens
+        self.cache = cache if cache is not None else SummaryCache()
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    async def _summarize(self, prompt: str, out: Optional[TextIO] = None) -> str:
+        """One cached summary call; with `out`, the answer is also written there as it streams."""
+        key = self.cache.key(self.agent, prompt)
+        cached = self.cache.get(key)
+        if cached is not None:
+            if out is not None:
+                out.write(cached + "\n")
+            return cached
+        async with self._semaphore:
+            if out is None:
+                result = await Runner.run(self.agent, prompt)
+            else:
+                result, _ = await stream_run(self.agent, prompt, out=out)
+        summary = str(result.final_output).strip()
+        self.cache.set(key, summary)
+        return summary
+
+    async def summarize(self, text: str, target_words: int = 100, out: Optional[TextIO] = None) -> str:
+        """Summary of `text`; with `out`, the final call (the one the reader waits on) streams to it."""
+        chunks = chunk_text(text, self.chunk_tokens)
+        if len(chunks) <= 1:
+            words = len(text.split())
+            return await self._summarize(f"Summarize this {words}-word article in {target_words} words: {text}", out)
+
+        # Map
+        partials = await asyncio.gather(
+            *(
+                # No chunk index in the prompt, so inserting a chunk does not invalidate the others
+                self._summarize(
+                    f"Summarize this section of a longer article in at most {target_words} words:\n\n{chunk}"
+                )
+                for chunk in chunks
+            )
+        )
+
+        # Reduce, level by level, until everything fits into one final call
+        while True:
+            groups = chunk_text("\n\n".join(partials), self.chunk_tokens)
+            if len(groups) >= len(partials):
+                # Partials too large to pack several per call; pair them so each level still halves
+                groups = ["\n\n".join(partials[i : i + 2]) for i in range(0, len(partials), 2)]
+            if len(groups) == 1:
+                return await self._summarize(
+                    "Combine these partial summaries of one article into a single summary "
+                    f"of at most {target_words} words:\n\n{groups[0]}",
+                    out,
+                )
+            partials = await asyncio.gather(
+                *(
+                    self._summarize(
+                        f"Combine these consecutive partial summaries of a longer article "
+                        f"into one summary of at most {target_words} words:\n\n{group}"
+                    )
+                    for group in groups
+                )
+            )
+
+
+async def summarize(agent: Agent, text: str, target_words: int = 100, out: Optional[TextIO] = None, **kwargs) -> str:
+    """Convenience wrapper: `await summarize(agent, long_text, 100)`."""
+    return await Summarizer(agent, **kwargs).summarize(text, target_words, out)
@@ -0,0 +1,39 @@
+import unittest
+
+from geo_index import GeoIndex, build_index, normalize
+
+
+def index(places, aliases=None) -> GeoIndex:
+    return GeoIndex(build_index(places, aliases, path=None))
+
+
+class GeoIndexTest(unittest.TestCase):
+    def test_normalize(self):
+        self.assertEqual(normalize("  Saint-Étienne "), "saint etienne")
+
+    def test_lookup_ignores_case_and_accents(self):
+        geo = index([("São Paulo", "BR", "01000-000")])
+        self.assertEqual(geo.lookup("SAO PAULO"), ("BR", "01000-000"))
+        self.assertIsNone(geo.lookup("Rio"))
+
+    def test_lookup_does_not_depend_on_input_order(self):
+        places = [("Springfield", "US", "62701"), ("Springfield", "US", "01101"), ("Springfield", "US", "65801")]
+        first = index(places).lookup("springfield")
+        self.assertEqual(first, ("US", "01101"))
+        self.assertEqual(index(list(reversed(places))).lookup("springfield"), first)
+
+    def test_name_in_several_countries_needs_a_country_code(self):
+        geo = index([("Paris", "FR", "75001"), ("Paris", "US", "75460")])
+        self.assertIsNone(geo.lookup("paris"))
+        self.assertEqual(geo.lookup("Paris FR"), ("FR", "75001"))
+        self.assertEqual(geo.lookup("paris us"), ("US", "75460"))
+
+    def test_alias_to_qualified_place(self):
+        geo = index([("Paris", "FR", "75001"), ("Paris", "US", "75460")], {"city of light": "Paris FR"})
+        self.assertEqual(geo.lookup("City of Light"), ("FR", "75001"))
+
+    def test_complete(self):
+        geo = index([("San Francisco", "US", "94102"), ("San Jose", "US", "95113"), ("Seattle", "US", "98101")])
+        matches = geo.complete("san")
+        self.assertEqual({postal for _, _, postal in matches}, {"94102", "95113"})
+        self.assertEqual(len(geo.complete("san", limit=1)), 1)
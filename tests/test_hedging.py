@@ -0,0 +1,74 @@
+import asyncio
+import json
+import unittest
+
+import httpx
+
+from hedging import LLM_HEDGE_MIN_SAMPLES, HedgingTransport, LatencyTracker
+
+
+def chat_request() -> httpx.Request:
+    body = json.dumps({"model": "m", "messages": []}).encode()
+    return httpx.Request("POST", "http://llm.test/v1/chat/completions", content=body)
+
+
+class SlowFirst(httpx.AsyncBaseTransport):
+    """The first request hangs for `delay` seconds; every later one answers at once."""
+
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+        self.calls = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        if self.calls == 1:
+            await asyncio.sleep(self.delay)
+        return httpx.Response(200, json={"call": self.calls})
+
+
+def warmed(transport: HedgingTransport, seconds: float) -> HedgingTransport:
+    tracker = transport._trackers.setdefault(("m", False), LatencyTracker())
+    for _ in range(LLM_HEDGE_MIN_SAMPLES):
+        tracker.add(seconds)
+    return transport
+
+
+class LatencyTrackerTest(unittest.TestCase):
+    def test_percentile_needs_enough_samples(self):
+        tracker = LatencyTracker(window=100)
+        for _ in range(LLM_HEDGE_MIN_SAMPLES - 1):
+            tracker.add(1.0)
+        self.assertIsNone(tracker.percentile(0.95))
+        tracker.add(5.0)
+        self.assertEqual(tracker.percentile(0.5), 1.0)
+        self.assertEqual(tracker.percentile(0.99), 5.0)
+
+    def test_window_drops_old_samples(self):
+        tracker = LatencyTracker(window=LLM_HEDGE_MIN_SAMPLES)
+        for seconds in [9.0] * LLM_HEDGE_MIN_SAMPLES + [1.0] * LLM_HEDGE_MIN_SAMPLES:
+            tracker.add(seconds)
+        self.assertEqual(tracker.percentile(0.99), 1.0)
+
+
+class HedgingTransportTest(unittest.TestCase):
+    def test_slow_call_is_hedged_and_the_duplicate_wins(self):
+        inner = SlowFirst(delay=5.0)
+        transport = warmed(HedgingTransport(inner, enabled=True, adaptive_timeout=False), 0.01)
+        response = asyncio.run(asyncio.wait_for(transport.handle_async_request(chat_request()), 2.0))
+        self.assertEqual(response.json(), {"call": 2})
+        self.assertEqual(transport.stats["hedged"], 1)
+        self.assertEqual(transport.stats["hedge_wins"], 1)
+
+    def test_no_adaptive_timeout_unless_enabled(self):
+        request = chat_request()
+        transport = warmed(HedgingTransport(SlowFirst(0.0), adaptive_timeout=False), 0.01)
+        self.assertIsNone(transport._timeout(request, transport._trackers[("m", False)]))
+        transport.adaptive_timeout = True
+        self.assertIsNotNone(transport._timeout(request, transport._trackers[("m", False)]))
+
+    def test_other_requests_pass_through(self):
+        inner = SlowFirst(delay=0.0)
+        transport = HedgingTransport(inner)
+        request = httpx.Request("GET", "http://llm.test/v1/models")
+        asyncio.run(transport.handle_async_request(request))
+        self.assertEqual(transport.stats["requests"], 0)
@@ -0,0 +1,63 @@
+import asyncio
+import unittest
+
+from memory import SlidingWindowSession
+
+
+def user(text: str):
+    return {"role": "user", "content": text}
+
+
+def assistant(text: str):
+    return {"role": "assistant", "content": text}
+
+
+def call(call_id: str):
+    return {"type": "function_call", "call_id": call_id, "name": "lookup", "arguments": "{}"}
+
+
+def output(call_id: str, text: str):
+    return {"type": "function_call_output", "call_id": call_id, "output": text}
+
+
+def session(items, tokens, recent=100) -> SlidingWindowSession:
+    memory = SlidingWindowSession("test", budget_tokens=recent * 2, recent_tokens=recent)
+    memory._items = list(items)
+    memory._tokens = list(tokens)
+    return memory
+
+
+class FoldPointTest(unittest.TestCase):
+    def test_cuts_at_the_oldest_user_message_that_fits(self):
+        items = [user("a"), assistant("b"), user("c"), assistant("d"), user("e"), assistant("f")]
+        self.assertEqual(session(items, [40] * 6)._fold_point(), 4)
+
+    def test_keeps_the_newest_turn_even_when_it_is_too_big(self):
+        items = [user("a"), assistant("b"), user("c"), assistant("d")]
+        self.assertEqual(session(items, [10, 10, 10, 500])._fold_point(), 2)
+
+    def test_single_long_turn_folds_between_tool_calls(self):
+        # Only one user message, at index 0: cutting at user messages would fold nothing
+        items = [user("plan"), call("1"), output("1", "x"), call("2"), call("3"), output("2", "y"), output("3", "z"),
+                 assistant("done")]
+        tokens = [10, 10, 60, 10, 10, 60, 60, 20]
+        cut = session(items, tokens, recent=170)._fold_point()
+        self.assertEqual(cut, 3)
+        self.assertLessEqual(sum(tokens[cut:]), 170)
+        # Calls 2 and 3 are answered together, so the next cut is after both results
+        self.assertEqual(session(items, tokens, recent=150)._fold_point(), 7)
+        # Nothing fits: the newest boundary that leaves no call without its result
+        self.assertEqual(session(items, tokens, recent=10)._fold_point(), 7)
+
+    def test_single_oversized_item_is_not_folded(self):
+        self.assertEqual(session([user("x" * 4000)], [1000])._fold_point(), 0)
+
+    def test_compaction_without_summarizer_drops_old_turns(self):
+        async def run():
+            memory = SlidingWindowSession("test", budget_tokens=60, recent_tokens=30)
+            await memory.add_items([user("hello " * 20), call("1"), output("1", "ok " * 20), assistant("bye")])
+            return await memory.get_items()
+
+        items = asyncio.run(run())
+        self.assertNotIn(user("hello " * 20), items)
+        self.assertEqual(items[-1], assistant("bye"))
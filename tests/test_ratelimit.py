@@ -0,0 +1,37 @@
+import unittest
+
+from ratelimit import RateLimiter, TokenBucket
+
+
+class TokenBucketTest(unittest.TestCase):
+    def test_burst_then_steady_refill(self):
+        bucket = TokenBucket(60, window=60.0, burst=0.1)
+        self.assertEqual(bucket.capacity, 6)
+        self.assertAlmostEqual(bucket.rate, 54 / 60)
+        self.assertEqual(bucket.wait_for(6), 0.0)
+
+        bucket.level = 0.0
+        self.assertAlmostEqual(bucket.wait_for(0.9), 1.0)
+        bucket.refill(bucket._updated + 1.0)
+        self.assertAlmostEqual(bucket.level, 0.9)
+        bucket.refill(bucket._updated + 3600.0)
+        self.assertEqual(bucket.level, bucket.capacity)
+
+    def test_amount_over_capacity_waits_for_a_full_bucket(self):
+        bucket = TokenBucket(60, window=60.0, burst=0.1)
+        bucket.level = 0.0
+        self.assertAlmostEqual(bucket.wait_for(1000), 6 / bucket.rate)
+
+
+class RateLimiterTest(unittest.TestCase):
+    def test_try_acquire_stops_at_the_burst(self):
+        limiter = RateLimiter(rpm=100, tpm=0)
+        admitted = sum(limiter.try_acquire(10) for _ in range(20))
+        self.assertEqual(admitted, 10)
+        self.assertEqual(limiter.stats["requests"], 10)
+
+    def test_settle_carries_token_debt(self):
+        limiter = RateLimiter(rpm=0, tpm=1000)
+        self.assertTrue(limiter.try_acquire(50))
+        limiter.settle(estimated=50, actual=400)
+        self.assertFalse(limiter.try_acquire(1))
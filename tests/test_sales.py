@@ -0,0 +1,65 @@
+import os
+import tempfile
+import unittest
+
+from sales_db import SalesDatabase, build_database, decode_cursor, encode_cursor
+from sales_store import SalesStore
+
+ROWS = [
+    {"date": "2025-03-15", "sales": 15210, "region": "APAC", "product": "Pro"},
+    {"date": "2025-03-01", "sales": 12450.5, "region": "NA", "product": "Core"},
+    {"date": "2025-03-22", "sales": 16175, "region": "NA", "product": "Pro"},
+    {"date": "2025-04-02", "sales": 900, "region": "EU", "product": "Core"},
+]
+
+
+class SalesStoreTest(unittest.TestCase):
+    def test_select_filters_case_insensitively(self):
+        store = SalesStore.from_rows(ROWS)
+        self.assertEqual(len(store.select(2025, 3)), 3)
+        ids = store.select(2025, 3, region="na", product="PRO")
+        self.assertEqual([r["date"] for r in store.rows(ids)], ["2025-03-22"])
+        self.assertEqual(store.select(2025, 5), ())
+        self.assertEqual(store.select(2025, 3, region="MEA"), ())
+
+    def test_fractional_amounts_survive_a_save(self):
+        store = SalesStore.from_rows(ROWS)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "sales.bin")
+            store.save(path)
+            loaded = SalesStore.load(path)
+        ids = loaded.select(2025, 3)
+        self.assertEqual(loaded.total(ids), 43835.5)
+        self.assertEqual([r["sales"] for r in loaded.rows(ids)], [12450.5, 15210, 16175])
+
+
+class CursorTest(unittest.TestCase):
+    def test_round_trip(self):
+        sql = "SELECT * FROM sales"
+        self.assertEqual(decode_cursor("SELECT *\n  FROM sales", encode_cursor(sql, 50)), 50)
+
+    def test_rejects_other_query_and_garbage(self):
+        cursor = encode_cursor("SELECT * FROM sales", 10)
+        with self.assertRaises(ValueError):
+            decode_cursor("SELECT month FROM sales", cursor)
+        with self.assertRaises(ValueError):
+            decode_cursor("SELECT * FROM sales", "not-a-cursor")
+
+    def test_pages_cover_every_row_once(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "sales.db")
+            build_database(path, [(f"m{i:03d}", i) for i in range(25)])
+            db = SalesDatabase(path, pool_size=1)
+            try:
+                sql = "SELECT month, revenue FROM sales ORDER BY id"
+                seen, cursor = [], None
+                while True:
+                    page = db.query_page(sql, cursor, max_rows=10)
+                    seen += page.rows
+                    if not page.next_cursor:
+                        break
+                    self.assertEqual(page.stopped, "rows")
+                    cursor = page.next_cursor
+            finally:
+                db.close()
+        self.assertEqual([row[1] for row in seen], list(range(25)))
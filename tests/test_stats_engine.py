@@ -0,0 +1,28 @@
+import statistics
+import unittest
+
+from stats_engine import compute_stats
+
+VALUES = [3.0, 7.5, 1.25, 9.0, 4.0, 6.5, 2.0, 8.0, 5.5]
+
+
+class SeriesStatsTest(unittest.TestCase):
+    def test_chunked_merge_matches_one_pass(self):
+        whole = compute_stats([VALUES]).as_dict()
+        for size in (1, 2, 4):
+            chunks = [VALUES[i : i + size] for i in range(0, len(VALUES), size)]
+            merged = compute_stats(chunks).as_dict()
+            for key, value in whole.items():
+                self.assertAlmostEqual(merged[key], value, places=9, msg=f"{key}, chunks of {size}")
+
+    def test_against_statistics(self):
+        stats = compute_stats([VALUES[:5], VALUES[5:]])
+        self.assertAlmostEqual(stats.mean, statistics.fmean(VALUES))
+        self.assertAlmostEqual(stats.variance, statistics.variance(VALUES))
+        self.assertAlmostEqual(stats.slope, statistics.linear_regression(range(len(VALUES)), VALUES).slope)
+        self.assertEqual((stats.minimum, stats.maximum), (1.25, 9.0))
+
+    def test_moving_averages(self):
+        stats = compute_stats([VALUES[:2], VALUES[2:]], window=3).as_dict()
+        self.assertAlmostEqual(stats["first_moving_average"], statistics.fmean(VALUES[:3]))
+        self.assertAlmostEqual(stats["last_moving_average"], statistics.fmean(VALUES[-3:]))
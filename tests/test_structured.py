@@ -0,0 +1,62 @@
+import unittest
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+from structured import JsonObjectValidator, OutputFormatError, TableValidator
+
+
+class Quote(BaseModel):
+    city: str
+    cost: float
+    notes: Optional[List[str]] = None
+
+
+def feed(validator, text: str, step: int = 3) -> None:
+    for i in range(0, len(text), step):
+        validator.feed(text[i : i + step])
+    validator.close()
+
+
+class JsonObjectValidatorTest(unittest.TestCase):
+    def test_accepts_valid_object_in_small_chunks(self):
+        feed(JsonObjectValidator(Quote), '{"city": "Paris", "cost": 12.5e0, "notes": ["a\\"b", "\\u00e9"]}')
+
+    def test_fails_early(self):
+        for text, reason in (
+            ("Here is the JSON: {", "prose"),
+            ('{"city": "Paris", "weight"', "unknown key"),
+            ('{"cost": "12"', "wrong type"),
+            ('{"city": "Paris", "cost": 1} {', "second value"),
+        ):
+            with self.subTest(reason), self.assertRaises(OutputFormatError):
+                JsonObjectValidator(Quote).feed(text)
+
+    def test_close_needs_required_fields(self):
+        with self.assertRaises(OutputFormatError):
+            feed(JsonObjectValidator(Quote), '{"city": "Paris"}')
+        with self.assertRaises(OutputFormatError):
+            feed(JsonObjectValidator(Quote), '{"city": "Paris", "cost": 1')
+
+
+class TableValidatorTest(unittest.TestCase):
+    TABLE = "| Month | Revenue |\n|---|---:|\n| Jan | 12,000 |\n| Feb | 15,000 |\n\nTotal: 27,000"
+
+    def test_accepts_table_with_trailing_text(self):
+        validator = TableValidator(["month", "revenue"], min_rows=2)
+        feed(validator, self.TABLE, step=5)
+        self.assertEqual(validator.rows, 2)
+
+    def test_fails_early(self):
+        for text, reason in (
+            ("Sure! ", "prose before the table"),
+            ("| Region | Revenue |\n", "wrong header"),
+            ("| Month | Revenue |\n| Jan |", "no separator"),
+            ("| Month | Revenue |\n|---|---|\n| Jan | 1 | 2 |\n", "row width"),
+        ):
+            with self.subTest(reason), self.assertRaises(OutputFormatError):
+                TableValidator(["Month", "Revenue"]).feed(text)
+
+    def test_close_needs_min_rows(self):
+        with self.assertRaises(OutputFormatError):
+            feed(TableValidator(["Month", "Revenue"], min_rows=3), self.TABLE)
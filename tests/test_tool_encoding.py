@@ -0,0 +1,40 @@
+import json
+import unittest
+from typing import Optional
+
+from pydantic import BaseModel
+
+from tool_encoding import _prune, _tabulate, _truncate, encode_result
+from usage import estimate_tokens
+
+
+class Row(BaseModel):
+    month: str
+    revenue: float
+    note: Optional[str] = None
+
+
+class ToolEncodingTest(unittest.TestCase):
+    def test_prune_drops_nulls_empties_and_defaults(self):
+        value = {"a": None, "b": [], "c": {}, "d": "", "e": 2.0, "rows": [Row(month="Jan", revenue=1.5)]}
+        self.assertEqual(_prune(value), {"e": 2, "rows": [{"month": "Jan", "revenue": 1.5}]})
+
+    def test_tabulate_states_shared_columns_once(self):
+        rows = [{"region": "NA", "month": "Jan", "sales": 1}, {"region": "NA", "month": "Feb", "sales": 2}]
+        self.assertEqual(
+            _tabulate({"sales": rows}),
+            {"sales": {"all": {"region": "NA"}, "columns": ["month", "sales"], "rows": [["Jan", 1], ["Feb", 2]]}},
+        )
+        self.assertEqual(_tabulate([{"a": 1}]), [{"a": 1}])
+
+    def test_truncate_keeps_totals_answerable(self):
+        table = {"columns": ["day", "sales"], "rows": [[f"2025-03-{d:02d}", d * 100] for d in range(1, 31)]}
+        cut = _truncate({"sales": table}, budget=60)
+        self.assertLessEqual(estimate_tokens(json.dumps(cut, separators=(",", ":"))), 60)
+        sales = cut["sales"]
+        self.assertEqual(len(sales["rows"]) + sales["rows_omitted"], 30)
+        self.assertEqual(sales["rows_summary"]["sales"], {"min": 100, "max": 3000, "sum": 46500})
+
+    def test_encode_result_passes_strings_through(self):
+        self.assertEqual(encode_result("No data."), "No data.")
+        self.assertEqual(encode_result({"total": 3.0, "extra": None}), '{"total":3}')
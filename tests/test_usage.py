@@ -0,0 +1,26 @@
+import unittest
+from unittest import mock
+
+import usage
+
+
+class PrometheusTextTest(unittest.TestCase):
+    def test_each_family_is_contiguous(self):
+        totals = {
+            ("ex1", "Agent A", "m1"): {"requests": 2, "input": 10, "output": 5},
+            ("ex2", 'Agent "B"', "m2"): {"cache_hits": 1},
+        }
+        with mock.patch.dict(usage._totals, totals, clear=True):
+            lines = usage.prometheus_text().splitlines()
+
+        families = []
+        for line in lines:
+            name = line.split()[2] if line.startswith("#") else line.split("{")[0]
+            if not families or families[-1] != name:
+                families.append(name)
+        self.assertEqual(families, ["agent_model_requests_total", "agent_cache_hits_total", "agent_tokens_total"])
+        self.assertIn('agent_cache_hits_total{exercise="ex2",agent="Agent \\"B\\"",model="m2"} 1', lines)
+        self.assertIn('agent_tokens_total{exercise="ex1",agent="Agent A",model="m1",kind="input"} 10', lines)
+
+    def test_estimate_tokens_grows_with_text(self):
+        self.assertLess(usage.estimate_tokens("short"), usage.estimate_tokens("a much longer piece of text " * 10))
@@ -0,0 +1,87 @@
+import asyncio
+import functools
+import inspect
+import json
+import os
+from typing import Any, Callable, Dict, List, Optional
+
+from agents import FunctionTool, RunContextWrapper, function_tool
+from pydantic import BaseModel
+
+from cache import TTLCache
+
+# ---- Config ----
+PURE_TOOL_CACHE_TTL: float = float(os.getenv("PURE_TOOL_CACHE_TTL", "3600"))
+PURE_TOOL_CACHE_SIZE: int = int(os.getenv("PURE_TOOL_CACHE_SIZE", "1024"))
+
+# Memo caches of every pure tool, by tool name, for stats
+_caches: Dict[str, TTLCache] = {}
+
+
+def _canonical(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    return value
+
+
+def memo_key(args: tuple, kwargs: Dict[str, Any]) -> str:
+    """
+    Stable key for one call: the validated inputs (pydantic models as their JSON dump)
+    serialised with sorted keys, so equal inputs hit the same entry however the model
+    ordered or spelled them. The run context, if the tool takes one, is not part of it.
+    """
+    payload = {
+        "args": [_canonical(a) for a in args if not isinstance(a, RunContextWrapper)],
+        "kwargs": {k: _canonical(v) for k, v in kwargs.items() if not isinstance(v, RunContextWrapper)},
+    }
+    return json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+
+
+def pure_tool(
+    func: Optional[Callable[..., Any]] = None,
+    *,
+    ttl: float = PURE_TOOL_CACHE_TTL,
+    maxsize: int = PURE_TOOL_CACHE_SIZE,
+    in_thread: bool = False,
+) -> Any:
+    """
+    `function_tool` for pure functions (same input -> same output, no side effects).
+
+    Results are memoised per validated input for `ttl` seconds; concurrent identical
+    calls share one execution. Sync functions run inline by default, as with
+    `function_tool`; pass `in_thread=True` for slow, blocking ones so that tool calls
+    from the same model turn (which the SDK already gathers) actually overlap.
+
+        @pure_tool
+        def budget_calculator_tool(budget: BudgetInput): ...
+    """
+
+    def decorate(fn: Callable[..., Any]) -> FunctionTool:
+        cache: TTLCache[str, Any] = TTLCache(ttl=ttl, maxsize=maxsize)
+        _caches[fn.__name__] = cache
+
+        @functools.wraps(fn)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            async def call() -> Any:
+                if inspect.iscoroutinefunction(fn):
+                    return await fn(*args, **kwargs)
+                if in_thread:
+                    return await asyncio.to_thread(fn, *args, **kwargs)
+                return fn(*args, **kwargs)
+
+            return await cache.get_or_fetch(memo_key(args, kwargs), call)
+
+        return function_tool(wrapper)
+
+    return decorate(func) if func is not None else decorate
+
+
+def cache_stats() -> Dict[str, Dict[str, int]]:
+    """Hits, misses, coalesced calls and size of each pure tool's memo cache."""
+    return {name: cache.stats() for name, cache in _caches.items()}
+
+
+def clear_caches(names: Optional[List[str]] = None) -> None:
+    for name, cache in _caches.items():
+        if names is None or name in names:
+            cache.clear()
@@ -0,0 +1,190 @@
+import functools
+import inspect
+import json
+import os
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from agents import FunctionTool, function_tool
+from pydantic import BaseModel
+
+from usage import estimate_tokens
+
+# ---- Config ----
+# Estimated tokens one tool result may take in the conversation before it is truncated
+TOOL_RESULT_TOKENS: int = int(os.getenv("TOOL_RESULT_TOKENS", "800"))
+# Set to 0 to hand results to the SDK unencoded (e.g. to compare token counts)
+TOOL_ENCODING: bool = os.getenv("TOOL_ENCODING", "1") == "1"
+
+# Per tool name: calls, tokens the SDK's default str() would have sent, tokens actually sent
+_stats: Dict[str, Dict[str, int]] = {}
+
+
+# ---------- Encoding ----------
+def _prune(value: Any) -> Any:
+    """JSON-ready copy of `value` without nulls, empty containers or pydantic defaults."""
+    if isinstance(value, BaseModel):
+        value = value.model_dump(mode="json", exclude_none=True, exclude_defaults=True)
+    if isinstance(value, dict):
+        pruned = {str(k): _prune(v) for k, v in value.items()}
+        return {k: v for k, v in pruned.items() if v is not None and v != [] and v != {} and v != ""}
+    if isinstance(value, (list, tuple)):
+        return [_prune(v) for v in value]
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _tabulate(value: Any) -> Any:
+    """
+    Turn every list of two or more dicts into {"columns": [...], "rows": [[...], ...]}.
+    Columns with the same value in every row are stated once under "all".
+    """
+    if isinstance(value, dict):
+        return {k: _tabulate(v) for k, v in value.items()}
+    if isinstance(value, list):
+        items = [_tabulate(v) for v in value]
+        if len(items) >= 2 and all(isinstance(v, dict) for v in items):
+            columns: List[str] = []
+            for item in items:
+                columns += [k for k in item if k not in columns]
+            shared = {c: items[0][c] for c in columns if c in items[0] and all(item.get(c) == items[0][c] for item in items)}
+            columns = [c for c in columns if c not in shared]
+            table: Dict[str, Any] = {"all": shared} if shared else {}
+            table.update(columns=columns, rows=[[item.get(c) for c in columns] for item in items])
+            return table
+        return items
+    return value
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def _longest_list(value: Any, path: Tuple = ()) -> Tuple[Optional[Tuple], int]:
+    """Path to the longest list in `value` (a table's rows count as its list) and its length."""
+    best: Tuple[Optional[Tuple], int] = (None, 0)
+    if isinstance(value, dict) and isinstance(value.get("columns"), list) and isinstance(value.get("rows"), list):
+        # A table is cut by rows only: never its header or the cells of a row
+        rows = value["rows"]
+        return (path + ("rows",), len(rows)) if len(rows) > 1 else best
+    if isinstance(value, dict):
+        for k, v in value.items():
+            best = max(best, _longest_list(v, path + (k,)), key=lambda b: b[1])
+    elif isinstance(value, list):
+        best = (path, len(value)) if len(value) > 1 else best
+        for i, v in enumerate(value):
+            best = max(best, _longest_list(v, path + (i,)), key=lambda b: b[1])
+    return best
+
+
+def _column_summary(table: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    summary = {}
+    for i, column in enumerate(table["columns"]):
+        numbers = [row[i] for row in table["rows"] if isinstance(row[i], (int, float)) and not isinstance(row[i], bool)]
+        if numbers:
+            summary[column] = {"min": min(numbers), "max": max(numbers), "sum": round(sum(numbers), 4)}
+    return summary
+
+
+def _truncate(value: Any, budget: int) -> Any:
+    """
+    Halve the longest list until the result fits `budget` tokens. Next to each cut
+    list go the number of omitted items and, for tables, min/max/sum of every numeric
+    column over all rows, so totals stay answerable.
+    """
+    if isinstance(value, list) and estimate_tokens(_dumps(value)) > budget:
+        value = {"items": value}  # somewhere to put the notes
+    while estimate_tokens(_dumps(value)) > budget:
+        path, _ = _longest_list(value)
+        if path is None:
+            break
+        parent = value
+        for key in path[:-1]:
+            parent = parent[key]
+        key = path[-1]
+        items = parent[key]
+        keep = len(items) // 2
+        parent[key] = items[:keep]
+        if isinstance(parent, dict):
+            omitted = f"{key}_omitted"
+            if omitted not in parent:
+                parent[omitted] = 0
+                if key == "rows" and "columns" in parent:
+                    parent["rows_summary"] = _column_summary({"columns": parent["columns"], "rows": items})
+            parent[omitted] += len(items) - keep
+    return value
+
+
+def encode_result(value: Any, budget: int = TOOL_RESULT_TOKENS) -> str:
+    """
+    Compact text for a tool result: nulls and defaults dropped, lists of records as
+    a header plus rows, minimal JSON, and truncated with a summary past `budget`.
+    Plain strings are passed through (clipped past the budget).
+    """
+    if isinstance(value, str):
+        text = value
+    else:
+        text = _dumps(_truncate(_tabulate(_prune(value)), budget))
+    limit = budget * 4
+    return text if len(text) <= limit else text[:limit] + "...(truncated)"
+
+
+# ---------- Tool wrapper ----------
+def _record(name: str, raw: Any, encoded: str) -> None:
+    stats = _stats.setdefault(name, {"calls": 0, "raw_tokens": 0, "encoded_tokens": 0})
+    stats["calls"] += 1
+    stats["raw_tokens"] += estimate_tokens(str(raw))  # what the SDK sends by default
+    stats["encoded_tokens"] += estimate_tokens(encoded)
+
+
+def compact_result(func: Optional[Callable[..., Any]] = None, *, budget: int = TOOL_RESULT_TOKENS) -> Any:
+    """
+    Wrap a tool function so its return value reaches the model as `encode_result`
+    text. The signature and docstring are kept, so it can still go through
+    `function_tool` or `pure_tool`.
+    """
+
+    def decorate(fn: Callable[..., Any]) -> Callable[..., Any]:
+        def encode(result: Any) -> Any:
+            if not TOOL_ENCODING:
+                return result
+            encoded = encode_result(result, budget)
+            _record(fn.__name__, result, encoded)
+            return encoded
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                return encode(await fn(*args, **kwargs))
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            return encode(fn(*args, **kwargs))
+
+        return wrapper
+
+    return decorate(func) if func is not None else decorate
+
+
+def compact_tool(func: Optional[Callable[..., Any]] = None, *, budget: int = TOOL_RESULT_TOKENS) -> Any:
+    """
+    `function_tool` whose results are compactly encoded (see encode_result).
+
+        @compact_tool
+        def sales_data_tool(query: SalesQuery): ...
+    """
+
+    def decorate(fn: Callable[..., Any]) -> FunctionTool:
+        return function_tool(compact_result(fn, budget=budget))
+
+    return decorate(func) if func is not None else decorate
+
+
+def encoding_stats() -> Dict[str, Dict[str, Any]]:
+    """Per tool: calls, estimated tokens before and after encoding, and the share saved."""
+    return {
+        name: {**s, "saved": round(1 - s["encoded_tokens"] / s["raw_tokens"], 3) if s["raw_tokens"] else 0.0}
+        for name, s in _stats.items()
+    }
@@ -0,0 +1,214 @@
+"""
+Local trace exporter: records agent runs, agent turns, model calls, tool calls and
+structured-output checks from the Agents SDK's tracing hooks and writes them to a
+local file, with no network egress.
+
+    TRACE_EXPORT=chrome python ex9.py      # open traces.trace.json in ui.perfetto.dev
+    TRACE_EXPORT=jsonl python ex8.py       # one span per line in traces.jsonl
+    TRACE_REMOTE=1 python ex9.py           # the SDK's remote exporter instead (opt-in)
+
+The SDK's callbacks only take a timestamp and append to an in-memory buffer; spans
+are formatted and written by a background thread. Whole traces are kept or dropped
+according to TRACE_SAMPLE_RATE.
+"""
+import itertools
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Set, Tuple
+
+from agents import set_trace_processors, set_tracing_disabled
+from agents.tracing import Span, Trace, TracingProcessor
+
+# ---- Config ----
+TRACE_EXPORT: str = os.getenv("TRACE_EXPORT", "")  # "" (off) | jsonl | chrome
+TRACE_PATH: str = os.getenv("TRACE_PATH", "")  # default: traces.jsonl / traces.trace.json
+TRACE_SAMPLE_RATE: float = float(os.getenv("TRACE_SAMPLE_RATE", "1.0"))
+# Spans held in memory; when the writer falls behind the oldest are dropped (and counted)
+TRACE_BUFFER_SPANS: int = int(os.getenv("TRACE_BUFFER_SPANS", "10000"))
+TRACE_FLUSH_INTERVAL: float = float(os.getenv("TRACE_FLUSH_INTERVAL", "2.0"))
+# Wake the writer early once this many spans are waiting
+TRACE_FLUSH_BATCH: int = int(os.getenv("TRACE_FLUSH_BATCH", "512"))
+# Upload traces to the SDK's remote exporter (needs OPENAI_API_KEY); off unless asked for
+TRACE_REMOTE: bool = os.getenv("TRACE_REMOTE", "0") == "1"
+
+DEFAULT_PATHS = {"jsonl": "traces.jsonl", "chrome": "traces.trace.json"}
+
+# (trace_id, span_id, parent_id, span or trace, start, end) with perf_counter times
+_Record = Tuple[str, Optional[str], Optional[str], Any, float, float]
+
+
+class LocalTraceProcessor(TracingProcessor):
+    """
+    Buffers finished spans and writes them from a background thread as JSONL or as
+    Chrome trace events ("X" events, one row per trace).
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        fmt: str = "jsonl",
+        sample_rate: float = TRACE_SAMPLE_RATE,
+        buffer_spans: int = TRACE_BUFFER_SPANS,
+        flush_interval: float = TRACE_FLUSH_INTERVAL,
+    ) -> None:
+        if fmt not in DEFAULT_PATHS:
+            raise ValueError(f"unknown trace format {fmt!r}; expected one of {sorted(DEFAULT_PATHS)}")
+        self.fmt = fmt
+        self.path = path or DEFAULT_PATHS[fmt]
+        self.sample_rate = sample_rate
+        self.flush_interval = flush_interval
+        # perf_counter -> epoch microseconds
+        self._epoch_us = time.time() * 1e6 - time.perf_counter() * 1e6
+        self._sampled: Set[str] = set()
+        self._starts: Dict[str, float] = {}
+        self._buffer: Deque[_Record] = deque(maxlen=buffer_spans)
+        self._lanes: Dict[str, int] = {}
+        self._next_lane = itertools.count(1)
+        self._write_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = False
+        self.stats: Dict[str, int] = {"traces": 0, "sampled_out": 0, "spans": 0, "written": 0, "dropped": 0}
+        self._worker = threading.Thread(target=self._run, name="trace-export", daemon=True)
+        self._worker.start()
+
+    # ---------- SDK callbacks (hot path: no formatting or I/O) ----------
+    def on_trace_start(self, trace: Trace) -> None:
+        if self.sample_rate >= 1.0 or random.random() < self.sample_rate:
+            self.stats["traces"] += 1
+            self._sampled.add(trace.trace_id)
+            self._starts[trace.trace_id] = time.perf_counter()
+        else:
+            self.stats["sampled_out"] += 1
+
+    def on_trace_end(self, trace: Trace) -> None:
+        start = self._starts.pop(trace.trace_id, None)
+        self._sampled.discard(trace.trace_id)
+        if start is not None:
+            self._append((trace.trace_id, None, None, trace, start, time.perf_counter()))
+
+    def on_span_start(self, span: Span[Any]) -> None:
+        if span.trace_id in self._sampled:
+            self._starts[span.span_id] = time.perf_counter()
+
+    def on_span_end(self, span: Span[Any]) -> None:
+        start = self._starts.pop(span.span_id, None)
+        if start is not None:
+            self.stats["spans"] += 1
+            self._append((span.trace_id, span.span_id, span.parent_id, span, start, time.perf_counter()))
+
+    def _append(self, record: _Record) -> None:
+        if len(self._buffer) == self._buffer.maxlen:
+            self.stats["dropped"] += 1
+        self._buffer.append(record)
+        if len(self._buffer) >= TRACE_FLUSH_BATCH:
+            self._wake.set()
+
+    # ---------- Writing ----------
+    def _run(self) -> None:
+        while not self._stopped:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.force_flush()
+
+    def _event(self, record: _Record) -> Dict[str, Any]:
+        trace_id, span_id, parent_id, item, start, end = record
+        if span_id is None:
+            kind, name, args = "trace", item.name, {}
+        else:
+            data = item.span_data
+            kind = data.type
+            name = getattr(data, "name", None) or getattr(data, "model", None) or kind
+            args = {key: getattr(data, key) for key in ("model", "usage", "data") if getattr(data, key, None)}
+            if item.error:
+                args["error"] = item.error.get("message") if isinstance(item.error, dict) else str(item.error)
+        ts = self._epoch_us + start * 1e6
+        dur = (end - start) * 1e6
+        if self.fmt == "jsonl":
+            return {
+                "trace_id": trace_id,
+                "span_id": span_id,
+                "parent_id": parent_id,
+                "type": kind,
+                "name": name,
+                "start": round(ts / 1e6, 6),
+                "duration_ms": round(dur / 1000, 3),
+                **args,
+            }
+        return {
+            "name": name,
+            "cat": kind,
+            "ph": "X",
+            "ts": round(ts, 1),
+            "dur": round(dur, 1),
+            "pid": os.getpid(),
+            "tid": self._lane(trace_id),
+            "args": args,
+        }
+
+    def _lane(self, trace_id: str) -> int:
+        lane = self._lanes.get(trace_id)
+        if lane is None:
+            lane = self._lanes[trace_id] = next(self._next_lane)
+        return lane
+
+    def force_flush(self) -> None:
+        with self._write_lock:
+            records = []
+            while self._buffer:
+                records.append(self._buffer.popleft())
+            if not records:
+                return
+            lines = []
+            new_file = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+            if self.fmt == "chrome" and new_file:
+                # The closing "]" is optional in the trace-event format, so the file can be appended to
+                lines.append("[")
+            for record in records:
+                if self.fmt == "chrome" and record[1] is None:
+                    lines.append(json.dumps({
+                        "name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": self._lane(record[0]),
+                        "args": {"name": f"{record[3].name} {record[0]}"},
+                    }) + ",")
+                event = json.dumps(self._event(record), default=str)
+                lines.append(event + ("," if self.fmt == "chrome" else ""))
+                if record[1] is None:
+                    self._lanes.pop(record[0], None)  # a trace ends after all of its spans
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+            self.stats["written"] += len(records)
+
+    def shutdown(self) -> None:
+        self._stopped = True
+        self._wake.set()
+        self._worker.join(timeout=5)
+        self.force_flush()
+
+
+_processor: Optional[LocalTraceProcessor] = None
+
+
+def enable_local_tracing(path: Optional[str] = None, fmt: Optional[str] = None, **kwargs: Any) -> LocalTraceProcessor:
+    """Send all traces to a LocalTraceProcessor instead of the remote exporter."""
+    global _processor
+    if _processor is None:
+        _processor = LocalTraceProcessor(path or TRACE_PATH or None, fmt or TRACE_EXPORT or "jsonl", **kwargs)
+        set_trace_processors([_processor])
+        set_tracing_disabled(False)
+    return _processor
+
+
+def configure_tracing() -> Optional[LocalTraceProcessor]:
+    """
+    Export traces locally when TRACE_EXPORT is set. Traces only leave the machine with
+    TRACE_REMOTE=1 (and an OPENAI_API_KEY for the SDK's exporter); otherwise tracing
+    is switched off.
+    """
+    if TRACE_EXPORT:
+        return enable_local_tracing()
+    if not (TRACE_REMOTE and os.getenv("OPENAI_API_KEY")):
+        set_tracing_disabled(True)
+    return None
@@ -0,0 +1,250 @@
+import contextvars
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from agents import Agent, Model, ModelResponse, RunContextWrapper, RunHooks, Runner, RunResult, Usage
+
+# ---- Config ----
+# Default per-run token budget for run_metered (0 = unlimited)
+TOKEN_BUDGET: int = int(os.getenv("TOKEN_BUDGET", "0"))
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token) for sizing prompts before sending them."""
+    return max(1, (len(text) + 3) // 4)
+
+
+class TokenBudgetExceeded(RuntimeError):
+    """Raised from the model layer once a metered run has used up its token budget."""
+
+
+@dataclass
+class UsageRecord:
+    """Token usage of a single model response."""
+
+    exercise: str
+    agent: str
+    model: str
+    turn: int
+    kind: str  # "tool_call" when the model asked for tools, else "final"
+    input_tokens: int
+    output_tokens: int
+    cached_tokens: int
+    total_tokens: int
+    cache_hit: bool
+    latency_ms: float
+    ts: float
+
+
+@dataclass
+class UsageMeter:
+    """Collects the usage of one agent run and enforces its optional token budget."""
+
+    exercise: str = ""
+    budget: int = 0
+    agent: str = ""
+    records: List[UsageRecord] = field(default_factory=list)
+
+    @property
+    def total_tokens(self) -> int:
+        return sum(r.total_tokens for r in self.records)
+
+    def check_budget(self) -> None:
+        if self.budget and self.total_tokens >= self.budget:
+            raise TokenBudgetExceeded(
+                f"{self.exercise or 'run'} used {self.total_tokens} tokens (budget {self.budget})"
+            )
+
+    def add(self, record: UsageRecord) -> None:
+        self.records.append(record)
+        _record_totals(record)
+
+    def summary(self) -> Dict[str, Any]:
+        by_agent: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        for r in self.records:
+            agg = by_agent[r.agent]
+            agg["requests"] += 0 if r.cache_hit else 1
+            agg["input_tokens"] += r.input_tokens
+            agg["output_tokens"] += r.output_tokens
+            agg["cached_tokens"] += r.cached_tokens
+            agg["total_tokens"] += r.total_tokens
+        return {
+            "exercise": self.exercise,
+            "turns": len(self.records),
+            "total_tokens": self.total_tokens,
+            "by_agent": {name: dict(agg) for name, agg in by_agent.items()},
+        }
+
+
+_current_meter: contextvars.ContextVar[Optional[UsageMeter]] = contextvars.ContextVar(
+    "usage_meter", default=None
+)
+
+
+class UsageHooks(RunHooks):
+    """Tells the meter which agent is currently calling the model."""
+
+    def __init__(self, meter: UsageMeter) -> None:
+        self.meter = meter
+
+    async def on_agent_start(self, context: RunContextWrapper, agent: Agent) -> None:
+        self.meter.agent = agent.name
+
+
+def response_usage(response: Any) -> Usage:
+    """Usage of a streamed Responses-API `response` (from its response.completed event)."""
+    u = response.usage
+    if u is None:
+        return Usage(requests=1)
+    return Usage(
+        requests=1,
+        input_tokens=u.input_tokens,
+        output_tokens=u.output_tokens,
+        total_tokens=u.total_tokens,
+        input_tokens_details=u.input_tokens_details,
+        output_tokens_details=u.output_tokens_details,
+    )
+
+
+# ---------- Model wrapper ----------
+class MeteredModel(Model):
+    """
+    Records the token usage of every response into the meter of the current run, if any.
+    Outside `run_metered` it is a plain pass-through.
+    """
+
+    def __init__(self, inner: Model, model_name: str) -> None:
+        self.inner = inner
+        self.model = model_name
+
+    def _record(self, meter: UsageMeter, output: List[Any], usage: Usage, started: float) -> None:
+        meter.add(
+            UsageRecord(
+                exercise=meter.exercise,
+                agent=meter.agent,
+                model=self.model,
+                turn=len(meter.records) + 1,
+                kind="tool_call" if any(getattr(i, "type", "") == "function_call" for i in output) else "final",
+                input_tokens=usage.input_tokens,
+                output_tokens=usage.output_tokens,
+                cached_tokens=usage.input_tokens_details.cached_tokens or 0,
+                total_tokens=usage.total_tokens,
+                # The response cache reports no requests for responses it served
+                cache_hit=usage.requests == 0,
+                latency_ms=round((time.perf_counter() - started) * 1000, 1),
+                ts=time.time(),
+            )
+        )
+        meter.check_budget()
+
+    async def get_response(self, *args, **kwargs) -> ModelResponse:
+        meter = _current_meter.get()
+        if meter is None:
+            return await self.inner.get_response(*args, **kwargs)
+        meter.check_budget()
+        started = time.perf_counter()
+        response = await self.inner.get_response(*args, **kwargs)
+        self._record(meter, response.output, response.usage, started)
+        return response
+
+    async def stream_response(self, *args, **kwargs) -> AsyncIterator:
+        meter = _current_meter.get()
+        if meter is not None:
+            meter.check_budget()
+        started = time.perf_counter()
+        async for event in self.inner.stream_response(*args, **kwargs):
+            if meter is not None and getattr(event, "type", "") == "response.completed":
+                self._record(meter, event.response.output, response_usage(event.response), started)
+            yield event
+
+
+# ---------- Running ----------
+async def run_metered(
+    agent: Agent,
+    input: Any,
+    *,
+    exercise: str = "",
+    budget: Optional[int] = None,
+    meter: Optional[UsageMeter] = None,
+    **kwargs: Any,
+) -> Tuple[RunResult, UsageMeter]:
+    """
+    Runner.run with per-response token accounting. Raises TokenBudgetExceeded as soon as
+    the run's total tokens reach `budget` (default TOKEN_BUDGET; 0 = unlimited).
+    Pass your own `meter` to keep the usage of runs that raise.
+    """
+    if meter is None:
+        meter = UsageMeter()
+    meter.exercise = exercise or meter.exercise
+    meter.budget = TOKEN_BUDGET if budget is None else budget
+    token = _current_meter.set(meter)
+    try:
+        result = await Runner.run(agent, input, hooks=UsageHooks(meter), **kwargs)
+    finally:
+        _current_meter.reset(token)
+    return result, meter
+
+
+# ---------- Export ----------
+# Process-wide counters for the Prometheus export, keyed by (exercise, agent, model)
+_totals: Dict[Tuple[str, str, str], Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+_totals_lock = threading.Lock()
+
+
+def _record_totals(record: UsageRecord) -> None:
+    with _totals_lock:
+        agg = _totals[(record.exercise, record.agent, record.model)]
+        agg["requests"] += 0 if record.cache_hit else 1
+        agg["cache_hits"] += 1 if record.cache_hit else 0
+        agg["input"] += record.input_tokens
+        agg["output"] += record.output_tokens
+        agg["cached"] += record.cached_tokens
+
+
+def append_jsonl(meter: UsageMeter, path: str) -> None:
+    """Append one JSON line per model response of `meter` to `path`."""
+    with open(path, "a", encoding="utf-8") as f:
+        for record in meter.records:
+            f.write(json.dumps(asdict(record), ensure_ascii=False) + "\n")
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_text() -> str:
+    """Process-wide usage counters in Prometheus text exposition format (one block per family)."""
+    with _totals_lock:
+        items = sorted((k, dict(v)) for k, v in _totals.items())
+    families = [
+        ("agent_model_requests_total", "Model requests sent (cache hits excluded).", [("requests", "")]),
+        ("agent_cache_hits_total", "Model responses served from the response cache.", [("cache_hits", "")]),
+        (
+            "agent_tokens_total",
+            "Tokens used, by kind (input, output, cached).",
+            [(kind, f',kind="{kind}"') for kind in ("input", "output", "cached")],
+        ),
+    ]
+    lines = []
+    for name, help_text, samples in families:
+        # HELP, TYPE and every sample of a family must be contiguous
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} counter")
+        for (exercise, agent, model), agg in items:
+            labels = f'exercise="{_label(exercise)}",agent="{_label(agent)}",model="{_label(model)}"'
+            for field, extra in samples:
+                lines.append(f"{name}{{{labels}{extra}}} {agg.get(field, 0)}")
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path: str) -> None:
+    """Write the counters atomically so a node-exporter textfile collector never reads half a file."""
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(prometheus_text())
+    os.replace(tmp, path)